@@ -1,16 +1,47 @@
+import bz2
+import bisect
+import calendar
+import codecs
+import cProfile
+import fnmatch
+import gzip
+import hashlib
+import hmac
+import html
+import io
+import logging
+import mmap
 import os
+import queue
+import tempfile
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
 import re
 import shutil
+import socket
+import socketserver
 import subprocess
 import sys
 import subprocess
+import threading
+import time
+import tracemalloc
+import zipfile
 import py7zr
 import requests
 import json
+import multiprocessing
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
+from logging.handlers import RotatingFileHandler
 from datetime import datetime
 from pathlib import Path
-from PySide6.QtCore import QFile, QSettings, QTextStream
-from PySide6.QtGui import QAction, QCloseEvent, QIcon, QTextOption
+from PySide6.QtCore import QFile, QObject, QPoint, QSettings, QTextStream, QTimer, Qt, Signal
+from PySide6.QtGui import QAction, QCloseEvent, QColor, QIcon, QTextCursor, QTextFormat, QTextOption
 from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
@@ -29,9 +60,24 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
     QFormLayout,
-    QDialog
+    QDialog,
+    QInputDialog,
+    QListWidget,
+    QListWidgetItem,
+    QCheckBox,
+    QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView
 )
 
+def format_size(num_bytes):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
 def initialize_theme(parent, theme_file):
     try:
         file = QFile(theme_file)
@@ -88,6 +134,10 @@ class ConfigManager:
         self.data = {}
         self.save_config()
 
+    def reload(self):
+        """Reloads the configuration file, e.g. after it has been edited outside of the application."""
+        self.data = self._load_config()
+
     def switch_config_file(self, new_filename):
         """Switches to a different JSON configuration file and loads its data."""
         self.filename = new_filename
@@ -98,6 +148,109 @@ class ConfigManager:
         dict_keys = self.data.keys()
         return list(dict_keys)
 
+
+class StageProfiler:
+    def __init__(self):
+        """Collects wall and CPU time per stage, counters and peak memory, with an optional cProfile/tracemalloc capture."""
+        self.stages = {}  # Stage name -> [calls, wall seconds, cpu seconds]
+        self.counters = {}
+        self.started = datetime.now()
+        self.profile = None  # cProfile.Profile while a capture is running
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+        self.started = datetime.now()
+
+    @contextmanager
+    def stage(self, name):
+        """Adds the wall and CPU time of the block to the stage, stages may be nested."""
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += time.perf_counter() - wall_started
+            stage[2] += time.process_time() - cpu_started
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_cpu_time(self, name, seconds):
+        """Adds CPU time spent for the stage in another process, e.g. the worker of a guarded search."""
+        self.stages.setdefault(name, [0, 0.0, 0.0])[2] += seconds
+
+    @staticmethod
+    def peak_memory():
+        """Returns the peak memory of the process in bytes, or None if the platform does not report it."""
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                                                         "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+            return None
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+    def rates(self):
+        """Returns throughput figures derived from the counters and stage times."""
+        rates = {}
+        move_seconds = self.stages.get("move", [0, 0.0, 0.0])[1]
+        if move_seconds > 0:
+            rates["files_per_second"] = self.counters.get("files moved", 0) / move_seconds
+            rates["bytes_per_second"] = self.counters.get("bytes moved", 0) / move_seconds
+        search_seconds = self.stages.get("regex filter", [0, 0.0, 0.0])[1]
+        if search_seconds > 0:
+            rates["lines_per_second"] = self.counters.get("lines scanned", 0) / search_seconds
+        return rates
+
+    def to_dict(self):
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "stages": {name: {"calls": calls, "wall_seconds": round(wall, 6), "cpu_seconds": round(cpu, 6)} for name, (calls, wall, cpu) in self.stages.items()},
+            "counters": dict(self.counters),
+            "rates": {name: round(value, 2) for name, value in self.rates().items()},
+            "peak_memory_bytes": self.peak_memory(),
+            "traced_memory_peak_bytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+        }
+
+    def start_capture(self):
+        """Starts a cProfile and tracemalloc capture for support cases, both slow the application down noticeably."""
+        if self.profile is None:
+            tracemalloc.start(10)
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop_capture(self, output_dir):
+        """Stops the capture and writes the profile (.prof) and the top memory allocations (.txt), returns both paths."""
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        os.makedirs(output_dir, exist_ok=True)
+        base_name = os.path.join(output_dir, f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.profile.dump_stats(base_name + ".prof")
+        self.profile = None
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        with open(base_name + "_memory.txt", "w", encoding="utf-8") as f:
+            for statistic in snapshot.statistics("lineno")[:50]:
+                f.write(f"{statistic}\n")
+        return base_name + ".prof", base_name + "_memory.txt"
+
 class CustomAutoFillAction(QDialog):
     def __init__(self, main_window):
         super().__init__()
@@ -264,6 +417,375 @@ class CustomAutoFillAction(QDialog):
         super(CustomAutoFillAction, self).closeEvent(event)
 
 
+class RunLog:
+    TAG_PATTERN = re.compile(r"<[^>]+>")
+
+    def __init__(self, log_dir, name="run", max_bytes=5 * 1024 * 1024, backup_count=5):
+        """Structured records of the program output as rotating JSON lines files, the window shows the newest lines itself."""
+        # One file per kind of process (run, watch, agent): a rotating file must not be shared, Windows cannot rename it while another process has it open
+        self.log_path = os.path.join(log_dir, f"{name}.jsonl")
+        os.makedirs(log_dir, exist_ok=True)
+        # A private logger, so the run log never receives records of other loggers
+        self.logger = logging.Logger(f"FileShift.{name}")
+        self.handler = RotatingFileHandler(self.log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(self.handler)
+
+    @classmethod
+    def from_config(cls, log_dir, config, name="run"):
+        return cls(
+            log_dir,
+            name,
+            config.get("run_log_max_bytes", 5 * 1024 * 1024),
+            config.get("run_log_backups", 5),
+        )
+
+    def add(self, message, level=None):
+        """Records an HTML output line as plain text, the level follows the colors used for errors and warnings."""
+        if level is None:
+            if "color: red" in message or "color:red" in message:
+                level = "error"
+            elif "color: orange" in message or "color:orange" in message:
+                level = "warning"
+            else:
+                level = "info"
+        record = {"time": datetime.now().isoformat(timespec="milliseconds"), "level": level, "text": html.unescape(self.TAG_PATTERN.sub("", message)).strip()}
+        self.logger.info(json.dumps(record, ensure_ascii=False))
+
+    def close(self):
+        self.handler.close()
+
+
+class OutputConsole(QTextEdit):
+    def __init__(self, run_log, max_lines=2000):
+        """Read-only program output that only keeps the newest lines, every line is also written to the run log."""
+        super().__init__()
+        self.run_log = run_log
+        self.setReadOnly(True)
+        # Older blocks are dropped by the document, so long runs keep a constant layout cost and memory
+        self.document().setMaximumBlockCount(max_lines)
+
+    def append(self, text):
+        self.run_log.add(text)
+        super().append(text)
+
+    def setText(self, text):
+        self.run_log.add(text)
+        super().setText(text)
+
+
+class FileStatisticsNotifier(QObject):
+    # Emitted from the counting thread, Qt delivers it in the GUI thread
+    finished = Signal(str, object)
+
+
+class MultiPatternSearch(QDialog):
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window  # Store the MainWindow instance
+        self.results = {}  # Tag -> cleaned matching lines of the last scan
+        
+        # Initialize current working directory and theme file
+        self.current_working_dir = os.getcwd()
+        theme_file_path = os.path.join(self.current_working_dir,"_internal","theme_files")
+        dark_theme_file = os.path.join(theme_file_path,"dark.qss")
+        
+        # Initialize settings for window geometry
+        self.settings = QSettings("Application", "Name") # Settings to save current location of the windows on exit
+        geometry = self.settings.value("multi_search_geometry", bytes())
+        icon = QIcon("_internal\\icon\\app.ico")
+        
+        # Set window properties
+        self.setWindowTitle("Multi-pattern search")
+        self.setWindowIcon(icon)
+        self.restoreGeometry(geometry)
+        initialize_theme(self, dark_theme_file)
+        self.initUI()
+
+
+    def initUI(self):
+        main_layout = QVBoxLayout()
+        
+        self.description = QLabel("Select actions and/or enter patterns (one per line) to search the file content with all of them in one pass:")
+        self.actions_list = QListWidget()
+        for action_name, action_data in self.main_window.get_all_actions().items():
+            if action_data.get("search_pattern"):
+                item = QListWidgetItem(action_name)
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Unchecked)
+                self.actions_list.addItem(item)
+        self.patterns_input = QTextEdit()
+        self.patterns_input.setPlaceholderText("Additional regex patterns, one per line...")
+        self.patterns_input.setMaximumHeight(100)
+        self.scan_button = QPushButton("Search")
+        self.scan_button.clicked.connect(self.scan)
+        
+        self.results_list = QListWidget()
+        self.results_list.setToolTip("Select a pattern to show its matching lines in the file content view.")
+        self.results_list.currentRowChanged.connect(self.show_selected_result)
+        self.show_all_button = QPushButton("Show All Results")
+        self.show_all_button.setToolTip("Show the matching lines of all patterns, each prefixed with the name of its pattern.")
+        self.show_all_button.clicked.connect(self.show_all_results)
+        
+        main_layout.addWidget(self.description)
+        main_layout.addWidget(QLabel("Custom actions:"))
+        main_layout.addWidget(self.actions_list)
+        main_layout.addWidget(QLabel("Patterns:"))
+        main_layout.addWidget(self.patterns_input)
+        main_layout.addWidget(self.scan_button)
+        main_layout.addWidget(QLabel("Results:"))
+        main_layout.addWidget(self.results_list)
+        main_layout.addWidget(self.show_all_button)
+        
+        self.setLayout(main_layout)
+
+
+    def scan(self):
+        try:
+            actions = self.main_window.get_all_actions()
+            selected = {}
+            for row in range(self.actions_list.count()):
+                item = self.actions_list.item(row)
+                if item.checkState() == Qt.Checked:
+                    selected[item.text()] = actions[item.text()]
+            for pattern in self.patterns_input.toPlainText().splitlines():
+                if pattern.strip():
+                    selected[pattern.strip()] = {"search_pattern": pattern.strip()}
+            if not selected:
+                QMessageBox.warning(self, "No patterns selected", "Please select at least one action or enter a pattern.")
+                return
+            self.results = self.main_window.multi_pattern_search(selected)
+            self.results_list.clear()
+            for tag, lines in self.results.items():
+                self.results_list.addItem(f"{tag}: {len(lines)} matches")
+        except re.error as ex:
+            QMessageBox.critical(self, "Invalid pattern", f"One of the patterns is not a valid regex: {str(ex)}")
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while searching with multiple patterns: {str(ex)}")
+
+
+    def show_selected_result(self, row):
+        if 0 <= row < len(self.results):
+            tag = list(self.results)[row]
+            self.main_window.file_content_display.setPlainText("\n".join(self.results[tag]))
+
+
+    def show_all_results(self):
+        self.main_window.file_content_display.setPlainText("\n".join(f"[{tag}] {line}" for tag, lines in self.results.items() for line in lines))
+
+
+    def closeEvent(self, event: QCloseEvent):
+        # Save geometry on close
+        geometry = self.saveGeometry()
+        self.settings.setValue("multi_search_geometry", geometry)
+        super(MultiPatternSearch, self).closeEvent(event)
+
+
+class DirectoryScan(QDialog):
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window  # Store the MainWindow instance
+        
+        # Initialize current working directory and theme file
+        self.current_working_dir = os.getcwd()
+        theme_file_path = os.path.join(self.current_working_dir,"_internal","theme_files")
+        dark_theme_file = os.path.join(theme_file_path,"dark.qss")
+        
+        # Initialize settings for window geometry
+        self.settings = QSettings("Application", "Name") # Settings to save current location of the windows on exit
+        geometry = self.settings.value("directory_scan_geometry", bytes())
+        icon = QIcon("_internal\\icon\\app.ico")
+        
+        # Set window properties
+        self.setWindowTitle("Find files in a directory")
+        self.setWindowIcon(icon)
+        self.restoreGeometry(geometry)
+        self.setModal(True)
+        initialize_theme(self, dark_theme_file)
+        self.initUI()
+
+
+    def initUI(self):
+        main_layout = QVBoxLayout()
+        form_layout = QFormLayout()
+        root_layout = QHBoxLayout()
+        
+        # Elements
+        self.description = QLabel("Find files to move by directory criteria instead of a log file:")
+        self.root_input = QLineEdit()
+        self.root_input.setPlaceholderText("e.g. D:/Lobster_data/lib")
+        self.browse_root_button = QPushButton("Browse")
+        self.browse_root_button.clicked.connect(self.browse_root)
+        root_layout.addWidget(self.root_input)
+        root_layout.addWidget(self.browse_root_button)
+        self.pattern_input = QLineEdit("*.jar")
+        self.pattern_input.setToolTip("Glob patterns of the file names, several patterns can be separated with ;")
+        self.min_age_input = QSpinBox()
+        self.min_age_input.setRange(0, 36500)
+        self.min_age_input.setSuffix(" days")
+        self.min_size_input = QSpinBox()
+        self.min_size_input.setRange(0, 10000000)
+        self.min_size_input.setSuffix(" KB")
+        self.unreferenced_checkbox = QCheckBox("Only files not referenced by the loaded log file")
+        self.unreferenced_checkbox.setToolTip("Skips every file whose name appears in the log file selected in the main window.")
+        self.target_combobox = QComboBox()
+        self.target_combobox.addItems(["Show in file content view", "Move to destination directly"])
+        self.scan_button = QPushButton("Find Files")
+        self.scan_button.clicked.connect(self.scan)
+        
+        # Add elements to form layout with labels
+        form_layout.addRow(QLabel("Description:"), self.description)
+        form_layout.addRow(QLabel("Directory:"), root_layout)
+        form_layout.addRow(QLabel("File Pattern:"), self.pattern_input)
+        form_layout.addRow(QLabel("Older Than:"), self.min_age_input)
+        form_layout.addRow(QLabel("Larger Than:"), self.min_size_input)
+        form_layout.addRow(QLabel(""), self.unreferenced_checkbox)
+        form_layout.addRow(QLabel("Results:"), self.target_combobox)
+        
+        main_layout.addLayout(form_layout)
+        main_layout.addWidget(self.scan_button)
+        self.setLayout(main_layout)
+
+
+    def browse_root(self):
+        folder_path = QFileDialog.getExistingDirectory(self, "Select Folder")
+        if folder_path:
+            self.root_input.setText(folder_path)
+
+
+    def scan(self):
+        try:
+            root = self.root_input.text()
+            if not os.path.isdir(root):
+                QMessageBox.warning(self, "Not a valid path", f"The entered folder path '{root}' is not valid or does not exist.")
+                return
+            move_directly = self.target_combobox.currentIndex() == 1
+            if move_directly and not self.main_window.destination_input.text():
+                QMessageBox.warning(self, "Missing destination", "Please set the destination directory in the main window first.")
+                return
+            excluded_names = set()
+            if self.unreferenced_checkbox.isChecked():
+                log_text = self.main_window.log_index.text if self.main_window.log_index else self.main_window.extract_data_from_log(self.main_window.file_path_input.text())
+                if not log_text:
+                    QMessageBox.warning(self, "No log file loaded", "Please load a log file in the main window to skip the files referenced by it.")
+                    return
+                excluded_names = FileSystemScanner.referenced_names(log_text)
+            scanner = FileSystemScanner(root, self.pattern_input.text().split(";"), self.min_age_input.value(), self.min_size_input.value() * 1024, excluded_names)
+            self.main_window.scan_directory(scanner, move_directly)
+            self.close()
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while scanning the directory: {str(ex)}")
+
+
+    def closeEvent(self, event: QCloseEvent):
+        # Save geometry on close
+        geometry = self.saveGeometry()
+        self.settings.setValue("directory_scan_geometry", geometry)
+        super(DirectoryScan, self).closeEvent(event)
+
+
+class PathRewriteRules(QDialog):
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window  # Store the MainWindow instance
+        
+        # Initialize current working directory and theme file
+        self.current_working_dir = os.getcwd()
+        theme_file_path = os.path.join(self.current_working_dir,"_internal","theme_files")
+        dark_theme_file = os.path.join(theme_file_path,"dark.qss")
+        
+        # Initialize settings for window geometry
+        self.settings = QSettings("Application", "Name") # Settings to save current location of the windows on exit
+        geometry = self.settings.value("path_rules_geometry", bytes())
+        icon = QIcon("_internal\\icon\\app.ico")
+        
+        # Set window properties
+        self.setWindowTitle("Path rewrite rules")
+        self.setWindowIcon(icon)
+        self.restoreGeometry(geometry)
+        self.setModal(True)
+        initialize_theme(self, dark_theme_file)
+        self.initUI()
+        self.load_rules()
+
+
+    def initUI(self):
+        main_layout = QVBoxLayout()
+        button_layout = QHBoxLayout()
+        form_layout = QFormLayout()
+        
+        # Elements
+        self.description = QLabel("Paths starting with a prefix are rewritten to its target, the longest matching prefix wins.\nThe rules are applied after Text to replace / Replace text with, '/' and '\\' in a prefix match both separators.")
+        self.rules_table = QTableWidget(0, 2)
+        self.rules_table.setHorizontalHeaderLabels(["Prefix", "Target"])
+        self.rules_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.separator_combobox = QComboBox()
+        self.separator_combobox.addItems(["Keep the target's separator", "Forward slashes /", "Backslashes \\"])
+        self.add_rule_button = QPushButton("Add Rule")
+        self.add_rule_button.clicked.connect(lambda: self.rules_table.insertRow(self.rules_table.rowCount()))
+        self.remove_rule_button = QPushButton("Remove Selected Rules")
+        self.remove_rule_button.clicked.connect(self.remove_selected_rules)
+        self.save_button = QPushButton("Save Rules")
+        self.save_button.clicked.connect(self.save_rules)
+        
+        button_layout.addWidget(self.add_rule_button)
+        button_layout.addWidget(self.remove_rule_button)
+        form_layout.addRow(QLabel("Separator:"), self.separator_combobox)
+        
+        main_layout.addWidget(self.description)
+        main_layout.addWidget(self.rules_table)
+        main_layout.addLayout(button_layout)
+        main_layout.addLayout(form_layout)
+        main_layout.addWidget(self.save_button)
+        self.setLayout(main_layout)
+
+
+    def load_rules(self):
+        config = self.main_window.app_config.get("path_rules", {})
+        for rule in config.get("rules", []):
+            row = self.rules_table.rowCount()
+            self.rules_table.insertRow(row)
+            self.rules_table.setItem(row, 0, QTableWidgetItem(rule.get("prefix", "")))
+            self.rules_table.setItem(row, 1, QTableWidgetItem(rule.get("target", "")))
+        self.separator_combobox.setCurrentIndex(["keep", "/", "\\"].index(config.get("separator", "keep")) if config.get("separator", "keep") in ("keep", "/", "\\") else 0)
+
+
+    def remove_selected_rules(self):
+        for row in sorted({index.row() for index in self.rules_table.selectedIndexes()}, reverse=True):
+            self.rules_table.removeRow(row)
+
+
+    def save_rules(self):
+        try:
+            rules = []
+            prefixes = set()
+            for row in range(self.rules_table.rowCount()):
+                prefix = self.rules_table.item(row, 0).text().strip() if self.rules_table.item(row, 0) else ""
+                target = self.rules_table.item(row, 1).text().strip() if self.rules_table.item(row, 1) else ""
+                if not prefix and not target:
+                    continue
+                if not prefix:
+                    QMessageBox.warning(self, "Missing prefix", f"The rule in row {row + 1} has no prefix.")
+                    return
+                if prefix.replace("\\", "/") in prefixes:
+                    QMessageBox.warning(self, "Duplicate prefix", f"The prefix '{prefix}' is used by more than one rule.")
+                    return
+                prefixes.add(prefix.replace("\\", "/"))
+                rules.append({"prefix": prefix, "target": target})
+            self.main_window.app_config.set("path_rules", {"separator": ["keep", "/", "\\"][self.separator_combobox.currentIndex()], "rules": rules})
+            self.main_window.statusbar.showMessage(f"Saved {len(rules)} path rewrite rules.", 10000)
+            self.close()
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while saving the path rewrite rules: {str(ex)}")
+
+
+    def closeEvent(self, event: QCloseEvent):
+        # Save geometry on close
+        geometry = self.saveGeometry()
+        self.settings.setValue("path_rules_geometry", geometry)
+        super(PathRewriteRules, self).closeEvent(event)
+
+
 # Regex Generator class to convert string to regex pattern
 class RegexGenerator:
     def __init__(self, string_pattern_to_detect):
@@ -344,18 +866,2726 @@ class RegexGenerator:
         else:
             return "SPECIAL"
 
-    def get_regex(self):
-        return self.regex_string
+    def get_regex(self):
+        return self.regex_string
+
+    def check_if_valid(self):
+        import re
+        try:
+            re.compile(self.regex_string)
+            return True
+        except re.error:
+            return False
+
+class StatCache:
+    def __init__(self, ttl=5.0):
+        """Short-lived cache of directory listings, each directory is read once with os.scandir instead of one stat per path."""
+        self.ttl = ttl  # Seconds a listing is trusted before the directory is read again
+        self._listings = {}  # Directory -> (time read, {file name: os.DirEntry} or None if the directory does not exist)
+        self._devices = {}  # Directory -> st_dev or None, DirEntry.stat() does not fill st_dev on Windows
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def listing(self, directory):
+        """Returns the cached entries of a directory, reading it when the cached listing is missing or expired."""
+        key = self._key(directory)
+        cached = self._listings.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        try:
+            with os.scandir(directory) as iterator:
+                entries = {os.path.normcase(entry.name): entry for entry in iterator}
+        except OSError:
+            entries = None
+        self._listings[key] = (time.monotonic(), entries)
+        return entries
+
+    def entry(self, path):
+        """Returns the os.DirEntry of a path from the listing of its parent directory or None if it does not exist."""
+        parent, name = os.path.split(os.path.abspath(path))
+        if not name:
+            return None
+        entries = self.listing(parent)
+        if entries is None:
+            return None
+        return entries.get(os.path.normcase(name))
+
+    def exists(self, path):
+        return self.entry(path) is not None or self.isdir(path)
+
+    def isfile(self, path):
+        entry = self.entry(path)
+        try:
+            return entry is not None and entry.is_file()
+        except OSError:
+            return False
+
+    def isdir(self, path):
+        parent, name = os.path.split(os.path.abspath(path))
+        if not name:
+            return os.path.isdir(path)  # Drive or share root
+        entry = self.entry(path)
+        try:
+            return entry is not None and entry.is_dir()
+        except OSError:
+            return False
+
+    def stat(self, path):
+        """Returns the stat result of a file or None, on Windows the listing already contains it."""
+        entry = self.entry(path)
+        try:
+            return entry.stat() if entry is not None else None
+        except OSError:
+            return None
+
+    def device(self, directory):
+        """Returns the device of a directory or None if it does not exist."""
+        key = self._key(directory)
+        if key not in self._devices:
+            try:
+                self._devices[key] = os.stat(directory).st_dev
+            except OSError:
+                self._devices[key] = None
+        return self._devices[key]
+
+    def discard(self, path):
+        """Removes a path that we moved away from the cached listing of its directory without reading it again."""
+        parent, name = os.path.split(os.path.abspath(path))
+        cached = self._listings.get(self._key(parent))
+        if cached is not None and cached[1] is not None:
+            cached[1].pop(os.path.normcase(name), None)
+
+    def invalidate(self, path):
+        """Drops the cached listing of the directory containing the path, e.g. after we moved a file into it."""
+        parent = os.path.dirname(os.path.abspath(path))
+        self._listings.pop(self._key(parent), None)
+        self._devices.pop(self._key(parent), None)
+        self._listings.pop(self._key(path), None)
+        self._devices.pop(self._key(path), None)
+
+
+class PathStatusChecker:
+    PATH_PATTERN = re.compile(r"^(?:[A-Za-z]:[\\/]|\\\\|/)")  # Drive, UNC or POSIX absolute path
+
+    def __init__(self, max_workers=16, ttl=60.0):
+        """Checks listed paths on a thread pool (exists, size, locked) and caches the results for the file content view."""
+        self.ttl = ttl  # Seconds a result is trusted before the path is checked again
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.results = queue.Queue()  # (path, status) of finished checks, drained by the GUI thread
+        self.cache = {}  # Path -> (time checked, status)
+        self._pending = set()
+
+    @classmethod
+    def path_of(cls, line):
+        """Returns the path of a line of the file content view, or None if the line is not an absolute path."""
+        path = line.strip().strip("'\"").strip()
+        return path if cls.PATH_PATTERN.match(path) else None
+
+    @classmethod
+    def check(cls, path):
+        """Returns {"state": "exists" | "missing" | "locked", "size": bytes or None}."""
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return {"state": "missing", "size": None}
+        return {"state": "locked" if cls.is_in_use(path) else "exists", "size": size}
+
+    @staticmethod
+    def is_in_use(path):
+        """Returns True if another process holds the file open without allowing it to be moved, only Windows blocks renames of open files."""
+        if sys.platform != "win32":
+            return False
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        kernel32.CreateFileW.argtypes = (wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE)
+        DELETE, FILE_SHARE_ALL, OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS = 0x00010000, 0x7, 3, 0x02000000
+        ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION = 32, 33
+        # Only the access a rename needs, without reading or writing, so read-only files are not reported and open files are not touched
+        handle = kernel32.CreateFileW(path, DELETE, FILE_SHARE_ALL, None, OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None)
+        if handle == wintypes.HANDLE(-1).value:
+            return ctypes.get_last_error() in (ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION)
+        kernel32.CloseHandle(handle)
+        return False
+
+    def cached(self, path):
+        cached = self.cache.get(path)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        return None
+
+    def submit(self, paths):
+        """Queues the paths that are neither cached nor already being checked, in the given order."""
+        for path in paths:
+            if path in self._pending or self.cached(path) is not None:
+                continue
+            self._pending.add(path)
+            self.executor.submit(self._run, path)
+
+    def _run(self, path):
+        status = None
+        try:
+            status = self.check(path)
+        except Exception:
+            pass  # Not cached, the path is checked again by the next submit
+        finally:
+            self.results.put((path, status))
+
+    def drain(self):
+        """Moves the finished checks into the cache and returns the checked paths, call from the GUI thread."""
+        paths = []
+        while True:
+            try:
+                path, status = self.results.get_nowait()
+            except queue.Empty:
+                return paths
+            self._pending.discard(path)
+            if status is not None:
+                self.cache[path] = (time.monotonic(), status)
+            paths.append(path)
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def invalidate(self):
+        self.cache.clear()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """Token bucket allowing rate tokens per second with bursts up to capacity, a rate of 0 disables it."""
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self, amount):
+        """Takes amount tokens from the bucket, sleeping until the bucket has refilled enough."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens < 0:
+            # Requests larger than the bucket run into debt and wait for it to be paid off
+            time.sleep(-self.tokens / self.rate)
+
+
+class IOThrottle:
+    def __init__(self, max_bytes_per_second=0, max_operations_per_second=0, latency_threshold_ms=0, chunk_size=1024 * 1024):
+        """Limits bandwidth and file operations of the mover and backs off when the disk becomes slow."""
+        self.max_bytes_per_second = max_bytes_per_second
+        self.bandwidth = TokenBucket(max_bytes_per_second)
+        self.operations = TokenBucket(max_operations_per_second)
+        self.latency_threshold = latency_threshold_ms / 1000
+        self.chunk_size = chunk_size
+        self.latency_average = 0.0
+        self.backoff_count = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.get("max_bytes_per_second", 0),
+            config.get("max_operations_per_second", 0),
+            config.get("latency_threshold_ms", 0),
+            config.get("chunk_size", 1024 * 1024),
+        )
+
+    def is_enabled(self):
+        return self.bandwidth.rate > 0 or self.operations.rate > 0 or self.latency_threshold > 0
+
+    def operation(self):
+        """Waits for a free slot before the next file operation (rename, copy, delete)."""
+        self.operations.consume(1)
+
+    def measure(self, seconds):
+        """Feeds the duration of one disk operation into the latency average and backs off while it is too high."""
+        if self.latency_threshold <= 0:
+            return
+        self.latency_average = 0.8 * self.latency_average + 0.2 * seconds
+        if self.latency_average > self.latency_threshold:
+            self.backoff_count += 1
+            if self.bandwidth.rate > 0:
+                # Halve the bandwidth, but never below 1/16 of the configured limit
+                self.bandwidth.rate = max(self.max_bytes_per_second / 16, self.bandwidth.rate / 2)
+            time.sleep(self.latency_average)
+        elif self.latency_average < self.latency_threshold / 2 and self.bandwidth.rate < self.max_bytes_per_second:
+            self.bandwidth.rate = min(self.max_bytes_per_second, self.bandwidth.rate * 1.1)
+
+    def copy2(self, src, dst):
+        """Chunked replacement for shutil.copy2 used by shutil.move when a file has to be copied to another drive."""
+        with open(src, "rb") as source, open(dst, "wb", buffering=0) as target:
+            while True:
+                chunk = source.read(self.chunk_size)
+                if not chunk:
+                    break
+                self.bandwidth.consume(len(chunk))
+                started = time.perf_counter()
+                target.write(chunk)
+                self.measure(time.perf_counter() - started)
+        shutil.copystat(src, dst)
+        return dst
+
+
+@contextmanager
+def low_io_priority(enabled=True):
+    """Lowers the I/O priority of the process while the block runs, so moves yield to the server workload."""
+    if not enabled:
+        yield
+        return
+    restore = None
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            PROCESS_MODE_BACKGROUND_BEGIN, PROCESS_MODE_BACKGROUND_END = 0x00100000, 0x00200000
+            if kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), PROCESS_MODE_BACKGROUND_BEGIN):
+                restore = lambda: kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), PROCESS_MODE_BACKGROUND_END)
+        elif sys.platform.startswith("linux"):
+            import ctypes
+            import platform
+            # ioprio_get/ioprio_set syscall numbers, IOPRIO_WHO_PROCESS = 1 and IOPRIO_CLASS_IDLE = 3
+            syscalls = {"x86_64": (252, 251), "aarch64": (31, 30)}.get(platform.machine())
+            if syscalls:
+                libc = ctypes.CDLL(None, use_errno=True)
+                previous = libc.syscall(syscalls[0], 1, 0)
+                if previous >= 0 and libc.syscall(syscalls[1], 1, 0, 3 << 13) == 0:
+                    restore = lambda: libc.syscall(syscalls[1], 1, 0, previous)
+    except (OSError, AttributeError):
+        restore = None  # Keep the normal priority if the platform does not allow changing it
+    try:
+        yield
+    finally:
+        if restore:
+            restore()
+
+
+class MoveJournal:
+    def __init__(self, journal_path, sync_every=100):
+        """Append-only JSON lines journal of planned and completed file moves."""
+        self.journal_path = journal_path
+        self.sync_every = sync_every  # Number of records written before the journal is fsynced, every record is flushed to the OS
+        self._file = None
+        self._unsynced = 0
+
+    @classmethod
+    def create(cls, journal_dir, destination, sync_every=100):
+        """Creates a new timestamped journal in the journal directory and writes its header record."""
+        os.makedirs(journal_dir, exist_ok=True)
+        journal_path = os.path.join(journal_dir, f"move_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl")
+        journal = cls(journal_path, sync_every)
+        journal.write({"op": "begin", "destination": destination, "time": datetime.now().isoformat(timespec="seconds")}, sync=True)
+        return journal
+
+    @staticmethod
+    def latest(journal_dir):
+        """Returns the path of the most recent journal in the journal directory or None."""
+        if not os.path.isdir(journal_dir):
+            return None
+        journals = sorted(name for name in os.listdir(journal_dir) if name.startswith("move_") and name.endswith(".jsonl"))
+        if not journals:
+            return None
+        return os.path.join(journal_dir, journals[-1])
+
+    def write(self, record, sync=False):
+        """Appends and flushes a record, so it survives a crash of the process, and syncs to disk every sync_every records."""
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+            if self._ends_with_torn_record():
+                self._file.write("\n")  # Terminate the torn record so the next one stays readable
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if sync or self._unsynced >= self.sync_every:
+            self.sync()
+
+    def _ends_with_torn_record(self):
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0:
+            return False
+        with open(self.journal_path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) != b"\n"
+
+    def sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def record_plan(self, entries, duplicates=None, duplicate_stats=None):
+        """Writes all planned moves (and duplicates to remove, with the size and mtime they were compared at) and syncs once, before the first file is touched."""
+        for file_to_move, current_destination in entries:
+            self.write({"op": "plan", "src": file_to_move, "dst": current_destination})
+        duplicate_stats = duplicate_stats or {}
+        for primary, duplicate_files in (duplicates or {}).items():
+            for duplicate in duplicate_files:
+                record = {"op": "plan_duplicate", "src": duplicate, "primary": primary}
+                if duplicate in duplicate_stats:
+                    record["size"], record["mtime_ns"] = duplicate_stats[duplicate]
+                self.write(record)
+        self.sync()
+
+    def read_state(self):
+        """Reads the journal and returns the planned, done, missing and undone moves."""
+        state = {"destination": "", "time": "", "planned": [], "done": {}, "missing": set(), "undone": set(), "duplicates": {}, "duplicate_stats": {}, "deduped": {}, "archive": None, "packed": {}, "verified": False, "finished": False}
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave the last record half written, everything before it is still valid
+                    continue
+                op = record.get("op")
+                if op == "begin":
+                    state["destination"] = record.get("destination", "")
+                    state["time"] = record.get("time", "")
+                elif op == "plan":
+                    state["planned"].append((record["src"], record["dst"]))
+                elif op == "done":
+                    state["done"][record["src"]] = record["dst"]
+                    state["undone"].discard(record["src"])
+                elif op == "missing":
+                    state["missing"].add(record["src"])
+                elif op == "plan_duplicate":
+                    state["duplicates"].setdefault(record["primary"], []).append(record["src"])
+                    if "size" in record:
+                        state["duplicate_stats"][record["src"]] = (record["size"], record["mtime_ns"])
+                elif op == "dedup":
+                    state["deduped"][record["src"]] = record["dst"]
+                    state["undone"].discard(record["src"])
+                elif op == "undo":
+                    state["undone"].add(record["src"])
+                elif op == "archive":
+                    state["archive"] = record["path"]
+                elif op == "packed":
+                    state["packed"][record["src"]] = (record["dst"], record["size"], record["mtime_ns"])
+                elif op == "verified":
+                    state["verified"] = True
+                elif op == "end":
+                    state["finished"] = True
+        return state
+
+
+class FileMover:
+    def __init__(self, destination, journal=None, report=None, stat_cache=None, throttle=None):
+        """Moves files to the destination directory, recording every step in an optional MoveJournal."""
+        self.destination = destination
+        self.journal = journal
+        self.report = report  # Callback receiving (event, file_to_move, detail)
+        self.stat_cache = stat_cache or StatCache()
+        self.throttle = throttle or IOThrottle()
+        self._created_dirs = set()
+        self.duplicates = {}  # Source -> byte-identical files that are removed once the source has been moved
+        self.duplicate_stats = {}  # Duplicate -> (size, mtime_ns) it was compared at
+        self.writes_to_folder = True  # False for movers that pack the files into an archive
+        self.moved_count = 0
+        self.moved_bytes = 0
+        self.deduped_count = 0
+        self.warn_count = 0
+        self.err_count = 0
+
+    def destination_for(self, file_to_move):
+        """Returns the destination path of a file, keeping its immediate parent directory (e.g. lib/filename.jar)."""
+        if "/" in file_to_move:  # Forward slash
+            sub_dir = "/".join(file_to_move.split("/")[-2:])
+        elif "\\" in file_to_move:  # Backslash
+            sub_dir = "\\".join(file_to_move.split("\\")[-2:])
+        else:
+            sub_dir = file_to_move
+        return os.path.join(self.destination, sub_dir)
+
+    def _emit(self, event, file_to_move, detail):
+        if self.report:
+            self.report(event, file_to_move, detail)
+
+    def move(self, entries):
+        """Moves all entries, journaling each outcome."""
+        try:
+            for file_to_move, current_destination in entries:
+                try:
+                    # Ensure the destination directory exists, once per directory
+                    destination_dir = os.path.dirname(current_destination)
+                    if destination_dir not in self._created_dirs and self.stat_cache.exists(file_to_move):
+                        os.makedirs(destination_dir, exist_ok=True)
+                        self._created_dirs.add(destination_dir)
+                    source_stat = self.stat_cache.stat(file_to_move)
+                    self._move_file(file_to_move, current_destination)
+                    self.stat_cache.discard(file_to_move)
+                    self.stat_cache.invalidate(current_destination)
+                except FileNotFoundError:
+                    self.warn_count += 1
+                    self._journal({"op": "missing", "src": file_to_move})
+                    self._emit("missing", file_to_move, None)
+                except (shutil.Error, OSError) as e:
+                    self.err_count += 1
+                    self._journal({"op": "error", "src": file_to_move, "error": str(e)})
+                    self._emit("error", file_to_move, str(e))
+                else:
+                    self.moved_count += 1
+                    self.moved_bytes += source_stat.st_size if source_stat else 0
+                    self._journal({"op": "done", "src": file_to_move, "dst": current_destination})
+                    self._emit("moved", file_to_move, current_destination)
+                    self._remove_duplicates(file_to_move, current_destination)
+            self._journal({"op": "end"}, sync=True)
+        finally:
+            if self.journal:
+                self.journal.close()
+
+    def _remove_duplicates(self, file_to_move, current_destination):
+        # The moved file keeps the content, identical copies of it are deleted instead of moved
+        for duplicate in self.duplicates.get(file_to_move, []):
+            try:
+                expected = self.duplicate_stats.get(duplicate)
+                if expected is not None:
+                    file_stat = os.stat(duplicate)
+                    if (file_stat.st_size, file_stat.st_mtime_ns) != tuple(expected):
+                        # The file changed after it was compared, it may no longer be identical
+                        raise OSError(f"{duplicate} changed after it was compared and has been kept")
+                self.throttle.operation()
+                os.remove(duplicate)
+                self.stat_cache.discard(duplicate)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.err_count += 1
+                self._emit("error", duplicate, str(e))
+            else:
+                self.deduped_count += 1
+                self._journal({"op": "dedup", "src": duplicate, "dst": current_destination})
+                self._emit("deduped", duplicate, current_destination)
+
+    def _move_file(self, src, dst):
+        if not self.throttle.is_enabled():
+            shutil.move(src, dst)
+            return
+        self.throttle.operation()
+        copied = []
+
+        def copy_function(source, target):
+            copied.append(source)
+            return self.throttle.copy2(source, target)
+
+        started = time.perf_counter()
+        # Renames on the same drive are a single operation, copies to another drive go through the throttled copy
+        shutil.move(src, dst, copy_function=copy_function)
+        if not copied:
+            self.throttle.measure(time.perf_counter() - started)  # copy2 measures every chunk itself, without the bandwidth waits
+
+    def mark_missing(self, missing_files):
+        """Records files that are already known to be missing without trying to move them."""
+        for file_to_move in missing_files:
+            self.warn_count += 1
+            self._journal({"op": "missing", "src": file_to_move})
+            self._emit("missing", file_to_move, None)
+
+    def resume(self, state):
+        """Moves the planned entries of an interrupted journal that have not been finished yet, without re-checking finished ones."""
+        remaining = [(src, dst) for src, dst in state["planned"] if src not in state["done"] and src not in state["missing"]]
+        # A crash between the rename and its journal record leaves a moved file without a done record
+        moved = [(src, dst) for src, dst in remaining if os.path.exists(dst) and not os.path.exists(src)]
+        for file_to_move, current_destination in moved:
+            self._journal({"op": "done", "src": file_to_move, "dst": current_destination})
+            state["done"][file_to_move] = current_destination
+        if moved:
+            remaining = [(src, dst) for src, dst in remaining if src not in state["done"]]
+        self.duplicates = {primary: [duplicate for duplicate in duplicate_files if duplicate not in state["deduped"]] for primary, duplicate_files in state["duplicates"].items()}
+        self.duplicate_stats = state["duplicate_stats"]
+        for primary, current_destination in state["done"].items():
+            self._remove_duplicates(primary, current_destination)
+        self.move(remaining)
+        return len(state["planned"]) - len(remaining)
+
+    def undo(self, state):
+        """Moves all files recorded as done back to their source, newest first."""
+        try:
+            # Restore removed duplicates first, they are copied from the moved file
+            for duplicate, current_destination in reversed(list(state["deduped"].items())):
+                if duplicate in state["undone"]:
+                    continue
+                try:
+                    shutil.copy2(current_destination, duplicate)
+                except (shutil.Error, OSError) as e:
+                    self.err_count += 1
+                    self._emit("error", duplicate, str(e))
+                else:
+                    self.moved_count += 1
+                    self._journal({"op": "undo", "src": duplicate, "dst": current_destination})
+                    self._emit("restored", duplicate, current_destination)
+            for file_to_move, current_destination in reversed(list(state["done"].items())):
+                if file_to_move in state["undone"]:
+                    continue
+                try:
+                    os.makedirs(os.path.dirname(file_to_move) or ".", exist_ok=True)
+                    self._move_file(current_destination, file_to_move)
+                    self.stat_cache.discard(current_destination)
+                    self.stat_cache.invalidate(file_to_move)
+                except FileNotFoundError:
+                    self.warn_count += 1
+                    self._emit("missing", current_destination, None)
+                except (shutil.Error, OSError) as e:
+                    self.err_count += 1
+                    self._emit("error", current_destination, str(e))
+                else:
+                    self.moved_count += 1
+                    self._journal({"op": "undo", "src": file_to_move, "dst": current_destination})
+                    self._emit("moved", current_destination, file_to_move)
+        finally:
+            if self.journal:
+                self.journal.close()
+
+    def _journal(self, record, sync=False):
+        if self.journal:
+            self.journal.write(record, sync=sync)
+
+
+class ArchiveVerificationError(Exception):
+    pass
+
+
+class ArchiveMover(FileMover):
+    ARCHIVE_FORMATS = (".7z", ".zip")
+
+    def __init__(self, destination, archive_path, journal=None, report=None, stat_cache=None, throttle=None, max_workers=8, buffer_limit=64 * 1024 * 1024, read_ahead_limit=256 * 1024 * 1024):
+        """Packs files into one .7z or .zip archive, verifies it and only then deletes the sources."""
+        super().__init__(destination, journal, report, stat_cache, throttle)
+        self.archive_path = archive_path
+        self.writes_to_folder = False
+        self.max_workers = max_workers  # Files read ahead in parallel while the archive is written sequentially
+        self.buffer_limit = buffer_limit  # Larger files are not read ahead but streamed into the archive
+        self.read_ahead_limit = read_ahead_limit  # Bytes held by the files read ahead at once
+
+    @classmethod
+    def dated_archive_path(cls, destination, extension):
+        """Returns a new archive path in the destination directory named after the current date and time, numbered if it already exists."""
+        base = os.path.join(destination, f"FileShift_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        archive_path = base + extension
+        number = 1
+        while os.path.exists(archive_path):
+            number += 1
+            archive_path = f"{base}_{number}{extension}"
+        return archive_path
+
+    def member_name(self, current_destination):
+        """Returns the archive member name of a destination path, e.g. lib/filename.jar."""
+        return os.path.relpath(current_destination, self.destination).replace("\\", "/")
+
+    def move(self, entries):
+        """Packs all entries, verifies the archive and deletes the packed sources, journaling each step."""
+        try:
+            self._journal({"op": "archive", "path": self.archive_path}, sync=True)
+            packed = self._pack(entries)
+            self._journal({"op": "verified"}, sync=True)
+            self._delete_sources(packed)
+            self._journal({"op": "end"}, sync=True)
+        except ArchiveVerificationError as e:
+            # No source has been deleted yet, the failed archive is left for inspection
+            self.err_count += 1
+            self._journal({"op": "error", "src": self.archive_path, "error": str(e)}, sync=True)
+            self._emit("error", self.archive_path, f"Archive verification failed, no files have been deleted: {e}")
+        finally:
+            if self.journal:
+                self.journal.close()
+
+    def _read_ahead(self, file_to_move):
+        file_stat = os.stat(file_to_move)
+        if file_stat.st_size > self.buffer_limit:
+            return file_stat, None
+        with open(file_to_move, "rb") as f:
+            return file_stat, f.read()
+
+    def _pack(self, entries):
+        packed = {}  # Source -> (member name, size, mtime_ns) as read while packing
+        pending = deque()
+        remaining = iter(entries)
+        waiting = None  # Next entry and its expected size, waiting for room in the read-ahead budget
+        buffered = 0  # Expected bytes of the pending read-aheads
+        archive = None  # Opened with the first file that could be read, no archive is created if every source is missing
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, ExitStack() as stack:
+            def fill():
+                nonlocal waiting, buffered
+                while len(pending) < self.max_workers * 2:
+                    if waiting is None:
+                        entry = next(remaining, None)
+                        if entry is None:
+                            return
+                        file_stat = self.stat_cache.stat(entry[0])
+                        size = file_stat.st_size if file_stat is not None and file_stat.st_size <= self.buffer_limit else 0
+                        waiting = (entry[0], entry[1], size)
+                    file_to_move, current_destination, size = waiting
+                    if pending and buffered + size > self.read_ahead_limit:
+                        return
+                    pending.append((file_to_move, current_destination, size, executor.submit(self._read_ahead, file_to_move)))
+                    buffered += size
+                    waiting = None
+
+            # Small files are read concurrently from the source share, the archive itself is one sequential write
+            fill()
+            while pending:
+                file_to_move, current_destination, size, future = pending.popleft()
+                buffered -= size
+                try:
+                    file_stat, data = future.result()
+                    if archive is None:
+                        # "x" never overwrites an existing archive, its sources may already be deleted
+                        os.makedirs(os.path.dirname(self.archive_path) or ".", exist_ok=True)
+                        archive = stack.enter_context(self._open_archive("x"))
+                    member = self.member_name(current_destination)
+                    self.throttle.operation()
+                    self.throttle.bandwidth.consume(file_stat.st_size)
+                    started = time.perf_counter()
+                    self._write_member(archive, file_to_move, member, file_stat, data)
+                    self.throttle.measure(time.perf_counter() - started)
+                except FileNotFoundError:
+                    self.warn_count += 1
+                    self._journal({"op": "missing", "src": file_to_move})
+                    self._emit("missing", file_to_move, None)
+                except OSError as e:
+                    self.err_count += 1
+                    self._journal({"op": "error", "src": file_to_move, "error": str(e)})
+                    self._emit("error", file_to_move, str(e))
+                else:
+                    packed[file_to_move] = (member, file_stat.st_size, file_stat.st_mtime_ns)
+                    self._journal({"op": "packed", "src": file_to_move, "dst": member, "size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns})
+                fill()
+        if archive is not None:
+            self._verify(packed)
+        return packed
+
+    def _open_archive(self, mode):
+        if self.archive_path.lower().endswith(".zip"):
+            return zipfile.ZipFile(self.archive_path, mode, compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+        return py7zr.SevenZipFile(self.archive_path, mode)
+
+    def _write_member(self, archive, file_to_move, member, file_stat, data):
+        if self.archive_path.lower().endswith(".zip"):
+            if data is None:
+                archive.write(file_to_move, member)
+            else:
+                info = zipfile.ZipInfo(member, date_time=time.localtime(file_stat.st_mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, data)
+        elif data is None:
+            archive.write(file_to_move, member)
+        else:
+            archive.writef(io.BytesIO(data), member)
+
+    def _verify(self, packed):
+        """Re-reads the archive, checks every CRC and compares the members with the packed files."""
+        if self.archive_path.lower().endswith(".zip"):
+            with self._open_archive("r") as archive:
+                bad_member = archive.testzip()
+                sizes = {info.filename: info.file_size for info in archive.infolist()}
+        else:
+            # py7zr needs a fresh handle for every pass over the archive
+            with self._open_archive("r") as archive:
+                sizes = {info.filename: info.uncompressed for info in archive.list()}
+            with self._open_archive("r") as archive:
+                bad_member = archive.testzip()
+        if bad_member is not None:
+            raise ArchiveVerificationError(f"{bad_member} is corrupt in {self.archive_path}")
+        for member, size, _ in packed.values():
+            if sizes.get(member) != size:
+                raise ArchiveVerificationError(f"{member} is missing or incomplete in {self.archive_path}")
+
+    def _delete_sources(self, packed):
+        for file_to_move, (member, size, mtime_ns) in packed.items():
+            current_destination = f"{self.archive_path}::{member}"
+            try:
+                file_stat = os.stat(file_to_move)
+                if file_stat.st_size != size or file_stat.st_mtime_ns != mtime_ns:
+                    # The file changed after it was packed, deleting it would lose the change
+                    raise OSError(f"{file_to_move} changed after it was packed and has been kept")
+                self.throttle.operation()
+                os.remove(file_to_move)
+                self.stat_cache.discard(file_to_move)
+            except FileNotFoundError:
+                self.warn_count += 1
+                self._journal({"op": "missing", "src": file_to_move})
+                self._emit("missing", file_to_move, None)
+            except OSError as e:
+                self.err_count += 1
+                self._journal({"op": "error", "src": file_to_move, "error": str(e)})
+                self._emit("error", file_to_move, str(e))
+            else:
+                self.moved_count += 1
+                self.moved_bytes += size
+                self._journal({"op": "done", "src": file_to_move, "dst": current_destination})
+                self._emit("moved", file_to_move, current_destination)
+                self._remove_duplicates(file_to_move, current_destination)
+        self.stat_cache.invalidate(self.archive_path)
+
+    def resume(self, state):
+        """Deletes the remaining sources of a verified archive, an unverified archive is packed again from scratch."""
+        self.duplicates = {primary: [duplicate for duplicate in duplicate_files if duplicate not in state["deduped"]] for primary, duplicate_files in state["duplicates"].items()}
+        self.duplicate_stats = state["duplicate_stats"]
+        for primary, current_destination in state["done"].items():
+            self._remove_duplicates(primary, current_destination)
+        if not state["verified"]:
+            if os.path.exists(self.archive_path):
+                os.remove(self.archive_path)
+            self.move([(src, dst) for src, dst in state["planned"] if src not in state["missing"]])
+            return 0
+        remaining = {src: packed for src, packed in state["packed"].items() if src not in state["done"] and src not in state["missing"]}
+        try:
+            self._delete_sources(remaining)
+            self._journal({"op": "end"}, sync=True)
+        finally:
+            if self.journal:
+                self.journal.close()
+        return len(state["planned"]) - len(remaining)
+
+    def undo(self, state):
+        """Extracts all files recorded as done, and their removed duplicates, back to their source."""
+        try:
+            restores = [(duplicate, current_destination, "restored") for duplicate, current_destination in reversed(list(state["deduped"].items()))]
+            restores += [(file_to_move, current_destination, "moved") for file_to_move, current_destination in reversed(list(state["done"].items()))]
+            restores = [restore for restore in restores if restore[0] not in state["undone"]]
+            if not restores:
+                return
+            members = [split_archive_path(current_destination)[1] for _, current_destination, _ in restores]
+            uses = {}  # Member -> restores still to do, a duplicate shares the member of its primary
+            for member in members:
+                uses[member] = uses.get(member, 0) + 1
+            # Extract next to the archive first, a crash must not leave a truncated file at the source
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(self.archive_path) or None) as temp_dir:
+                try:
+                    extracted = self._extract_members(set(members), temp_dir)
+                except (OSError, zipfile.BadZipFile, py7zr.Bad7zFile) as e:
+                    self.err_count += 1
+                    self._emit("error", self.archive_path, str(e))
+                    return
+                for (file_to_move, current_destination, event), member in zip(restores, members):
+                    uses[member] -= 1
+                    try:
+                        if member not in extracted:
+                            raise KeyError(f"{member} not found in {self.archive_path}")
+                        os.makedirs(os.path.dirname(file_to_move) or ".", exist_ok=True)
+                        if uses[member]:
+                            shutil.copy2(extracted[member], file_to_move)
+                        else:
+                            shutil.move(extracted[member], file_to_move)
+                        self.stat_cache.invalidate(file_to_move)
+                    except (KeyError, OSError) as e:
+                        self.err_count += 1
+                        self._emit("error", current_destination, str(e))
+                    else:
+                        self.moved_count += 1
+                        self._journal({"op": "undo", "src": file_to_move, "dst": current_destination})
+                        if event == "moved":
+                            self._emit("moved", current_destination, file_to_move)
+                        else:
+                            self._emit("restored", file_to_move, current_destination)
+        finally:
+            if self.journal:
+                self.journal.close()
+
+    def _extract_members(self, members, temp_dir):
+        """Extracts the members in one pass over the archive and returns member -> extracted path, a solid 7z block is decompressed only once."""
+        if self.archive_path.lower().endswith(".zip"):
+            with zipfile.ZipFile(self.archive_path) as archive:
+                names = set(archive.namelist())
+                return {member: archive.extract(member, temp_dir) for member in members if member in names}
+        with py7zr.SevenZipFile(self.archive_path, mode="r") as archive:
+            archive.extract(path=temp_dir, targets=list(members))
+        return {member: os.path.join(temp_dir, member) for member in members if os.path.isfile(os.path.join(temp_dir, member))}
+
+
+class HashCache:
+    def __init__(self, filename, max_entries=100000):
+        """Persistent SHA-256 cache keyed by path, size and modification time, so unchanged files are never hashed twice."""
+        self.filename = filename
+        self.max_entries = max_entries
+        self.data = {}  # Normalized path -> [size, mtime_ns, sha256], in the order the files were hashed
+        self.changed = False
+        if os.path.exists(filename):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.data = {}  # A broken cache only costs rehashing
+
+    def get(self, path, file_stat):
+        cached = self.data.get(os.path.normcase(os.path.abspath(path)))
+        if cached and cached[0] == file_stat.st_size and cached[1] == file_stat.st_mtime_ns:
+            return cached[2]
+        return None
+
+    def set(self, path, file_stat, digest):
+        key = os.path.normcase(os.path.abspath(path))
+        self.data.pop(key, None)  # Moves a rehashed file to the end, it is dropped last
+        self.data[key] = [file_stat.st_size, file_stat.st_mtime_ns, digest]
+        self.changed = True
+
+    def save(self):
+        if self.changed:
+            while len(self.data) > self.max_entries:
+                del self.data[next(iter(self.data))]  # Oldest entry first, dicts keep their insertion order
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            with open(self.filename, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            self.changed = False
+
+
+class ContentDeduplicator:
+    def __init__(self, hash_cache, max_workers=8, chunk_size=1024 * 1024):
+        """Finds byte-identical files by hashing them in parallel, only files sharing their size are hashed."""
+        self.hash_cache = hash_cache
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.hashed_count = 0
+        self._lock = threading.Lock()  # hashed_count is incremented by the hashing threads
+
+    def _hash(self, path, file_stat):
+        digest = self.hash_cache.get(path, file_stat)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as f:
+                # hashlib releases the GIL for large chunks, so the threads hash in parallel
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+            self.hash_cache.set(path, file_stat, digest)
+            with self._lock:
+                self.hashed_count += 1
+        return digest
+
+    def find_duplicates(self, paths, stats=None):
+        """Returns {first path: [identical paths]} for every group of byte-identical files, in the order of paths."""
+        stats = stats or {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            missing_stats = [path for path in paths if path not in stats]
+            for path, file_stat in zip(missing_stats, executor.map(lambda path: os.stat(path), missing_stats)):
+                stats[path] = file_stat
+            by_size = {}
+            for path in paths:
+                by_size.setdefault(stats[path].st_size, []).append(path)
+            candidates = [path for group in by_size.values() if len(group) > 1 for path in group]
+            digests = dict(zip(candidates, executor.map(lambda path: self._hash(path, stats[path]), candidates)))
+        self.hash_cache.save()
+        groups = {}
+        for path in candidates:
+            groups.setdefault((stats[path].st_size, digests[path]), []).append(path)
+        duplicates = {}
+        for group in groups.values():
+            if len(group) > 1:
+                duplicates[group[0]] = group[1:]
+        return duplicates
+
+
+class MoveList:
+    def __init__(self, destination_for=None):
+        """Paths to move with interned directories: an entry is a directory index plus a base name, each directory and its destination are stored once."""
+        self.destination_for = destination_for  # FileMover.destination_for, called once per directory
+        self.directories = []  # Source directory as written, with its trailing separator
+        self.source_dirs = []  # os.path.dirname of the paths in each directory
+        self.destination_prefixes = []  # Destination path of each directory without the base name
+        self.destination_dirs = []  # os.path.dirname of the destination paths of each directory
+        self._directory_index = {}  # Directory as written -> index
+        self.entry_directories = array("I")  # Directory index of every entry
+        self.names = []  # Base name of every entry
+        self.duplicates = 0  # Repeated paths skipped by from_lines()
+
+    @staticmethod
+    def split(path):
+        """Splits a path like FileMover.destination_for does: at the last '/' if there is one, otherwise at the last '\\'."""
+        separator = "/" if "/" in path else "\\"
+        position = path.rfind(separator) + 1
+        return path[:position], path[position:]
+
+    @classmethod
+    def from_lines(cls, lines, destination_for=None):
+        """Strips whitespace and quotes from each line and skips repeated paths, keeping the first occurrence."""
+        move_list = cls(destination_for)
+        # Repeated paths are found by name and directory index, spellings of the same directory ('lib/', './lib/') share the
+        # index of the first one. Only names found in several directories get a set of indexes.
+        canonical_indexes = []  # Directory index -> index of the first directory with the same normalized path
+        first_indexes = {}  # Normalized directory -> its first index
+        name_directories = {}  # Case independent name -> canonical index of its first directory
+        more_directories = {}  # Case independent name -> canonical indexes of its other directories
+        for line in lines:
+            file_to_move = line.strip().strip("'\"").strip()
+            if not file_to_move:
+                continue
+            directory, name = cls.split(file_to_move)
+            index = move_list._intern(directory, name, file_to_move)
+            if index == len(canonical_indexes):
+                canonical_indexes.append(first_indexes.setdefault(os.path.normcase(os.path.normpath(directory or ".")), index))
+            canonical_index = canonical_indexes[index]
+            key = os.path.normcase(name)
+            first_index = name_directories.get(key)
+            if first_index is None:
+                name_directories[key] = canonical_index
+            elif first_index == canonical_index:
+                move_list.duplicates += 1
+                continue
+            else:
+                other_indexes = more_directories.setdefault(key, set())
+                if canonical_index in other_indexes:
+                    move_list.duplicates += 1
+                    continue
+                other_indexes.add(canonical_index)
+            move_list.entry_directories.append(index)
+            move_list.names.append(name)
+        return move_list
+
+    def _intern(self, directory, name, file_to_move):
+        index = self._directory_index.get(directory)
+        if index is None:
+            index = self._directory_index[directory] = len(self.directories)
+            destination = self.destination_for(file_to_move) if self.destination_for else name
+            self.directories.append(directory)
+            self.source_dirs.append(os.path.dirname(file_to_move))
+            self.destination_prefixes.append(destination[:len(destination) - len(name)])
+            self.destination_dirs.append(os.path.dirname(destination))
+        return index
+
+    def append(self, file_to_move):
+        directory, name = self.split(file_to_move)
+        self.entry_directories.append(self._intern(directory, name, file_to_move))
+        self.names.append(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """Yields (source, destination) of every entry, the strings are only built here."""
+        directories = self.directories
+        destination_prefixes = self.destination_prefixes
+        for index, name in zip(self.entry_directories, self.names):
+            yield directories[index] + name, destination_prefixes[index] + name
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            # Slices share the directory tables, e.g. to hand parts of a long list to parallel workers
+            return self._subset(self.entry_directories[item], self.names[item])
+        index = self.entry_directories[item]
+        return self.directories[index] + self.names[item], self.destination_prefixes[index] + self.names[item]
+
+    def _subset(self, entry_directories, names):
+        subset = MoveList.__new__(MoveList)
+        subset.__dict__.update(self.__dict__)
+        subset.entry_directories = entry_directories
+        subset.names = names
+        return subset
+
+    def select(self, positions):
+        """Returns the entries at the given positions as a move list sharing the directory tables."""
+        return self._subset(array("I", (self.entry_directories[position] for position in positions)), [self.names[position] for position in positions])
+
+    def by_directory(self):
+        """Returns the entries grouped by directory (in the order the directories first appear), so each directory is visited once."""
+        return self.select(sorted(range(len(self.names)), key=self.entry_directories.__getitem__))
+
+    def used_directories(self):
+        return set(self.entry_directories)
+
+
+class MovePlanner:
+    def __init__(self, mover, max_workers=16, deduplicator=None):
+        """Builds a move plan from a list of paths before any file is touched."""
+        self.mover = mover  # FileMover used to compute the destination paths
+        self.max_workers = max_workers
+        self.deduplicator = deduplicator  # ContentDeduplicator, byte-identical files are only moved once when set
+
+    def _existing_device(self, directory):
+        # Walk up until a directory that exists is found, used for the device of directories that will be created
+        directory = os.path.abspath(directory)
+        while True:
+            device = self.mover.stat_cache.device(directory)
+            parent = os.path.dirname(directory)
+            if device is not None or parent == directory:
+                return device
+            directory = parent
+
+    def plan(self, lines):
+        """Returns the plan as a dictionary with the movable entries, the problems found and the totals."""
+        move_list = MoveList.from_lines(lines, self.mover.destination_for).by_directory()
+        stat_cache = self.mover.stat_cache
+        used_directories = move_list.used_directories()
+        source_dirs = {os.path.abspath(move_list.source_dirs[index]) for index in used_directories}
+        destination_dirs = sorted({os.path.abspath(move_list.destination_dirs[index]) for index in used_directories})
+
+        # Read every involved directory once and concurrently, each stat is a round trip on network shares
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(stat_cache.listing, source_dirs | set(destination_dirs)))
+            list(executor.map(stat_cache.device, source_dirs))
+        existing_dirs = {directory for directory in destination_dirs if stat_cache.listing(directory) is not None}
+
+        plan = {
+            "entries": None,
+            "missing": [],
+            "collisions": {},
+            "existing": [],
+            "missing_parents": [],
+            "duplicates": move_list.duplicates,
+            "total_bytes": 0,
+            "renames": 0,
+            "cross_device": 0,
+            "content_duplicates": {},
+            "duplicate_stats": {},
+            "duplicate_bytes": 0,
+        }
+        claimed = {}
+        renamed = set()
+        selected = []  # Positions of the movable entries in move_list
+        for position, (src, dst) in enumerate(move_list):
+            source_stat = stat_cache.stat(src)
+            if source_stat is None:
+                plan["missing"].append(src)
+                continue
+            key = os.path.normcase(os.path.normpath(dst))
+            if key in claimed:
+                # Two sources with the same parent folder and file name would end up at the same destination
+                plan["collisions"].setdefault(dst, [claimed[key]]).append(src)
+                continue
+            claimed[key] = src
+            if not self.mover.writes_to_folder:
+                # Packed into an archive, nothing is renamed or created in the destination directory
+                selected.append(position)
+                plan["total_bytes"] += source_stat.st_size
+                plan["cross_device"] += 1
+                continue
+            if stat_cache.entry(dst) is not None:
+                plan["existing"].append((src, dst))
+                continue
+            selected.append(position)
+            plan["total_bytes"] += source_stat.st_size
+            directory = move_list.entry_directories[position]
+            destination_device = self._existing_device(move_list.destination_dirs[directory])
+            if destination_device is not None and destination_device == stat_cache.device(move_list.source_dirs[directory]):
+                plan["renames"] += 1
+                renamed.add(src)
+            else:
+                plan["cross_device"] += 1
+        plan["entries"] = move_list.select(selected)
+        if self.deduplicator:
+            self._collapse_duplicates(plan, renamed)
+        if self.mover.writes_to_folder:
+            plan["missing_parents"] = sorted({os.path.abspath(plan["entries"].destination_dirs[index]) for index in plan["entries"].used_directories()} - existing_dirs)
+        return plan
+
+    @staticmethod
+    def conflicts(plan):
+        """Yields a message per destination conflict of the plan, the files named in it are not moved."""
+        for current_destination, sources in plan["collisions"].items():
+            yield f"COLLISION: {', '.join(sources)} would all be moved to {current_destination}, only the first one is moved."
+        for file_to_move, current_destination in plan["existing"]:
+            yield f"EXISTS: {current_destination} already exists, skipping {file_to_move}."
+
+    def _collapse_duplicates(self, plan, renamed):
+        # Keep the first file of every identical group in the plan, the others are deleted after it was moved
+        stat_cache = self.mover.stat_cache
+        stats = {src: stat_cache.stat(src) for src, _ in plan["entries"]}
+        plan["content_duplicates"] = self.deduplicator.find_duplicates([src for src, _ in plan["entries"]], stats)
+        removed = {duplicate for duplicate_files in plan["content_duplicates"].values() for duplicate in duplicate_files}
+        if removed:
+            plan["duplicate_stats"] = {duplicate: (stats[duplicate].st_size, stats[duplicate].st_mtime_ns) for duplicate in removed}
+            plan["entries"] = plan["entries"].select([position for position, (src, _) in enumerate(plan["entries"]) if src not in removed])
+            plan["duplicate_bytes"] = sum(stats[duplicate].st_size for duplicate in removed)
+            plan["total_bytes"] -= plan["duplicate_bytes"]
+            plan["renames"] -= len(removed & renamed)
+            plan["cross_device"] -= len(removed - renamed)
+
+
+class FolderWatcher:
+    def __init__(self, watches, state_path, journal_dir, actions, log, poll_interval=5, debounce=10, queue_size=100, process_existing=False, encoding_policy=None, path_rewriter=None,
+                 move_throttle=None):
+        """Polls log directories and runs a cleanup action plus a move on new log lines, with one worker thread per destination volume."""
+        for watch in watches:
+            if not watch.get("path") or not watch.get("destination"):
+                raise ValueError(f"The watch {watch} needs a 'path' and a 'destination'")
+            if watch.get("action", "") not in actions:
+                raise ValueError(f"The action '{watch.get('action', '')}' of the watch on {watch['path']} does not exist")
+        self.watches = watches  # [{"path", "pattern", "action", "destination"}]
+        self.state_path = state_path  # JSON file with the processed size of every log, so a restart continues where it stopped
+        self.journal_dir = journal_dir
+        self.actions = actions  # Action name -> search_pattern, remove_phrases, find_text, replace_text
+        self.log = log  # Callback receiving (message, level)
+        self.poll_interval = poll_interval
+        self.debounce = debounce  # Seconds a log must stay unchanged before it is processed, the patch installer writes in bursts
+        self.queue_size = queue_size
+        self.encoding_policy = encoding_policy or EncodingPolicy()
+        self.path_rewriter = path_rewriter
+        self.move_throttle = move_throttle or {}  # The "move_throttle" section of settings.json
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._candidates = {}  # Log path -> ((size, mtime_ns), first time seen with this signature)
+        self._queued = set()
+        self._workers = {}  # Volume -> (queue, thread)
+        self.offsets = {}
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    self.offsets = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.offsets = {}
+        self._baseline = not process_existing and not self.offsets  # First start: only new lines are processed
+
+    @staticmethod
+    def volume_of(path):
+        """Returns the drive letter or the device of the nearest existing directory of path."""
+        path = os.path.abspath(path)
+        drive = os.path.splitdrive(path)[0]
+        if drive:
+            return drive.upper()
+        while not os.path.exists(path) and os.path.dirname(path) != path:
+            path = os.path.dirname(path)
+        return os.stat(path).st_dev
+
+    def poll(self):
+        """Scans every watched directory once and queues the logs that have been stable for the debounce time."""
+        now = time.monotonic()
+        for watch in self.watches:
+            try:
+                with os.scandir(watch["path"]) as entries:
+                    logs = [(entry.path, entry.stat()) for entry in entries if entry.is_file() and fnmatch.fnmatch(entry.name.lower(), watch.get("pattern", "*.log").lower())]
+            except OSError as e:
+                self.log(f"ERROR: Cannot read {watch['path']}: {e}", "error")
+                continue
+            for log_path, log_stat in logs:
+                with self._lock:
+                    if self._baseline:
+                        self.offsets.setdefault(log_path, log_stat.st_size)
+                        continue
+                    if self.offsets.get(log_path) == log_stat.st_size or log_path in self._queued:
+                        continue
+                signature = (log_stat.st_size, log_stat.st_mtime_ns)
+                previous = self._candidates.get(log_path)
+                if previous is None or previous[0] != signature:
+                    self._candidates[log_path] = (signature, now)
+                elif now - previous[1] >= self.debounce:
+                    self._enqueue(log_path, watch)
+        if self._baseline:
+            self._baseline = False
+            self.save_state()
+
+    def _enqueue(self, log_path, watch):
+        volume = self.volume_of(watch["destination"])
+        if volume not in self._workers:
+            work_queue = queue.Queue(maxsize=self.queue_size)
+            thread = threading.Thread(target=self._work, args=(work_queue,), name=f"watch-worker-{volume}", daemon=True)
+            thread.start()
+            self._workers[volume] = (work_queue, thread)
+        try:
+            self._workers[volume][0].put_nowait((log_path, watch))
+        except queue.Full:
+            # Keep the candidate, it is queued again by one of the next polls
+            self.log(f"WARN: The work queue for {volume} is full, {log_path} is processed later.", "warning")
+            return
+        with self._lock:
+            self._queued.add(log_path)
+        del self._candidates[log_path]
+
+    def _work(self, work_queue):
+        while True:
+            job = work_queue.get()
+            if job is None:
+                return
+            log_path, watch = job
+            try:
+                self.process(log_path, watch)
+            except Exception as e:
+                self.log(f"ERROR: Processing {log_path} failed: {e}", "error")
+            finally:
+                with self._lock:
+                    self._queued.discard(log_path)
+
+    def read_new_lines(self, log_path):
+        """Returns the complete lines (undecoded) appended since the last run and the offset after them, a shrunken log is read again."""
+        with self._lock:
+            offset = self.offsets.get(log_path, 0)
+        with open(log_path, "rb") as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0  # The log was replaced or truncated
+            f.seek(offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]  # A line still being written is left for the next run
+        return complete.splitlines(), offset + len(complete)
+
+    def process(self, log_path, watch):
+        """Runs the configured action on the new lines of a log and moves the resulting paths, journaled like a manual move."""
+        action = self.actions[watch["action"]]  # Checked when the watcher is created
+        lines, offset = self.read_new_lines(log_path)
+        pipeline = TextPipeline(action["search_pattern"], action["remove_phrases"], action["find_text"], action["replace_text"], path_rewriter=self.path_rewriter)
+        paths = [line.replace("'", "") for line in pipeline.run_bytes(lines, self.encoding_policy)]
+        if paths:
+            destination = watch["destination"]
+            mover = FileMover(destination, MoveJournal.create(self.journal_dir, destination), self._report, throttle=IOThrottle.from_config(self.move_throttle))
+            with low_io_priority(self.move_throttle.get("low_io_priority", False)):
+                plan = MovePlanner(mover).plan(paths)
+                for message in MovePlanner.conflicts(plan):
+                    self.log(f"WARN: {message}", "warning")
+                mover.journal.record_plan(plan["entries"])
+                mover.mark_missing(plan["missing"])
+                mover.move(plan["entries"])
+            self.log(f"{log_path}: moved {mover.moved_count} of {len(paths)} files to {destination}, {mover.warn_count} not found, {mover.err_count} failed.",
+                     "error" if mover.err_count else "info")
+        with self._lock:
+            self.offsets[log_path] = offset
+        self.save_state()
+
+    def _report(self, event, file_to_move, detail):
+        if event == "moved":
+            self.log(f"Moved {file_to_move} to {detail}", "info")
+        elif event == "missing":
+            self.log(f"WARN: {file_to_move} not found, skipping.", "warning")
+        elif event == "error":
+            self.log(f"ERROR: {detail}", "error")
+
+    def save_state(self):
+        # Held through the replace, the workers of all volumes share the temporary file
+        with self._lock:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            temp_path = self.state_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.offsets, f, indent=4)
+            os.replace(temp_path, self.state_path)
+
+    def run(self):
+        """Polls until stop() is called, then lets the workers finish their queued logs."""
+        try:
+            while not self.stop_event.is_set():
+                self.poll()
+                self.stop_event.wait(self.poll_interval)
+        finally:
+            for work_queue, thread in self._workers.values():
+                work_queue.put(None)
+            for work_queue, thread in self._workers.values():
+                thread.join()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class AgentError(Exception):
+    """Error reported by a FileShift agent, or a failed connection to it."""
+
+
+class AgentRequestHandler(socketserver.StreamRequestHandler):
+    MAX_TOKEN_BYTES = 4096  # Read before the client is authenticated
+    MAX_REQUEST_BYTES = 64 * 1024 * 1024  # A move request carries the path list, everything else is small
+    HEARTBEAT_SECONDS = 10  # Below the client timeout, so a long search or move without output keeps the connection
+
+    def handle(self):
+        """Reads the token line and one JSON request line, then answers with JSON lines: progress events and a final result or error."""
+        self.disconnected = False
+        self._send_lock = threading.Lock()
+        agent = self.server
+        try:
+            token = self.rfile.readline(self.MAX_TOKEN_BYTES).rstrip(b"\r\n")
+            if not hmac.compare_digest(token, agent.token.encode()):
+                raise PermissionError("Invalid agent token")
+            line = self.rfile.readline(self.MAX_REQUEST_BYTES)
+            request = json.loads(line.decode("utf-8"))
+            if not isinstance(request, dict):
+                raise ValueError("The request must be a JSON object")
+            command = request.get("command")
+            handler = getattr(self, f"command_{command}", None) if isinstance(command, str) else None
+            if handler is None:
+                raise ValueError(f"Unknown command '{command}'")
+            agent.log(f"{self.client_address[0]}: {command}", "info")
+            stop_heartbeat = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(stop_heartbeat,), daemon=True).start()
+            try:
+                result = handler(request)
+            finally:
+                stop_heartbeat.set()
+            self.send(dict(result, event="result"))
+        except Exception as e:
+            agent.log(f"ERROR: Request from {self.client_address[0]} failed: {e}", "error")
+            self.send({"event": "error", "message": str(e)})
+
+    def _heartbeat(self, stop):
+        while not stop.wait(self.HEARTBEAT_SECONDS):
+            self.send({"event": "heartbeat"})
+
+    def send(self, message):
+        if self.disconnected:
+            return
+        try:
+            with self._send_lock:
+                self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except OSError:
+            # The work continues without the client, a move has to finish (or stay resumable) either way
+            self.disconnected = True
+
+    def command_ping(self, request):
+        return {"version": FileShiftAgent.PROTOCOL_VERSION, "host": socket.gethostname()}
+
+    def command_dates(self, request):
+        """Returns the distinct dates and the statistics of a log on the agent, read as a stream."""
+        file_path = self.server.check_path(request["path"])
+        date_pattern = re.compile(rb"(\d{2})([.-])(\d{2})\2(\d{4}|\d{2})")
+        dates = set()
+        with open_log_binary_stream(file_path) as stream:
+            for raw in stream:
+                match = date_pattern.match(raw)
+                if match:
+                    dates.add(match.group(0).decode("ascii"))
+        dates = [date for date in dates if LogIndex.parse_timestamp(date) is not None]
+        return {"dates": sorted(dates, key=LogIndex.parse_timestamp), "statistics": self.server.file_statistics.stats(file_path)}
+
+    def command_run(self, request):
+        """Runs the search and cleanup on a log on the agent and streams the resulting lines in batches."""
+        file_path = self.server.check_path(request["path"])
+        pipeline = TextPipeline(request.get("search_pattern", ""), request.get("remove_phrases", ""), request.get("find_text", ""), request.get("replace_text", ""), request.get("date", ""),
+                                PrefixRewriter.from_config(request.get("path_rules") or {}))
+        batch = []
+        total = 0
+        for line in pipeline.run_file(file_path, self.server.encoding_policy):
+            batch.append(line)
+            if len(batch) >= self.server.batch_lines:
+                self.send({"event": "lines", "lines": batch})
+                total += len(batch)
+                batch = []
+                if self.disconnected:
+                    raise ConnectionError("The client disconnected")
+        if batch:
+            self.send({"event": "lines", "lines": batch})
+            total += len(batch)
+        return {"total": total}
+
+    def command_move(self, request):
+        """Moves files on the agent, journaled in the agent's journal directory, and streams the progress events."""
+        destination = self.server.check_path(request["destination"])
+        paths = [line.replace("'", "").strip() for line in request["paths"] if line.strip()]
+        for path in paths:
+            self.server.check_path(path)
+        counts = {"moved": 0}
+
+        def report(event, file_to_move, detail):
+            if event == "moved":
+                counts["moved"] += 1
+            self.send({"event": event, "file": file_to_move, "detail": detail, "moved": counts["moved"], "total": len(plan["entries"])})
+
+        throttle_config = self.server.move_throttle
+        mover = FileMover(destination, MoveJournal.create(self.server.journal_dir, destination), report, throttle=IOThrottle.from_config(throttle_config))
+        with low_io_priority(throttle_config.get("low_io_priority", False)):
+            plan = MovePlanner(mover).plan(paths)
+            for message in MovePlanner.conflicts(plan):
+                self.server.log(f"WARN: {message}", "warning")
+                self.send({"event": "conflict", "file": None, "detail": message, "moved": 0, "total": len(plan["entries"])})
+            mover.journal.record_plan(plan["entries"])
+            mover.mark_missing(plan["missing"])
+            mover.move(plan["entries"])
+        self.server.log(f"Moved {mover.moved_count} of {len(paths)} files to {destination}, {mover.warn_count} not found, {mover.err_count} failed.",
+                        "error" if mover.err_count else "info")
+        return {
+            "moved": mover.moved_count,
+            "missing": mover.warn_count,
+            "failed": mover.err_count,
+            "skipped": sum(len(sources) - 1 for sources in plan["collisions"].values()) + len(plan["existing"]),
+            "bytes": mover.moved_bytes,
+        }
+
+
+class FileShiftAgent(socketserver.ThreadingTCPServer):
+    PROTOCOL_VERSION = 2  # 2: the token is sent on its own line before the request
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, token, journal_dir, log, allowed_roots=(), encoding_policy=None, file_statistics=None, batch_lines=5000, move_throttle=None):
+        """Runs the log pipeline and moves next to the data for a remote FileShift window, one JSON lines request per TCP connection."""
+        host = address[0]
+        if not token and host not in ("127.0.0.1", "::1", "localhost"):
+            raise ValueError("An agent listening on other addresses than localhost needs a token")
+        self.token = token
+        self.journal_dir = journal_dir
+        self.log = log  # Callback receiving (message, level)
+        self.allowed_roots = [os.path.normcase(os.path.realpath(root)) for root in allowed_roots]  # Empty allows every path
+        self.encoding_policy = encoding_policy or EncodingPolicy()
+        self.file_statistics = file_statistics or FileStatistics()
+        self.batch_lines = batch_lines
+        self.move_throttle = move_throttle or {}  # The "move_throttle" section of settings.json
+        super().__init__(address, AgentRequestHandler)
+
+    def check_path(self, path):
+        """Returns the absolute path, or raises PermissionError if it (or the target of a symlink in it) is outside the allowed roots."""
+        absolute = os.path.abspath(split_archive_path(path)[0])
+        if self.allowed_roots:
+            normalized = os.path.normcase(os.path.realpath(absolute))
+            if not any(normalized == root or normalized.startswith(root.rstrip(os.sep) + os.sep) for root in self.allowed_roots):
+                raise PermissionError(f"'{path}' is outside the directories this agent serves")
+        return path if split_archive_path(path)[1] else absolute
+
+
+class AgentClient:
+    def __init__(self, host, port, token="", timeout=30):
+        """Client of a FileShift agent, every request opens its own connection."""
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout = timeout  # Seconds without any message (the agent sends heartbeats while it works) before the request fails
+
+    def request(self, command, on_message=None, **params):
+        """Sends a request and returns its result, the messages before it (lines, progress) are passed to on_message."""
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as connection:
+                connection.sendall(self.token.encode("utf-8") + b"\n" + json.dumps(dict(params, command=command)).encode("utf-8") + b"\n")
+                with connection.makefile("rb") as stream:
+                    for line in stream:
+                        message = json.loads(line.decode("utf-8"))
+                        if message.get("event") == "result":
+                            return message
+                        if message.get("event") == "error":
+                            raise AgentError(message.get("message", "Unknown agent error"))
+                        if on_message and message.get("event") != "heartbeat":
+                            on_message(message)
+        except OSError as e:
+            raise AgentError(f"Connection to the agent {self.host}:{self.port} failed: {e}") from e
+        raise AgentError(f"The agent {self.host}:{self.port} closed the connection without a result")
+
+    def ping(self):
+        return self.request("ping")
+
+    def dates(self, path):
+        return self.request("dates", path=path)
+
+    def run(self, path, action, date="", on_lines=None):
+        """Returns the resulting lines of an action on a log on the agent."""
+        lines = []
+
+        def collect(message):
+            if message.get("event") == "lines":
+                lines.extend(message["lines"])
+                if on_lines:
+                    on_lines(len(lines))
+
+        self.request("run", collect, path=path, date=date, **{key: action.get(key, "") for key in ("search_pattern", "remove_phrases", "find_text", "replace_text", "path_rules")})
+        return lines
+
+    def move(self, paths, destination, on_progress=None):
+        return self.request("move", on_progress, paths=paths, destination=destination)
+
+
+ARCHIVE_EXTENSIONS = (".zip", ".7z")
+COMPRESSED_EXTENSIONS = (".gz", ".bz2")
+
+
+def split_archive_path(file_path):
+    """Splits 'archive.zip::member.log' into the archive path and the member name (None for other files)."""
+    if "::" in file_path:
+        archive_path, member = file_path.split("::", 1)
+        return archive_path, member
+    return file_path, None
+
+
+def log_file_suffix(file_path):
+    """Returns the suffix of the log itself, e.g. '.log' for 'patch.log.gz' or 'logs.7z::patch.log'."""
+    archive_path, member = split_archive_path(file_path)
+    path = Path(member or archive_path)
+    if path.suffix.lower() in COMPRESSED_EXTENSIONS:
+        path = path.with_suffix("")
+    return path.suffix.lower()
+
+
+def list_archive_members(archive_path):
+    """Returns the names of the files in a .zip or .7z archive."""
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            return [info.filename for info in archive.infolist() if not info.is_dir()]
+    with py7zr.SevenZipFile(archive_path, mode="r") as archive:
+        return [info.filename for info in archive.list() if not info.is_directory]
+
+
+class _SevenZipMemberWriter(py7zr.io.Py7zIO):
+    def __init__(self, chunks, cancelled):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.written = 0
+
+    def write(self, s):
+        # Block while the reader is behind, so at most the queue size is held in memory
+        while True:
+            if self.cancelled.is_set():
+                raise EOFError("Reading of the archive member has been cancelled.")
+            try:
+                self.chunks.put(bytes(s), timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self.written += len(s)
+        return len(s)
+
+    def read(self, size=None):
+        return b""
+
+    def seek(self, offset, whence=0):
+        return 0
+
+    def flush(self):
+        pass
+
+    def size(self):
+        return self.written
+
+
+class _SevenZipMemberFactory(py7zr.io.WriterFactory):
+    def __init__(self, member, chunks, cancelled):
+        self.member = member
+        self.chunks = chunks
+        self.cancelled = cancelled
+
+    def create(self, filename):
+        if filename == self.member:
+            return _SevenZipMemberWriter(self.chunks, self.cancelled)
+        return py7zr.io.NullIO()
+
+
+class SevenZipMemberReader(io.RawIOBase):
+    def __init__(self, archive_path, member, max_chunks=16):
+        """Binary stream of one .7z member, decompressed by a background thread into a bounded queue."""
+        self.chunks = queue.Queue(maxsize=max_chunks)
+        self.cancelled = threading.Event()
+        self.pending = b""
+        self.finished = False
+        self.thread = threading.Thread(target=self._extract, args=(archive_path, member), daemon=True)
+        self.thread.start()
+
+    def _extract(self, archive_path, member):
+        try:
+            with py7zr.SevenZipFile(archive_path, mode="r") as archive:
+                archive.extract(targets=[member], factory=_SevenZipMemberFactory(member, self.chunks, self.cancelled))
+            result = None
+        except Exception as ex:
+            result = ex
+        if not self.cancelled.is_set():
+            self.chunks.put(result)  # None marks the end of the member, an exception is raised by the reader
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending and not self.finished:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.finished = True
+            elif isinstance(chunk, Exception):
+                self.finished = True
+                raise chunk
+            else:
+                self.pending = chunk
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.cancelled.set()
+            # Unblock the extraction thread if it is waiting for free space in the queue
+            while not self.chunks.empty():
+                self.chunks.get_nowait()
+        super().close()
+
+
+def open_log_binary_stream(file_path):
+    """Opens a plain, .gz, .bz2, .zip or .7z log as binary stream without extracting or decompressing it as a whole."""
+    archive_path, member = split_archive_path(file_path)
+    lower_path = archive_path.lower()
+    if lower_path.endswith(".gz"):
+        return gzip.open(archive_path, "rb")
+    if lower_path.endswith(".bz2"):
+        return bz2.open(archive_path, "rb")
+    if lower_path.endswith(ARCHIVE_EXTENSIONS):
+        member = member or list_archive_members(archive_path)[0]
+        if lower_path.endswith(".zip"):
+            # The archive file stays open until the member stream is closed
+            with zipfile.ZipFile(archive_path) as archive:
+                return archive.open(member)
+        return io.BufferedReader(SevenZipMemberReader(archive_path, member), buffer_size=1024 * 1024)
+    return open(archive_path, "rb")
+
+
+def open_log_stream(file_path, encoding=None, errors=None):
+    """Opens a plain, .gz, .bz2, .zip or .7z log as text stream without extracting or decompressing it as a whole."""
+    if split_archive_path(file_path)[0].lower().endswith(COMPRESSED_EXTENSIONS + ARCHIVE_EXTENSIONS):
+        return io.TextIOWrapper(open_log_binary_stream(file_path), encoding=encoding, errors=errors)
+    return open(file_path, "r", encoding=encoding, errors=errors)
+
+
+class EncodingPolicy:
+    def __init__(self, encoding="utf-8", fallback_encoding="cp1252", errors="replace"):
+        """Decodes log bytes with the encoding and falls back per line, so single Windows-1252 lines in a UTF-8 log do not abort the load."""
+        self.encoding = encoding
+        self.fallback_encoding = fallback_encoding
+        self.errors = errors  # Error handler of the fallback encoding, "strict" raises on bytes it cannot decode either
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.get("encoding", "utf-8"),
+            config.get("fallback_encoding", "cp1252"),
+            config.get("errors", "replace"),
+        )
+
+    def decode(self, raw):
+        try:
+            return raw.decode(self.encoding)
+        except UnicodeDecodeError:
+            return raw.decode(self.fallback_encoding, self.errors)
+
+    def decode_text(self, data):
+        """Decodes a whole file, only the lines that are not valid in the encoding are decoded with the fallback."""
+        if data.startswith(b"\xef\xbb\xbf"):
+            data = data[3:]
+        try:
+            return data.decode(self.encoding)
+        except UnicodeDecodeError:
+            return "".join(self.decode(line) for line in data.splitlines(keepends=True))
+
+
+def read_log_text(file_path, encoding_policy):
+    """Reads a whole log as text, decoded with the encoding policy."""
+    with open_log_binary_stream(file_path) as stream:
+        return encoding_policy.decode_text(stream.read())
+
+
+class LogIndex:
+    # Date (DD.MM.YYYY, DD-MM-YYYY, DD.MM.YY or DD-MM-YY) with optional time at the start of a line
+    DATE_PATTERN = re.compile(r"(\d{2})([.-])(\d{2})\2(\d{4}|\d{2})(?: (\d{2}):(\d{2}):(\d{2})(\s*))?")
+
+    def __init__(self, text):
+        """Parsed log: line offsets, epoch timestamps and timestamp lengths as compact arrays, built once per file.
+        The decoded text stays resident next to the arrays, the views and searches slice it by line offset."""
+        self.text = text
+        self.line_offsets = array("q")  # Start of every line in text, plus the end of the text
+        self.dated_lines = array("l")  # Numbers of the lines starting with a date
+        self.timestamps = array("d")  # Epoch timestamp of each dated line
+        self.date_lengths = array("B")  # Length of the date part of each dated line, e.g. 8 for 14.03.19
+        self.strip_lengths = array("B")  # Length of the 'DD.MM.YY HH:MM:SS ' prefix removed by the search, per line
+        self.is_sorted = True
+        self._parse()
+
+    ARRAYS = ("line_offsets", "dated_lines", "timestamps", "date_lengths", "strip_lengths")
+    FORMAT_VERSION = 2  # 2: naive UTC epochs instead of local time
+
+    @property
+    def text(self):
+        """The decoded log, read on first use for an index loaded with a text loader (see load)."""
+        if self._text is None:
+            text = self._text_loader()
+            if len(text) != self.text_length:
+                self.__init__(text)  # Decoded differently than when the index was saved (e.g. another encoding), parse it again
+            else:
+                self.text = text
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        self._text_loader = None
+        self.text_length = len(text)
+
+    @classmethod
+    def build(cls, stream):
+        """Reads the whole stream, the index keeps the text, see __init__."""
+        return cls(stream.read())
+
+    def save(self, index_path, fingerprint):
+        """Writes the parsed arrays to a file, so the same unchanged log can be loaded without parsing it again."""
+        header = {
+            "version": self.FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "text_length": self.text_length,
+            "is_sorted": self.is_sorted,
+            "arrays": {name: [getattr(self, name).typecode, getattr(self, name).itemsize, len(getattr(self, name))] for name in self.ARRAYS},
+        }
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for name in self.ARRAYS:
+                getattr(self, name).tofile(f)
+        os.replace(temp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path, text, fingerprint):
+        """Returns the index saved for the log with this fingerprint and text, or None if it is missing or belongs to another state of the log.
+        text can also be a function returning it, which is only called once the text is used, e.g. not for the dates."""
+        try:
+            with open(index_path, "rb") as f:
+                header = json.loads(f.readline().decode("utf-8"))
+                if header.get("version") != cls.FORMAT_VERSION or header["fingerprint"] != fingerprint or (not callable(text) and header["text_length"] != len(text)):
+                    return None
+                index = cls.__new__(cls)
+                if callable(text):
+                    index._text = None
+                    index._text_loader = text
+                    index.text_length = header["text_length"]
+                else:
+                    index.text = text
+                index.is_sorted = header["is_sorted"]
+                for name in cls.ARRAYS:
+                    typecode, itemsize, length = header["arrays"][name]
+                    values = array(typecode)
+                    if values.itemsize != itemsize:
+                        return None  # Written on a platform with other C type sizes
+                    values.fromfile(f, length)
+                    setattr(index, name, values)
+            return index
+        except (OSError, EOFError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def to_epoch(day, month, year, hour=0, minute=0, second=0):
+        """Returns the epoch of a date, two digit years follow strptime (69-99 -> 19xx), None for invalid dates.
+        Log times are naive wall clock times, so they are counted as UTC: every day has 86400 seconds, also on DST changes."""
+        if year < 100:
+            year += 1900 if year >= 69 else 2000
+        try:
+            datetime(year, month, day, hour, minute, second)  # Validates the date
+        except ValueError:
+            return None
+        return float(calendar.timegm((year, month, day, hour, minute, second)))
+
+    def _parse(self):
+        text = self.text
+        match_date = self.DATE_PATTERN.match
+        epochs = {}  # Timestamps repeat a lot in patch logs, parse each one only once
+        position = 0
+        line_number = 0
+        text_length = len(text)
+        previous_epoch = float("-inf")
+        while position < text_length:
+            self.line_offsets.append(position)
+            end = text.find("\n", position)
+            if end == -1:
+                end = text_length
+            strip_length = 0
+            match = match_date(text, position, end)
+            if match:
+                prefix = match.group(0)
+                epoch = epochs.get(prefix)
+                if prefix not in epochs:
+                    day, _, month, year, hour, minute, second, _ = match.groups()
+                    epoch = epochs[prefix] = self.to_epoch(int(day), int(month), int(year), int(hour or 0), int(minute or 0), int(second or 0))
+                if epoch is not None:
+                    self.dated_lines.append(line_number)
+                    self.timestamps.append(epoch)
+                    self.date_lengths.append(match.end(4) - position)
+                    if epoch < previous_epoch:
+                        self.is_sorted = False
+                    previous_epoch = epoch
+                    # Same prefix as TextPipeline.TIMESTAMP_PATTERN, which only removes DD.MM.YY HH:MM:SS followed by whitespace
+                    if match.group(2) == "." and len(match.group(4)) == 2 and match.group(8):
+                        strip_length = len(prefix)
+            self.strip_lengths.append(strip_length)
+            position = end + 1
+            line_number += 1
+        self.line_offsets.append(position)  # One past the newline (real or missing) of the last line
+
+    def __len__(self):
+        return len(self.strip_lengths)
+
+    def line(self, line_number):
+        return self.text[self.line_offsets[line_number]:self.line_offsets[line_number + 1] - 1].rstrip("\r")
+
+    def body(self, line_number):
+        """Returns the line without its leading timestamp, a slice instead of a regex substitution."""
+        line = self.line(line_number)
+        return line[self.strip_lengths[line_number]:]
+
+    def dates(self):
+        """Returns the distinct dates of the log as written in it, sorted chronologically."""
+        dates = set()
+        text = self.text  # Read first, a loaded index is parsed again if its text does not fit
+        for line_number, date_length in zip(self.dated_lines, self.date_lengths):
+            start = self.line_offsets[line_number]
+            dates.add(text[start:start + date_length])
+        return sorted(dates, key=self.parse_timestamp)
+
+    @classmethod
+    def parse_timestamp(cls, value):
+        """Parses 'DD.MM.YY[ HH:MM[:SS]]' (or the other supported date formats) into an epoch timestamp."""
+        match = re.fullmatch(r"(\d{2})([.-])(\d{2})\2(\d{4}|\d{2})(?:\s+(\d{2}):(\d{2})(?::(\d{2}))?)?", value.strip())
+        if not match:
+            return None
+        day, _, month, year, hour, minute, second = match.groups()
+        return cls.to_epoch(int(day), int(month), int(year), int(hour or 0), int(minute or 0), int(second or 0))
+
+    def lines_between(self, start, end):
+        """Returns the numbers of the dated lines with start <= timestamp <= end, a binary search for sorted logs."""
+        if self.is_sorted:
+            first = bisect.bisect_left(self.timestamps, start)
+            last = bisect.bisect_right(self.timestamps, end)
+            return self.dated_lines[first:last]
+        return array("l", (line_number for line_number, epoch in zip(self.dated_lines, self.timestamps) if start <= epoch <= end))
+
+    def lines_for_date(self, date_str):
+        start = self.parse_timestamp(date_str)
+        if start is None:
+            return array("l")
+        return self.lines_between(start, start + 86399)
+
+
+class PatchLogParser:
+    # Event kind, first word of the message (checked before the pattern) and the pattern of the Lobster patch installer messages
+    EVENTS = (
+        ("patching_war", "Patching", re.compile(r"Patching WAR (?P<value>\S+) with (?P<detail>.+)$")),
+        ("started", "Patching", re.compile(r"Patching (?:installation files|base classes)")),
+        ("installed", "Installed", re.compile(r"Installed (?P<value>.+)$")),
+        ("marked", "Marking", re.compile(r"Marking file '(?P<value>.+)' to be deleted on exit of JVM")),
+        ("deleted", "Deleted", re.compile(r"Deleted file '(?P<value>.+)'")),
+        ("delete_failed", "Could", re.compile(r"Could not delete file\.?\s+(?P<value>.+?)(?::\s(?P<detail>.*))?$")),
+        ("processed", "Processed", re.compile(r"Processed patch file '(?P<value>[^']+)'")),
+        ("cleared", "Patch", re.compile(r"Patch folder was cleared")),
+        ("end", "-", re.compile(r"-+ end of patch installer -+")),
+    )
+
+    def __init__(self):
+        """Streaming state machine over patch.log: typed events per line, folded into patch runs and the files still pending deletion."""
+        self.runs = []  # Summary per patch run, in the order of the log
+        self.pending = {}  # Normalized path -> number of the run that left it behind, in the order the files were left behind
+        self.event_count = 0
+        self._run = None  # Summary of the run being read, None between two runs
+        self._cleared = False  # The run being read has cleared its patch folder, its next step is the end marker
+        self._dispatch = {}
+        for kind, word, pattern in self.EVENTS:
+            self._dispatch.setdefault(word, []).append((kind, pattern))
+
+    @staticmethod
+    def normalize_path(path):
+        """Installation relative path with '/' separators, e.g. '.\\lib\\x.jar' and 'lib/x.jar' both become 'lib/x.jar'."""
+        path = path.strip().replace("\\", "/")
+        while path.startswith("./"):
+            path = path[2:]
+        return path.lstrip("/")
+
+    def events(self, lines):
+        """Yields (kind, timestamp, value, detail) for every patch installer message, other lines are skipped."""
+        timestamp_pattern = TextPipeline.TIMESTAMP_PATTERN
+        dispatch = self._dispatch
+        for line in lines:
+            timestamp_match = timestamp_pattern.match(line)
+            if timestamp_match is None:
+                continue
+            message = line[timestamp_match.end():].rstrip("\r\n")
+            candidates = dispatch.get(message[:1] if message.startswith("-") else message.split(" ", 1)[0])
+            if not candidates:
+                continue
+            for kind, pattern in candidates:
+                match = pattern.match(message)
+                if match:
+                    groups = match.groupdict()
+                    yield kind, timestamp_match.group(0).strip(), groups.get("value"), groups.get("detail")
+                    break
+
+    def feed(self, event):
+        kind, timestamp, value, detail = event
+        self.event_count += 1
+        if self._cleared and kind in ("started", "patching_war"):
+            # The end marker of the previous run is missing, e.g. because the installer was stopped while validating
+            self._finish_run(self._run["ended"], False)
+        if self._run is None:
+            self._run = {"number": len(self.runs) + 1, "started": timestamp, "ended": None, "wars": [], "patch_files": [],
+                         "installed": 0, "marked": 0, "deleted": 0, "delete_failed": 0, "pending": 0, "finished": False}
+        run = self._run
+        run["ended"] = timestamp  # Last message so far
+        if kind == "patching_war":
+            run["wars"].append(f"{value} with {detail}")
+        elif kind == "installed":
+            run["installed"] += 1
+            self.pending.pop(self.normalize_path(value), None)  # Installed again, the file is in use
+        elif kind in ("marked", "delete_failed"):
+            run[kind] += 1
+            path = self.normalize_path(value)
+            self.pending.pop(path, None)  # Keeps the order of the latest run that left the file behind
+            self.pending[path] = run["number"]
+        elif kind == "deleted":
+            run["deleted"] += 1
+            self.pending.pop(self.normalize_path(value), None)
+        elif kind == "processed":
+            run["patch_files"].append(value)
+        elif kind == "cleared":
+            self._cleared = True
+        elif kind == "end":
+            self._finish_run(timestamp, True)
+
+    def _finish_run(self, timestamp, finished):
+        self._cleared = False
+        self._run["ended"] = timestamp
+        self._run["finished"] = finished
+        self._run["pending"] = len(self.pending)
+        self.runs.append(self._run)
+        self._run = None
+
+    def parse(self, lines):
+        """Folds all lines in one pass, a run without its end marker (e.g. a crashed installer) is kept as unfinished."""
+        for event in self.events(lines):
+            self.feed(event)
+        if self._run is not None:
+            self._finish_run(self._run["ended"], False)
+        return self
+
+    def parse_file(self, file_path, encoding_policy):
+        with open_log_binary_stream(file_path) as stream:
+            return self.parse(encoding_policy.decode(raw) for raw in stream)
+
+    def pending_paths(self):
+        """Paths of the files still pending deletion, written like the 'Marking file' messages (./lib/x.jar)."""
+        return [f"./{path}" for path in self.pending]
+
+
+class FileStatistics:
+    HEAD_SIZE = 64 * 1024  # Bytes read from the start and the end of a file for the dates and the encoding
+
+    def __init__(self, cache_path=None, chunk_size=8 * 1024 * 1024, max_entries=500):
+        """Line count, size, date span and encoding of log files, counted with large binary reads and cached per file fingerprint."""
+        self.cache_path = cache_path
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+        self.date_pattern = re.compile(("^" + LogIndex.DATE_PATTERN.pattern).encode(), re.MULTILINE)
+        self._lock = threading.Lock()
+        self.cache = {}  # Fingerprint -> statistics
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    self.cache = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.cache = {}
+
+    @staticmethod
+    def fingerprint(file_path):
+        """Path, size and modification time of the file (of the archive for archive members)."""
+        archive_path, member = split_archive_path(file_path)
+        file_stat = os.stat(archive_path)
+        return f"{os.path.normcase(os.path.abspath(archive_path))}::{member or ''}|{file_stat.st_size}|{file_stat.st_mtime_ns}"
+
+    def cached(self, file_path):
+        """Returns the cached statistics of the file or None, without reading it."""
+        with self._lock:
+            return self.cache.get(self.fingerprint(file_path))
+
+    def stats(self, file_path):
+        """Returns a dictionary with lines, bytes, first_date, last_date and encoding of the file."""
+        fingerprint = self.fingerprint(file_path)
+        with self._lock:
+            if fingerprint in self.cache:
+                return self.cache[fingerprint]
+        statistics = self._count(file_path)
+        with self._lock:
+            self.cache[fingerprint] = statistics
+            while len(self.cache) > self.max_entries:
+                del self.cache[next(iter(self.cache))]  # Oldest entry first, dicts keep their insertion order
+        self.save()
+        return statistics
+
+    def _count(self, file_path):
+        newlines = 0
+        size = 0
+        head = b""
+        tail = b""
+        last_byte = b""
+        with open_log_binary_stream(file_path) as stream:
+            plain = not split_archive_path(file_path)[0].lower().endswith(COMPRESSED_EXTENSIONS + ARCHIVE_EXTENSIONS)
+            # Counting newlines in large binary chunks never decodes or splits the text
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                newlines += chunk.count(b"\n")
+                size += len(chunk)
+                last_byte = chunk[-1:]
+                if len(head) < self.HEAD_SIZE:
+                    head += chunk[:self.HEAD_SIZE - len(head)]
+                if not plain:
+                    tail = (tail + chunk)[-self.HEAD_SIZE:]
+            if plain and size:
+                stream.seek(max(0, size - self.HEAD_SIZE))
+                tail = stream.read()
+        if size > self.HEAD_SIZE:
+            tail = tail[tail.find(b"\n") + 1:]  # Starts inside a line
+        first_dates = self.date_pattern.search(head)
+        last_dates = None
+        for last_dates in self.date_pattern.finditer(tail):
+            pass
+        return {
+            "lines": newlines + (1 if size and last_byte != b"\n" else 0),
+            "bytes": size,
+            "first_date": first_dates.group(0).decode("ascii").strip() if first_dates else None,
+            "last_date": last_dates.group(0).decode("ascii").strip() if last_dates else None,
+            "encoding": self.guess_encoding(head),
+        }
+
+    @staticmethod
+    def guess_encoding(head):
+        """Guesses the encoding from the first bytes: byte order mark, ASCII, UTF-8 or the Windows code page."""
+        if head.startswith(b"\xef\xbb\xbf"):
+            return "utf-8-sig"
+        if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+            return "utf-16"
+        if head.isascii():
+            return "ascii"
+        try:
+            # The head may end inside a multi-byte character, only the complete part has to decode
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+            return "utf-8"
+        except UnicodeDecodeError:
+            return "cp1252"
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            data = dict(self.cache)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+class ResultCache:
+    def __init__(self, spill_dir=None, max_entries=32, max_memory_bytes=256 * 1024 * 1024, max_disk_bytes=1024 * 1024 * 1024):
+        """Least recently used cache of pipeline results (lists of lines), entries evicted from memory are spilled to disk."""
+        self.spill_dir = spill_dir  # None keeps the results in memory only
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()  # Key -> (size in bytes, lines), the least recently used entry first
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, spill_dir, config):
+        if not config.get("enabled", True):
+            return cls(max_entries=0)
+        return cls(
+            spill_dir=spill_dir if config.get("spill_to_disk", True) else None,
+            max_entries=config.get("max_entries", 32),
+            max_memory_bytes=config.get("max_memory_mb", 256) * 1024 * 1024,
+            max_disk_bytes=config.get("max_disk_mb", 1024) * 1024 * 1024,
+        )
+
+    @staticmethod
+    def key(*parts):
+        """Turns the parts (strings, numbers or other keys) into a key that is also a valid file name."""
+        return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def text_key(text):
+        """Key of text that does not come from an unchanged file, e.g. an edited file content view."""
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=20).hexdigest()
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.json")
+
+    def get(self, key):
+        """Returns the cached lines or None."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), "r", encoding="utf-8") as f:
+                    lines = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                lines = None
+            if lines is not None:
+                os.utime(self._spill_path(key))  # The spilled files are evicted by their modification time
+                self.hits += 1
+                self._store(key, lines)
+                return lines
+        self.misses += 1
+        return None
+
+    def put(self, key, lines):
+        lines = list(lines)
+        if key in self.entries:
+            self.memory_bytes -= self.entries.pop(key)[0]
+        self._store(key, lines)
+        return lines
+
+    def _store(self, key, lines):
+        size = sum(len(line) for line in lines) + 64 * len(lines)  # Rough size of the strings and their list slots
+        if size > self.max_memory_bytes:
+            self._spill(key, lines)
+            return
+        self.entries[key] = (size, lines)
+        self.memory_bytes += size
+        while len(self.entries) > self.max_entries or self.memory_bytes > self.max_memory_bytes:
+            evicted_key, (evicted_size, evicted_lines) = self.entries.popitem(last=False)
+            self.memory_bytes -= evicted_size
+            self._spill(evicted_key, evicted_lines)
+
+    def _spill(self, key, lines):
+        if not self.spill_dir:
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            if not os.path.exists(self._spill_path(key)):
+                with open(self._spill_path(key), "w", encoding="utf-8") as f:
+                    json.dump(lines, f)
+            self._trim_disk()
+        except OSError:
+            pass  # The cache is an optimization, a full or read only disk only costs the recomputation
+
+    def _trim_disk(self):
+        spilled = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".json"):
+                entry_stat = entry.stat()
+                spilled.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+        total = sum(size for _, size, _ in spilled)
+        for _, size, path in sorted(spilled):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def persist(self, key):
+        """Writes an entry to the spill directory (e.g. for the next session) and returns whether it is stored there."""
+        if not self.spill_dir:
+            return False
+        entry = self.entries.get(key)
+        if entry is not None:
+            self._spill(key, entry[1])
+        return os.path.exists(self._spill_path(key))
+
+    def clear(self):
+        self.entries.clear()
+        self.memory_bytes = 0
+        if self.spill_dir and os.path.isdir(self.spill_dir):
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+class PrefixRewriter:
+    TOKEN_BREAKS = " \t'\"=,;"  # Characters a path cannot start after, e.g. "file './lib/x.jar'"
+
+    def __init__(self, rules, separator="keep"):
+        """Rewrites path prefixes by the longest matching rule of a table in one pass per line, '/' and '\\' match each other."""
+        self.rules = [(prefix, target) for prefix, target in rules if prefix]
+        self.separator = separator if separator in ("/", "\\") else None  # None keeps the separator of the rule's target
+        self.root = {}  # Trie of the prefixes with '/' separators, the target is stored under the key ""
+        for prefix, target in self.rules:
+            node = self.root
+            for char in prefix.replace("\\", "/"):
+                node = node.setdefault(char, {})
+            node[""] = (target, self.target_separator(target))
+        first_chars = set(self.root) | ({"\\"} if "/" in self.root else set())
+        breaks = re.escape(self.TOKEN_BREAKS)
+        # The C regex engine finds the possible path starts, the trie is only walked from there
+        self.start_pattern = re.compile(f"(?<![^{breaks}])[{''.join(re.escape(char) for char in first_chars)}]") if first_chars else None
+        # A path ends at a token break, but continues over spaces while the next word has a separator ("C:/Program Files/x")
+        # and does not start another path ("./lib/a.jar ./lib/b.jar")
+        self.token_end_pattern = re.compile(f"[^{breaks}]*(?: +(?![./\\\\]|[A-Za-z]:)[^{breaks}/\\\\]*[/\\\\][^{breaks}]*)*")
+
+    @classmethod
+    def from_config(cls, config):
+        return cls([(rule.get("prefix", ""), rule.get("target", "")) for rule in config.get("rules", [])], config.get("separator", "keep"))
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def target_separator(self, target):
+        if self.separator:
+            return self.separator
+        if "\\" in target and "/" not in target:
+            return "\\"
+        return "/" if "/" in target else None
+
+    def match(self, line, start):
+        """Returns (end, target, separator) of the longest rule matching at start, or None. A rule only matches whole
+        directory names: it has to end with a separator or be followed by one, a token break or the end of the line."""
+        node = self.root
+        found = None
+        boundaries = "/\\" + self.TOKEN_BREAKS
+        for position in range(start, len(line)):
+            char = line[position]
+            node = node.get("/" if char == "\\" else char)
+            if node is None:
+                break
+            if "" in node and (char in "/\\" or position + 1 == len(line) or line[position + 1] in boundaries):
+                found = (position + 1,) + node[""]
+        return found
+
+    def rewrite(self, line):
+        if self.start_pattern is None:
+            return line
+        parts = []
+        position = 0
+        for start_match in self.start_pattern.finditer(line):
+            start = start_match.start()
+            if start < position:
+                continue  # Inside a path rewritten already
+            found = self.match(line, start)
+            if found is None:
+                continue
+            end, target, separator = found
+            token_end = self.token_end_pattern.match(line, end).end()
+            rest = line[end:token_end]
+            if separator:
+                other = "\\" if separator == "/" else "/"
+                rest = rest.replace(other, separator)
+                if self.separator:
+                    target = target.replace(other, separator)
+            parts.append(line[position:start])
+            parts.append(target + rest)
+            position = token_end
+        if not parts:
+            return line
+        parts.append(line[position:])
+        return "".join(parts)
+
+    def to_key(self):
+        return [self.rules, self.separator]
+
+
+class TextPipeline:
+    TIMESTAMP_PATTERN = re.compile(r"^\d{2}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}\s+")
+
+    def __init__(self, search_pattern="", phrase_to_remove="", original_phrase="", replacement_phrase="", selected_date="", path_rewriter=None):
+        """Search and clean steps of the file content view as generators, so lines can be streamed through them."""
+        self.regex = re.compile(search_pattern) if search_pattern else None
+        self.path_rewriter = path_rewriter if path_rewriter else None  # PrefixRewriter applied after the find and replace
+        self.selected_date = selected_date
+        self.original_phrase = original_phrase
+        self.replacement_phrase = replacement_phrase
+        # Compile the phrases once instead of for every line
+        self.phrase_patterns = [re.compile(re.escape(phrase.strip()) + r"\s*") for phrase in phrase_to_remove.split(",") if phrase.strip()]
+
+    def filter_date(self, lines):
+        for line in lines:
+            if line.startswith(self.selected_date):
+                yield line
+
+    def search(self, lines):
+        """Yields the lines matching the search pattern with the leading timestamp removed."""
+        for line in lines:
+            if self.regex.search(line):
+                yield self.TIMESTAMP_PATTERN.sub("", line, count=1)
+
+    def clean_line(self, line):
+        return self.replace_phrases(self.remove_phrases(line))
+
+    def remove_phrases(self, line):
+        # Remove user-specified phrases
+        for phrase_pattern in self.phrase_patterns:
+            line = phrase_pattern.sub("", line)
+        return line
+
+    def replace_phrases(self, line):
+        # Replace the original phrase with the replacement phrase
+        if self.original_phrase and self.replacement_phrase:
+            line = line.replace(self.original_phrase, self.replacement_phrase)
 
-    def check_if_valid(self):
-        import re
+        # Map the path prefixes of the rule table
+        if self.path_rewriter:
+            line = self.path_rewriter.rewrite(line)
+
+        return line
+
+    def clean(self, lines):
+        for line in lines:
+            yield self.clean_line(line)
+
+    def run(self, lines):
+        """Yields the lines of the whole pipeline: date filter, search and clean."""
+        lines = (line.rstrip("\r\n") for line in lines)
+        if self.selected_date:
+            lines = self.filter_date(lines)
+        if self.regex:
+            lines = self.search(lines)
+        return self.clean(lines)
+
+    def _byte_regex(self, flags=0):
+        # The pattern is matched against the raw bytes, it is ASCII and the log encoding keeps ASCII as is (see matches_bytes_like_text)
+        return re.compile(self.regex.pattern.encode("ascii"), flags)
+
+    def matches_bytes_like_text(self, encoding_policy):
+        """Whether searching the raw bytes finds the same lines as searching the decoded text: an ASCII pattern without
+        Unicode-aware classes or case folding, on a log encoding that keeps ASCII as is (e.g. UTF-8 with a cp1252 fallback)."""
+        if self.regex is None:
+            return True
+        pattern = self.regex.pattern
+        if not pattern.isascii() or self.regex.flags & re.IGNORECASE or not self._matches_ascii_only(pattern):
+            return False
         try:
-            re.compile(self.regex_string)
+            return all(codecs.lookup(encoding).encode("az09")[0] == b"az09" for encoding in (encoding_policy.encoding, encoding_policy.fallback_encoding))
+        except LookupError:
+            return False
+
+    @staticmethod
+    def _matches_ascii_only(pattern):
+        """Returns False for patterns with classes (\\w, \\d, \\s, \\b) that also match non-ASCII characters, and for patterns
+        counting single characters (., [^a], a.b) which differ from bytes for multi-byte characters, except unbounded repeats like .*"""
+        single_character_ops = (sre_parse.ANY, sre_parse.NOT_LITERAL, sre_parse.IN)
+
+        def counts_characters(op, av):
+            return op in (sre_parse.ANY, sre_parse.NOT_LITERAL) or (op == sre_parse.IN and any(item[0] == sre_parse.NEGATE for item in av))
+
+        def ascii_only(items):
+            for op, av in items:
+                if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                    minimum, maximum, body = av
+                    if len(body) == 1 and body[0][0] in single_character_ops and counts_characters(*body[0]):
+                        if minimum > 1 or maximum != sre_parse.MAXREPEAT:
+                            return False
+                        body = [(sre_parse.IN, [item for item in body[0][1] if item[0] != sre_parse.NEGATE])] if body[0][0] == sre_parse.IN else []
+                    if not ascii_only(body):
+                        return False
+                elif counts_characters(op, av):
+                    return False
+                elif op == sre_parse.IN and any(item[0] == sre_parse.CATEGORY for item in av):
+                    return False
+                elif op == sre_parse.AT and av in (sre_parse.AT_BOUNDARY, sre_parse.AT_NON_BOUNDARY):
+                    return False
+                elif op == sre_parse.SUBPATTERN and not ascii_only(av[-1]):
+                    return False
+                elif op == sre_parse.BRANCH and not all(ascii_only(branch) for branch in av[1]):
+                    return False
+                elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT) and not ascii_only(av[1]):
+                    return False
             return True
-        except re.error:
+
+        try:
+            return ascii_only(sre_parse.parse(pattern))
+        except (re.error, TypeError, IndexError):
             return False
 
+    def run_bytes(self, lines, encoding_policy):
+        """Same result as run() for undecoded lines, only the lines passing the date filter and the search are decoded."""
+        if not self.matches_bytes_like_text(encoding_policy):
+            yield from self.run(encoding_policy.decode(raw) for raw in lines)
+            return
+        byte_regex = self._byte_regex() if self.regex else None
+        date_prefix = self.selected_date.encode("ascii")
+        for raw in lines:
+            raw = raw.rstrip(b"\r\n")
+            if not raw.startswith(date_prefix) or (byte_regex and not byte_regex.search(raw)):
+                continue
+            line = encoding_policy.decode(raw)
+            if byte_regex:
+                line = self.TIMESTAMP_PATTERN.sub("", line, count=1)
+            yield self.clean_line(line)
+
+    def run_buffer(self, buffer, encoding_policy):
+        """Same result as run_bytes() on a whole buffer (e.g. an mmap), the search skips non-matching text without splitting it into lines."""
+        line_regex = self._byte_regex()
+        buffer_regex = self._byte_regex(re.MULTILINE)
+        date_prefix = self.selected_date.encode("ascii")
+        position = 0
+        while True:
+            match = buffer_regex.search(buffer, position)
+            if match is None:
+                return
+            start = buffer.rfind(b"\n", 0, match.start()) + 1
+            end = buffer.find(b"\n", match.start())
+            end = len(buffer) if end == -1 else end
+            position = end + 1
+            raw = buffer[start:end].rstrip(b"\r")
+            # A match can reach into the next line (e.g. with \s), it only counts if the line matches on its own
+            if raw.startswith(date_prefix) and line_regex.search(raw):
+                yield self.clean_line(self.TIMESTAMP_PATTERN.sub("", encoding_policy.decode(raw), count=1))
+
+    def run_file(self, file_path, encoding_policy):
+        """Runs the pipeline on a log file, plain logs are searched memory-mapped, compressed ones line by line."""
+        plain = not split_archive_path(file_path)[0].lower().endswith(COMPRESSED_EXTENSIONS + ARCHIVE_EXTENSIONS)
+        # '$' would not match before the '\r' of Windows line ends in the buffer and '\A', '\Z' only match at the ends of
+        # the buffer, such patterns are searched per line
+        buffer_safe = self.regex and not re.search(r"\$|\\[AZ]", self.regex.pattern) and self.matches_bytes_like_text(encoding_policy)
+        if plain and buffer_safe and os.path.getsize(file_path) > 0:
+            with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from self.run_buffer(buffer, encoding_policy)
+            return
+        with open_log_binary_stream(file_path) as stream:
+            yield from self.run_bytes(stream, encoding_policy)
+
+
+class ResultExporter:
+    def __init__(self, output_path, preview_lines=1000):
+        """Writes pipeline results straight to a file (gzip compressed for .gz) and keeps only the first lines as preview."""
+        self.output_path = output_path
+        self.preview_lines = preview_lines
+        self.preview = []
+        self.line_count = 0
+        self._file = None
+
+    def __enter__(self):
+        if self.output_path.lower().endswith(".gz"):
+            self._file = gzip.open(self.output_path, "wt", encoding="utf-8", newline="")
+        else:
+            self._file = open(self.output_path, "w", encoding="utf-8", newline="")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        return False
+
+    def write(self, line):
+        self._file.write(line + "\n")
+        self.line_count += 1
+        if len(self.preview) < self.preview_lines:
+            self.preview.append(line)
+
+    def export(self, lines, progress=None, progress_every=100000):
+        for line in lines:
+            self.write(line)
+            if progress and self.line_count % progress_every == 0:
+                progress(self.line_count)
+        return self.line_count
+
+
+class FileSystemScanner:
+    # Path-like tokens in a log, e.g. ./lib/foo-1.0.jar or .\lib\foo-1.0.jar
+    PATH_TOKEN_PATTERN = re.compile(r"[\w.$~-]+(?:[/\\][\w.$~-]+)*\.\w+")
+
+    def __init__(self, root, patterns=("*",), min_age_days=0, min_size=0, excluded_names=None, max_workers=8):
+        """Parallel os.scandir walker yielding the files below root that match the glob patterns, age and size."""
+        self.root = root
+        self.patterns = [pattern.strip() for pattern in patterns if pattern.strip()] or ["*"]
+        self.min_age_days = min_age_days
+        self.min_size = min_size
+        self.excluded_names = excluded_names or set()  # Normalized file names to skip, e.g. the files referenced by a log
+        self.max_workers = max_workers
+        self.scanned_count = 0
+
+    @classmethod
+    def referenced_names(cls, text):
+        """Returns the normalized file names of all paths mentioned in a log."""
+        return {os.path.normcase(re.split(r"[/\\]", token)[-1]) for token in cls.PATH_TOKEN_PATTERN.findall(text)}
+
+    def _matches(self, entry, newest_mtime):
+        name = os.path.normcase(entry.name)
+        if name in self.excluded_names:
+            return None
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns):
+            return None
+        if self.min_size or self.min_age_days:
+            # Only stat when needed, on Linux this is an extra system call per file
+            entry_stat = entry.stat()
+            if entry_stat.st_size < self.min_size or entry_stat.st_mtime > newest_mtime:
+                return None
+        return entry.path
+
+    def _scan_directory(self, directory, newest_mtime):
+        files = []
+        subdirectories = []
+        scanned = 0
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.path)
+                        elif entry.is_file():
+                            scanned += 1
+                            path = self._matches(entry, newest_mtime)
+                            if path:
+                                files.append(path)
+                    except OSError:
+                        continue
+        except OSError:
+            pass  # Directories without read permission are skipped
+        return files, subdirectories, scanned
+
+    def scan(self):
+        """Yields lists of matching file paths as soon as each directory has been read."""
+        newest_mtime = time.time() - self.min_age_days * 86400
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._scan_directory, self.root, newest_mtime)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirectories, scanned = future.result()
+                    self.scanned_count += scanned
+                    for subdirectory in subdirectories:
+                        pending.add(executor.submit(self._scan_directory, subdirectory, newest_mtime))
+                    if files:
+                        yield files
+
+
+class MultiPatternScanner:
+    # Backreferences would point to the wrong group once the patterns are joined into one regex
+    BACKREFERENCE_PATTERN = re.compile(r"\\[1-9]|\(\?P=")
+
+    def __init__(self, patterns):
+        """Searches several patterns in a single pass over the lines, patterns is a list of (tag, regex pattern) pairs."""
+        self.tags = [tag for tag, _ in patterns]
+        self.regexes = [re.compile(pattern) for _, pattern in patterns]
+        self.prefilter = None
+        if len(patterns) > 1 and not any(self.BACKREFERENCE_PATTERN.search(pattern) for _, pattern in patterns):
+            try:
+                # One combined regex rejects the lines matching none of the patterns in a single search
+                self.prefilter = re.compile("|".join(f"(?:{pattern})" for _, pattern in patterns))
+            except re.error:
+                self.prefilter = None
+
+    def scan(self, lines, progress=None):
+        """Returns {tag: [positions of the matching lines]}, a line is tagged with every pattern it matches.
+
+        progress receives the current line position and pattern index (-1 for the prefilter) when given.
+        """
+        results = {tag: [] for tag in self.tags}
+        tagged = list(enumerate(zip(self.tags, self.regexes)))
+        prefilter = self.prefilter.search if self.prefilter else None
+        for position, line in enumerate(lines):
+            if progress is not None:
+                progress[0] = position
+                progress[1] = -1
+            if prefilter and not prefilter(line):
+                continue
+            for index, (tag, regex) in tagged:
+                if progress is not None:
+                    progress[1] = index
+                if regex.search(line):
+                    results[tag].append(position)
+        return results
+
+
+def find_nested_quantifier(pattern):
+    """Returns True if a quantifier is repeated by another quantifier, e.g. (a+)+ or (\w*\s?)*, which can backtrack catastrophically."""
+    repeat_ops = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+    def contains_repeat(items):
+        for op, av in items:
+            if op in repeat_ops and av[1] > 1:
+                return True
+            if nested(op, av, contains_repeat):
+                return True
+        return False
+
+    def nested(op, av, check):
+        # Descend into groups, branches and lookarounds
+        if op == sre_parse.SUBPATTERN:
+            return check(av[-1])
+        if op == sre_parse.BRANCH:
+            return any(check(branch) for branch in av[1])
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            return check(av[1])
+        return False
+
+    def has_nested_repeat(items):
+        for op, av in items:
+            if op in repeat_ops:
+                if av[1] > 1 and contains_repeat(av[2]):
+                    return True
+                if has_nested_repeat(av[2]):
+                    return True
+            elif nested(op, av, has_nested_repeat):
+                return True
+        return False
+
+    try:
+        return has_nested_repeat(sre_parse.parse(pattern))
+    except (re.error, TypeError, IndexError):
+        return False
+
+
+class RegexTimeoutError(Exception):
+    def __init__(self, pattern, position, line, time_budget):
+        self.pattern = pattern
+        self.position = position  # Position of the line in the searched lines
+        self.line = line
+        super().__init__(f"The pattern '{pattern}' took longer than {time_budget} seconds on line {position + 1}.")
+
+
+class RegexCancelledError(Exception):
+    pass
+
+
+_guard_progress = None  # Shared (line position, pattern index) of the guarded regex worker process
+
+
+def _init_guard_worker(progress):
+    global _guard_progress
+    _guard_progress = progress
+
+
+def _guarded_scan(patterns, lines):
+    # Runs in the worker process of GuardedRegexRunner, returns the results and the CPU time the worker spent on them
+    cpu_started = time.process_time()
+    results = MultiPatternScanner(patterns).scan(lines, _guard_progress)
+    return results, time.process_time() - cpu_started
+
+
+class GuardedRegexRunner:
+    def __init__(self, time_budget=5.0, chunk_lines=20000, poll=None):
+        """Runs regex searches in a worker process with a time budget per chunk of lines, so a slow pattern can be stopped."""
+        self.time_budget = time_budget
+        self.chunk_lines = chunk_lines
+        self.poll = poll  # Called while waiting for a chunk (e.g. to process GUI events), returns True to cancel
+        self._context = multiprocessing.get_context("spawn")
+        self._pool = None
+        self._progress = None
+        self.scanned_count = 0  # Lines searched by the last scan, up to the line that timed out
+        self.cpu_seconds = 0.0  # CPU time the worker process spent on the chunks of the last scan it finished
+
+    def _start(self):
+        if self._pool is None:
+            self._progress = self._context.RawArray("q", 2)
+            self._pool = self._context.Pool(1, initializer=_init_guard_worker, initargs=(self._progress,))
+            # A spawned worker imports the module first, that must not count against the time budget of the first chunk
+            self._wait(self._pool.apply_async(os.getpid))
+
+    def _wait(self, pending, deadline=None):
+        """Returns the result of pending, polling for cancellation, or None once the deadline has passed."""
+        while True:
+            try:
+                return pending.get(timeout=0.05)
+            except multiprocessing.TimeoutError:
+                if self.poll and self.poll():
+                    self.shutdown()
+                    raise RegexCancelledError("The search has been cancelled.")
+                if deadline is not None and time.monotonic() > deadline:
+                    return None
+
+    def shutdown(self):
+        """Stops the worker process, also when it is stuck in a search."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def scan(self, patterns, lines):
+        """Same result as MultiPatternScanner(patterns).scan(lines), raising RegexTimeoutError or RegexCancelledError."""
+        MultiPatternScanner(patterns)  # Raise invalid patterns here instead of in the worker
+        lines = lines if isinstance(lines, list) else list(lines)
+        results = {tag: [] for tag, _ in patterns}
+        self.scanned_count = 0
+        self.cpu_seconds = 0.0
+        for start in range(0, len(lines), self.chunk_lines):
+            chunk = lines[start:start + self.chunk_lines]
+            self._start()
+            pending = self._pool.apply_async(_guarded_scan, (patterns, chunk))
+            finished = self._wait(pending, time.monotonic() + self.time_budget)
+            if finished is None:
+                position, pattern_index = self._progress[0], self._progress[1]
+                self.scanned_count += position
+                self.shutdown()
+                pattern = patterns[pattern_index][1] if pattern_index >= 0 else " | ".join(pattern for _, pattern in patterns)
+                raise RegexTimeoutError(pattern, start + position, chunk[position], self.time_budget)
+            chunk_results, cpu_seconds = finished
+            self.scanned_count += len(chunk)
+            self.cpu_seconds += cpu_seconds
+            for tag, positions in chunk_results.items():
+                results[tag].extend(start + position for position in positions)
+        return results
+
+
 class MainWindow(QMainWindow):
+    LOBSTER_JAR_CLEANUP = {
+        "search_pattern": r"(Marking)\s(file)",
+        "find_text": "./lib/",
+        "replace_text": "D:/Lobster_data/lib/",
+        "remove_phrases": "Marking file, ', to be deleted on exit of JVM",
+    }
+
     def __init__(self):
         super().__init__()
         # Initializing current working director and theme file(s)
@@ -364,6 +3594,30 @@ class MainWindow(QMainWindow):
         theme_file_path = os.path.join(self.current_working_dir,"_internal","theme_files")
         dark_theme_file = os.path.join(theme_file_path,"dark.qss")
         self.custom_actions_config = os.path.join(self.current_working_dir, "_internal", "configuration", "custom_actions.json")
+        self.journal_dir = os.path.join(self.current_working_dir, "_internal", "journal")
+        self.stat_cache = StatCache()  # Shared by the mover and the path validators
+        self.hash_cache = HashCache(os.path.join(self.current_working_dir, "_internal", "cache", "hash_cache.json"))
+        self.file_statistics = FileStatistics(os.path.join(self.current_working_dir, "_internal", "cache", "file_statistics.json"))
+        self.statistics_executor = ThreadPoolExecutor(max_workers=1)  # Counts the lines of large files without blocking the window
+        self.statistics_notifier = FileStatisticsNotifier()
+        self.path_checker = PathStatusChecker()
+        self.path_lines = {}  # Path -> line numbers of the file content view, for the status annotation
+        self.path_backlog = deque()  # Paths of the view not submitted yet, checked a batch at a time after the visible ones
+        self.path_selections = {}  # Path -> (state, size, ExtraSelections of its lines) as drawn
+        self.log_index = None  # LogIndex of the loaded .log file
+        self.agent_client = None  # AgentClient of the connected agent
+        self.remote_log_path = ""  # Last log opened on the agent
+        self.displayed_lines = None  # Line numbers of the log index shown unchanged in the file content view
+        self.regex_guard = None  # GuardedRegexRunner, its worker process is started with the first search
+        self.cancel_requested = False
+        self.profiler = StageProfiler()  # Stage timings and counters shown by View > Performance Report
+        self.app_config = ConfigManager(self, os.path.join(self.current_working_dir, "_internal", "configuration", "settings.json"))
+        # Search and cleanup results per input and action, repeating an action on an unchanged log is a lookup
+        self.result_cache = ResultCache.from_config(os.path.join(self.current_working_dir, "_internal", "cache", "results"), self.app_config.get("result_cache", {}))
+        self.log_index_fingerprint = None  # FileStatistics.fingerprint of the loaded file as read, the log index and the view were built from it
+        self.view_key = None  # ResultCache key of the content the file content view shows, None after edits
+        self.session_path = os.path.join(self.current_working_dir, "_internal", "cache", "session.json")
+        self.session_index_path = os.path.join(self.current_working_dir, "_internal", "cache", "session_index.bin")
         self.version = "1.2.0" # Current version of the application
         self.settings = QSettings("Application", "Name") # Settings to save current location of the windows on exit
         geometry = self.settings.value("geometry", bytes())
@@ -374,6 +3628,9 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(f"FileShift v{self.version} © - by Jovan")
         self.initUI()
         self.create_menu_bar()
+        if self.app_config.get("session", {}).get("restore", True):
+            # Restored once the event loop runs, so the window shows up before the log is read
+            QTimer.singleShot(0, self.restore_session)
 
     def initUI(self):
         central_widget = QWidget()
@@ -388,6 +3645,13 @@ class MainWindow(QMainWindow):
         self.line_count_statusbar = QStatusBar()
         self.line_count_statusbar.setSizeGripEnabled(False)
         self.line_count_statusbar.setStyleSheet("color: #ffffff; font-size: 14px")
+        self.file_statistics_label = QLabel()
+        self.file_statistics_label.setToolTip("Lines, size, date span and encoding of the loaded file.")
+        self.line_count_statusbar.addPermanentWidget(self.file_statistics_label)
+        self.path_status_label = QLabel()
+        self.path_status_label.setToolTip("Listed paths found, missing and locked (in use), see View > Annotate Path Status.")
+        self.line_count_statusbar.addPermanentWidget(self.path_status_label)
+        self.statistics_notifier.finished.connect(self.display_file_statistics)
 
         # Left Panel - Controls
         left_panel = QWidget()
@@ -404,7 +3668,7 @@ class MainWindow(QMainWindow):
         self.file_path_input = QLineEdit()
         self.file_path_input.setPlaceholderText("Select a text or log file to read and display it's content...")
         self.file_path_input.setReadOnly(False)
-        self.file_path_input.textChanged.connect(lambda: self.refresh_icon_button.setVisible(True) if os.path.isfile(self.file_path_input.text()) else self.refresh_icon_button.setVisible(False))
+        self.file_path_input.textChanged.connect(lambda: self.refresh_icon_button.setVisible(True) if self.stat_cache.isfile(split_archive_path(self.file_path_input.text())[0]) else self.refresh_icon_button.setVisible(False))
         self.browse_button = QPushButton("Browse File")
         self.browse_button.clicked.connect(self.browse_file)
         self.refresh_icon_button = QPushButton()
@@ -432,7 +3696,22 @@ class MainWindow(QMainWindow):
         self.move_button.setToolTip("If the file content view contains full file paths in each new line\nthen it moves those listed files to the set destination directory.")
         self.move_button.clicked.connect(self.move_files)
         
+        self.dry_run_button = QPushButton("Dry Run")
+        self.dry_run_button.setToolTip("Check the listed file paths without moving anything and show\nmissing files, destination collisions and the totals of the move.")
+        self.dry_run_button.clicked.connect(self.dry_run_move)
+        
+        self.move_target_combo = QComboBox()
+        self.move_target_combo.addItems(["Move to Folder", "Pack into 7z Archive", "Pack into Zip Archive"])
+        self.move_target_combo.setToolTip("Pack into an archive writes all files into one dated archive in the destination\ndirectory, verifies it and only then deletes the source files.")
+
+        self.dedup_mode_combo = QComboBox()
+        self.dedup_mode_combo.addItems(["Keep Duplicates", "Collapse Duplicates"])
+        self.dedup_mode_combo.setToolTip("Collapse Duplicates moves only one copy of byte-identical files\nand deletes the other copies once it was moved. Undo restores them.")
+
         action_layout.addWidget(self.move_button)
+        action_layout.addWidget(self.dry_run_button)
+        action_layout.addWidget(self.move_target_combo)
+        action_layout.addWidget(self.dedup_mode_combo)
         #action_layout.addStretch()
 
         file_ops_layout.addLayout(file_input_layout)
@@ -461,8 +3740,12 @@ class MainWindow(QMainWindow):
         self.search_file_contents_and_display_button = QPushButton("Search")
         self.search_file_contents_and_display_button.setToolTip("Search the displayed file content for the entered regex pattern and display only those matches.")
         self.search_file_contents_and_display_button.clicked.connect(self.search_and_replace_file_content)
+        self.multi_search_button = QPushButton("Multi Search")
+        self.multi_search_button.setToolTip("Search the displayed file content with several patterns or custom actions in one pass.")
+        self.multi_search_button.clicked.connect(self.open_multi_pattern_search)
         pattern_buttons.addWidget(self.convert_entered_string_to_regex_button)
         pattern_buttons.addWidget(self.search_file_contents_and_display_button)
+        pattern_buttons.addWidget(self.multi_search_button)
         
         pattern_layout.addLayout(pattern_header)
         pattern_layout.addWidget(self.search_pattern_input)
@@ -518,6 +3801,7 @@ class MainWindow(QMainWindow):
         left_layout.addWidget(file_ops_group)
         left_layout.addWidget(search_group)
         left_layout.addStretch()
+        self.search_locked_groups = [file_ops_group, search_group]  # Disabled while a guarded search processes events
 
         # Right Panel - Content Views
         right_panel = QWidget()
@@ -532,10 +3816,13 @@ class MainWindow(QMainWindow):
         self.log_dates_combobox = QComboBox()
         self.log_dates_combobox.setToolTip("Select a date to view the log entries for that date.\nThis will re-display the log entries for the selected date in the file view.")
         self.log_dates_combobox.setMinimumWidth(120)
-        self.log_dates_combobox.currentTextChanged.connect(lambda: self.extract_lines_by_date_and_display(
-            self.extract_data_from_log(self.file_path_input.text()), 
-            self.log_dates_combobox.currentText()
-        ))
+        self.log_dates_combobox.currentTextChanged.connect(lambda: self.display_log_date(self.log_dates_combobox.currentText()))
+        self.time_range_input = QLineEdit()
+        self.time_range_input.setPlaceholderText("Time range, e.g. 17:11:09-17:11:20")
+        self.time_range_input.setToolTip("Show only the log entries between two times of the selected date.\nFull timestamps like 14.03.19 17:11:09-14.03.19 17:11:20 are possible too.\nPress Enter to apply, clear the input to show the whole date again.")
+        self.time_range_input.setClearButtonEnabled(True)
+        self.time_range_input.setMaximumWidth(260)
+        self.time_range_input.returnPressed.connect(self.filter_time_range)
         self.font_size_combobox_file_contents = QComboBox()
         self.font_size_combobox_file_contents.addItems(["10px","11px","12px", "14px", "16px", "18px", "20px"])
         self.font_size_combobox_file_contents.setCurrentIndex(2)
@@ -552,6 +3839,7 @@ class MainWindow(QMainWindow):
         
         content_toolbar.addWidget(QLabel("Log Date:"))
         content_toolbar.addWidget(self.log_dates_combobox)
+        content_toolbar.addWidget(self.time_range_input)
         content_toolbar.addSpacing(20)
         content_toolbar.addWidget(QLabel("Font Size:"))
         content_toolbar.addWidget(self.font_size_combobox_file_contents)
@@ -562,17 +3850,33 @@ class MainWindow(QMainWindow):
         self.file_content_display.setReadOnly(False)
         self.file_content_display.setWordWrapMode(QTextOption.ManualWrap)
         self.file_content_display.undoAvailable
+        self.file_content_display.textChanged.connect(self.forget_displayed_index_lines)
+        # Path statuses are checked once typing pauses and drawn while the checks finish
+        self.path_scan_timer = QTimer(self)
+        self.path_scan_timer.setSingleShot(True)
+        self.path_scan_timer.setInterval(300)
+        self.path_scan_timer.timeout.connect(self.annotate_paths)
+        self.path_status_timer = QTimer(self)
+        self.path_status_timer.setInterval(100)
+        self.path_status_timer.timeout.connect(self.apply_path_statuses)
+        self.file_content_display.textChanged.connect(lambda: self.path_scan_timer.start() if self.annotate_paths_action.isChecked() else None)
+        self.file_content_display.verticalScrollBar().valueChanged.connect(lambda: self.submit_path_checks() if self.path_lines else None)
         
         # Progressbar
         self.progressbar = QProgressBar()
         self.progressbar.setMaximumHeight(15)
         self.progressbar.setMinimumWidth(260)
         self.progressbar.setVisible(False)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setToolTip("Cancel the running search.")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(lambda: setattr(self, "cancel_requested", True))
         
-        self.file_content_display.cursorPositionChanged.connect(lambda: self.line_count_statusbar.showMessage(f"Line: {self.file_content_display.textCursor().blockNumber() + 1}", 10000))
+        self.file_content_display.cursorPositionChanged.connect(self.show_cursor_line_status)
         content_layout.addLayout(content_toolbar)
         content_layout.addWidget(self.file_content_display)
         content_layout.addWidget(self.progressbar)
+        content_layout.addWidget(self.cancel_button)
         content_group.setLayout(content_layout)
 
         # Program Output
@@ -585,8 +3889,9 @@ class MainWindow(QMainWindow):
         output_toolbar.addSpacing(10)
         output_toolbar.addWidget(QLabel("Status:"))
         output_toolbar.addWidget(self.statusbar)
-        self.program_output = QTextEdit()
-        self.program_output.setReadOnly(True)
+        self.run_log = RunLog.from_config(os.path.join(self.current_working_dir, "_internal", "logs"), self.app_config.get("output", {}))
+        self.program_output = OutputConsole(self.run_log, self.app_config.get("output", {}).get("max_lines", 2000))
+        self.program_output.setToolTip("Shows the newest output lines, the full history is kept in the run log (Open > Open Run Log).")
         self.program_output.setWordWrapMode(QTextOption.ManualWrap)
         
         output_layout.addLayout(output_toolbar)
@@ -617,10 +3922,44 @@ class MainWindow(QMainWindow):
 
         file_menu.addSeparator()
 
+        resume_move_action = QAction("Resume Interrupted Move", self)
+        resume_move_action.triggered.connect(self.resume_move)
+        file_menu.addAction(resume_move_action)
+        
+        undo_move_action = QAction("Undo Last Move", self)
+        undo_move_action.triggered.connect(self.undo_last_move)
+        file_menu.addAction(undo_move_action)
+        
+        file_menu.addSeparator()
+
         manage_custom_clean_action = QAction("Add or Manage Custom Actions", self)
         manage_custom_clean_action.triggered.connect(self.open_custom_autofill_action)
         file_menu.addAction(manage_custom_clean_action)
         
+        path_rules_action = QAction("Path Rewrite Rules", self)
+        path_rules_action.setToolTip("Map several path prefixes (e.g. ./lib/, ./webapps/) to their targets during the cleanup.")
+        path_rules_action.triggered.connect(self.open_path_rewrite_rules)
+        file_menu.addAction(path_rules_action)
+        
+        export_results_action = QAction("Export Results", self)
+        export_results_action.setToolTip("Run the search pattern and text manipulation on the input file and write the results to a file.")
+        export_results_action.triggered.connect(self.export_results)
+        file_menu.addAction(export_results_action)
+        
+        file_menu.addSeparator()
+        
+        edit_settings_action = QAction("Edit Settings", self)
+        edit_settings_action.setToolTip("Open the settings file, e.g. to limit the bandwidth used while moving files.")
+        edit_settings_action.triggered.connect(lambda: self.open_file_helper_method(self.app_config.filename))
+        file_menu.addAction(edit_settings_action)
+        
+        file_menu.addSeparator()
+        
+        scan_directory_action = QAction("Find Files in Directory", self)
+        scan_directory_action.setToolTip("Build the list of files to move from a directory by name, age and size.")
+        scan_directory_action.triggered.connect(self.open_directory_scan)
+        file_menu.addAction(scan_directory_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("Exit", self)
@@ -638,6 +3977,11 @@ class MainWindow(QMainWindow):
         open_file.triggered.connect(lambda: self.open_file_helper_method(self.file_path_input.text()))
         open_menu.addAction(open_file)
         
+        open_run_log = QAction("Open Run Log", self)
+        open_run_log.setToolTip("Open the log with the full program output of all runs.")
+        open_run_log.triggered.connect(lambda: self.open_file_helper_method(self.run_log.log_path))
+        open_menu.addAction(open_run_log)
+        
         # View Menu
         view_menu = menubar.addMenu("&View")
         self.change_word_wrap_action = QAction("Toggle Word Wrap", self)
@@ -647,10 +3991,63 @@ class MainWindow(QMainWindow):
         self.change_word_wrap_action.toggled.connect(self.change_word_wrap)
         view_menu.addAction(self.change_word_wrap_action)
         
+        self.annotate_paths_action = QAction("Annotate Path Status", self)
+        self.annotate_paths_action.setToolTip("Mark every listed path as found, missing or locked (in use) before moving.")
+        self.annotate_paths_action.setCheckable(True)
+        self.annotate_paths_action.toggled.connect(self.toggle_path_annotation)
+        view_menu.addAction(self.annotate_paths_action)
+        
+        view_menu.addSeparator()
+        
+        performance_report_action = QAction("Performance Report", self)
+        performance_report_action.setToolTip("Show the time spent per stage, the counters and the peak memory since the last reset.")
+        performance_report_action.triggered.connect(self.show_performance_report)
+        view_menu.addAction(performance_report_action)
+        
+        export_performance_action = QAction("Export Performance Report", self)
+        export_performance_action.triggered.connect(self.export_performance_report)
+        view_menu.addAction(export_performance_action)
+        
+        reset_performance_action = QAction("Reset Performance Counters", self)
+        reset_performance_action.triggered.connect(self.profiler.reset)
+        view_menu.addAction(reset_performance_action)
+        
+        clear_result_cache_action = QAction("Clear Result Cache", self)
+        clear_result_cache_action.setToolTip("Forget the cached search and cleanup results, they are computed again on the next run.")
+        clear_result_cache_action.triggered.connect(self.clear_result_cache)
+        view_menu.addAction(clear_result_cache_action)
+        
+        self.capture_profile_action = QAction("Capture Profile", self)
+        self.capture_profile_action.setToolTip("Record a cProfile and tracemalloc capture for support cases, the files are written to _internal/profiles when it is turned off.")
+        self.capture_profile_action.setCheckable(True)
+        self.capture_profile_action.toggled.connect(self.toggle_profile_capture)
+        view_menu.addAction(self.capture_profile_action)
+        
+        # Agent Menu
+        agent_menu = menubar.addMenu("A&gent")
+        connect_agent_action = QAction("Connect to Agent...", self)
+        connect_agent_action.setToolTip("Connect to a FileShift agent (FileShift --agent) running on the server that holds the logs and files.")
+        connect_agent_action.triggered.connect(self.connect_to_agent)
+        agent_menu.addAction(connect_agent_action)
+        
+        run_on_agent_action = QAction("Run Action on Remote Log...", self)
+        run_on_agent_action.setToolTip("Search and clean up a log on the agent with the current inputs, only the resulting lines are transferred.")
+        run_on_agent_action.triggered.connect(self.run_action_on_agent)
+        agent_menu.addAction(run_on_agent_action)
+        
+        move_on_agent_action = QAction("Move Listed Files on Agent", self)
+        move_on_agent_action.setToolTip("Move the listed files to the destination directory on the agent's machine.")
+        move_on_agent_action.triggered.connect(self.move_files_on_agent)
+        agent_menu.addAction(move_on_agent_action)
+        
         self.fill_menu = menubar.addMenu("&AutoFill")
         lob_jar_clean_action = QAction("Lobster .jar Cleanup", self)
         self.fill_menu.addAction(lob_jar_clean_action)
         lob_jar_clean_action.triggered.connect(self.fill_lobster_jar_cleanup)
+        lob_pending_action = QAction("Lobster Pending Deletions (All Runs)", self)
+        lob_pending_action.setToolTip("Read every patch run of the loaded patch.log and list the files that are still waiting to be deleted.")
+        self.fill_menu.addAction(lob_pending_action)
+        lob_pending_action.triggered.connect(self.fill_lobster_pending_deletions)
         
         # About Menu
         about_menu = menubar.addMenu("&About")
@@ -667,7 +4064,7 @@ class MainWindow(QMainWindow):
             if data:
                 # Clear existing custom actions
                 for action in self.fill_menu.actions():
-                    if action.text() not in "Lobster .jar Cleanup":
+                    if action.text() not in ("Lobster .jar Cleanup", "Lobster Pending Deletions (All Runs)"):
                         self.fill_menu.removeAction(action)
                 # Add new custom actions
                 for key, value in data.items():
@@ -706,6 +4103,38 @@ class MainWindow(QMainWindow):
         self.w.show()
     
     
+    def open_multi_pattern_search(self):
+        self.multi_search_window = MultiPatternSearch(self)
+        self.multi_search_window.show()
+    
+    
+    def get_all_actions(self):
+        # Built-in Lobster cleanup followed by the custom actions
+        actions = {"Lobster .jar Cleanup": self.LOBSTER_JAR_CLEANUP}
+        try:
+            with open(self.custom_actions_config, "r") as jf:
+                actions.update(json.load(jf))
+        except (OSError, json.JSONDecodeError):
+            pass
+        return actions
+    
+    
+    def multi_pattern_search(self, actions):
+        # Scan the file content once for all patterns, then clean each pattern's matches with its action's settings
+        self.program_output.clear()
+        scan_result = self.scan_file_content([(tag, action["search_pattern"]) for tag, action in actions.items()])
+        if scan_result is None:
+            return {}
+        positions, body = scan_result
+        results = {}
+        for tag, action in actions.items():
+            pipeline = TextPipeline(phrase_to_remove=action.get("remove_phrases", ""), original_phrase=action.get("find_text", ""), replacement_phrase=action.get("replace_text", ""), path_rewriter=self.path_rewriter())
+            results[tag] = [pipeline.clean_line(body(position)) for position in positions[tag]]
+            self.program_output.append(f"Found {len(results[tag])} matching lines for '{tag}'.")
+        self.statusbar.showMessage(f"Searched with {len(actions)} patterns in one pass.", 10000)
+        return results
+    
+    
     def change_path_separator(self):
         try:
             input_replace_text = self.replace_string_input.text()
@@ -733,91 +4162,243 @@ class MainWindow(QMainWindow):
     
     def search_and_replace_file_content(self):
         try:
-            file_view_content = self.file_content_display.toPlainText()
             regex_input = self.search_pattern_input.text()
 
             if len(regex_input) > 0:
-                # Compile the regex for better performance
-                regex = re.compile(regex_input)
-
-                # Split the content into lines
-                lines = file_view_content.splitlines()
-
-                # Find and clean lines that match the regex
-                matching_lines = []
-                for line in lines:
-                    if regex.search(line):
-                        try:
-                            # Clean up the date from the line
-                            cleaned_line = re.sub(r"^\d{2}\.\d{2}\.\d{2} \d{2}:\d{2}:\d{2}\s+", "", line)
-                        except Exception:
-                            cleaned_line = line
-                        matching_lines.append(cleaned_line)
+                self.program_output.clear()
+                # The text is only copied out of the view when it identifies the view, a cached result of an unchanged view is a lookup
+                file_view_content = self.file_content_display.toPlainText() if self.view_key is None else None
+                result_key = ResultCache.key("search", self.current_view_key(file_view_content), regex_input)
+                matching_lines = self.cached_result(result_key)
+                if matching_lines is None:
+                    # Find the lines that match the regex and clean up the date from them
+                    scan_result = self.scan_file_content([(regex_input, regex_input)], file_view_content)
+                    if scan_result is None:
+                        return
+                    positions, body = scan_result
+                    matching_lines = self.result_cache.put(result_key, (body(position) for position in positions[regex_input]))
 
                 if matching_lines:
-                    self.program_output.clear()
                     self.file_content_display.clear()
                     self.program_output.append(f"Found {len(matching_lines)} matching lines for the regex pattern '{regex_input}':")
                     self.statusbar.showMessage(f"Found {len(matching_lines)} matching lines.", 10000)
                     # Display each cleaned line
-                    for line in matching_lines:
-                        self.file_content_display.append(line)
+                    with self.profiler.stage("render"):
+                        for line in matching_lines:
+                            self.file_content_display.append(line)
+                    self.view_key = result_key
                 else:
-                    self.program_output.clear()
                     self.program_output.append(f"No matching lines found for the regex pattern '{regex_input}'.")
         except Exception as ex:
             QMessageBox.critical(self, "Error", f"An error occurred while searching and replacing the file content: {str(ex)}")
 
 
+    def scan_file_content(self, patterns, file_view_content=None):
+        # Returns the matching positions per pattern and a function returning the line at a position without its timestamp,
+        # or None if the search was too slow or cancelled. file_view_content is the text of the view if it was already read.
+        if self.displayed_lines is not None:
+            # The view shows unchanged lines of the log index, the date is removed by slicing
+            log_index = self.log_index  # The index searched, even if another file is loaded before the results are shown
+            lines = [log_index.line(line_number) for line_number in self.displayed_lines]
+            displayed_lines = self.displayed_lines
+            body = lambda position: log_index.body(displayed_lines[position])
+        else:
+            lines = (self.file_content_display.toPlainText() if file_view_content is None else file_view_content).splitlines()
+            body = lambda position: TextPipeline.TIMESTAMP_PATTERN.sub("", lines[position], count=1)
+        for _, pattern in patterns:
+            if find_nested_quantifier(pattern):
+                self.program_output.append(f"<span style='color: orange'>WARN: The pattern '{pattern}' contains nested quantifiers and can be very slow.</span>")
+
+        guard_config = self.app_config.get("regex_guard", {})
+        if not guard_config.get("enabled", True):
+            with self.profiler.stage("regex filter"):
+                positions = MultiPatternScanner(patterns).scan(lines)
+            self.profiler.count("lines scanned", len(lines))  # One pass over the lines for all patterns
+            self.profiler.count("matches", sum(len(matches) for matches in positions.values()))
+            return positions, body
+        if self.regex_guard is None:
+            self.regex_guard = GuardedRegexRunner(poll=lambda: (QApplication.processEvents(), self.cancel_requested)[1])
+        self.regex_guard.time_budget = guard_config.get("time_budget_seconds", 5)
+        self.regex_guard.chunk_lines = guard_config.get("chunk_lines", 20000)
+
+        self.cancel_requested = False
+        self.cancel_button.setVisible(True)
+        self.set_search_inputs_enabled(False)
+        try:
+            with self.profiler.stage("regex filter"):
+                positions = self.regex_guard.scan(patterns, lines)
+            self.profiler.count("matches", sum(len(matches) for matches in positions.values()))
+            return positions, body
+        except RegexTimeoutError as ex:
+            self.program_output.append(f"<span style='color: red'>ERROR: {ex}</span>")
+            self.program_output.append(f"Line {ex.position + 1}: {ex.line[:300]}")
+            self.statusbar.setStyleSheet("color: red")
+            self.statusbar.showMessage("The search has been stopped because the pattern was too slow.", 10000)
+        except RegexCancelledError:
+            self.statusbar.showMessage("The search has been cancelled.", 10000)
+        finally:
+            # The search runs in the worker process, its lines and CPU time are reported by the runner
+            self.profiler.count("lines scanned", self.regex_guard.scanned_count)
+            self.profiler.add_cpu_time("regex filter", self.regex_guard.cpu_seconds)
+            self.cancel_button.setVisible(False)
+            self.set_search_inputs_enabled(True)
+        return None
+
+
+    def set_search_inputs_enabled(self, enabled):
+        # Events are processed during a guarded search, nothing may load another file or change the view meanwhile
+        for widget in self.search_locked_groups + [self.menuBar(), self.log_dates_combobox, self.time_range_input]:
+            widget.setEnabled(enabled)
+        self.file_content_display.setReadOnly(not enabled)
+
+
     def apply_and_replace_file_content(self):
         try:
-            # Get content and user inputs
-            file_view_content = self.file_content_display.toPlainText()
+            # Get content and user inputs, the text is only copied out of the view when it identifies the view or is cleaned
+            file_view_content = self.file_content_display.toPlainText() if self.view_key is None else None
             phrase_to_remove = self.phrase_to_remove_input.text()  # Phrases to remove (comma-separated)
             original_phrase = self.find_string_input.text()  # Phrase to find
             replacement_phrase = self.replace_string_input.text()  # Phrase to replace with
 
-            lines = file_view_content.splitlines()
-            cleaned_lines = []
-
-            for line in lines:
-                # Clean and replace each line
-                cleaned_line = self.clean_line(line, phrase_to_remove, original_phrase, replacement_phrase)
-                cleaned_lines.append(cleaned_line)
+            # Clean and replace each line, unless the same cleanup of the same content is cached. The phrase removal is cached
+            # on its own, so changing only the find and replace inputs or the path rules reuses its lines.
+            path_rewriter = self.path_rewriter()
+            pipeline = TextPipeline(phrase_to_remove=phrase_to_remove, original_phrase=original_phrase, replacement_phrase=replacement_phrase, path_rewriter=path_rewriter)
+            view_key = self.current_view_key(file_view_content)
+            removed_key = ResultCache.key("remove", view_key, phrase_to_remove) if pipeline.phrase_patterns else None
+            result_key = ResultCache.key("clean", removed_key or view_key, original_phrase, replacement_phrase, path_rewriter.to_key())
+            cleaned_lines = self.cached_result(result_key)
+            if cleaned_lines is None:
+                removed_lines = self.cached_result(removed_key) if removed_key else None
+                with self.profiler.stage("clean lines"):
+                    if removed_lines is None:
+                        if file_view_content is None:
+                            file_view_content = self.file_content_display.toPlainText()
+                        removed_lines = file_view_content.splitlines()
+                        if removed_key:
+                            removed_lines = self.result_cache.put(removed_key, map(pipeline.remove_phrases, removed_lines))
+                    cleaned_lines = self.result_cache.put(result_key, map(pipeline.replace_phrases, removed_lines))
+                self.profiler.count("lines cleaned", len(cleaned_lines))
             
             if cleaned_lines:
                 # Clear the display and show the updated content
                 self.statusbar.showMessage("Applied changes to the file content.", 10000)
                 self.file_content_display.clear()
-                self.file_content_display.setPlainText("\n".join(cleaned_lines))
+                with self.profiler.stage("render"):
+                    self.file_content_display.setPlainText("\n".join(cleaned_lines))
+                self.view_key = result_key
 
         except Exception as ex:
             QMessageBox.critical(self, "Error", f"An error occurred while searching and replacing the file content: {str(ex)}")
 
 
+    def current_view_key(self, file_view_content=None):
+        # Unchanged file or result views are identified by how they were produced, edited views by their text
+        if self.view_key is not None:
+            return self.view_key
+        return ResultCache.text_key(self.file_content_display.toPlainText() if file_view_content is None else file_view_content)
+
+
+    def file_view_key(self, fingerprint, selection=""):
+        policy = self.encoding_policy()
+        return ResultCache.key("file", fingerprint, policy.encoding, policy.fallback_encoding, policy.errors, selection)
+
+
+    def cached_result(self, result_key):
+        lines = self.result_cache.get(result_key)
+        self.profiler.count("result cache hits" if lines is not None else "result cache misses")
+        return lines
+
+
+    def clear_result_cache(self):
+        self.result_cache.clear()
+        self.statusbar.showMessage("Cleared the cached search and cleanup results.", 8000)
+
+
     def clean_line(self, line, phrase_to_remove, original_phrase, replacement_phrase):
-        # Remove user-specified phrases
-        if phrase_to_remove:
-            splitted_phrase = phrase_to_remove.split(",")
-            for phrase in splitted_phrase:
-                phrase = phrase.strip()  # Remove leading/trailing spaces
-                if phrase:  # Ensure it"s not an empty string
-                    line = re.sub(re.escape(phrase) + r"\s*", "", line)
+        return TextPipeline(phrase_to_remove=phrase_to_remove, original_phrase=original_phrase, replacement_phrase=replacement_phrase).clean_line(line)
 
-        # Replace the original phrase with the replacement phrase
-        if original_phrase and replacement_phrase:
-            line = line.replace(original_phrase, replacement_phrase)
 
-        return line
+    def export_results(self):
+        try:
+            file_path = self.file_path_input.text()
+            if not self.stat_cache.isfile(split_archive_path(file_path)[0]):
+                QMessageBox.warning(self, "No input file", "Please select a log or text file to export the results from.")
+                return
+            output_path, _ = QFileDialog.getSaveFileName(self, "Export Results", "", "Text File (*.txt);;Gzip Compressed Text File (*.txt.gz)")
+            if not output_path:
+                return
+            pipeline = TextPipeline(
+                self.search_pattern_input.text(),
+                self.phrase_to_remove_input.text(),
+                self.find_string_input.text(),
+                self.replace_string_input.text(),
+                self.log_dates_combobox.currentText(),
+                self.path_rewriter(),
+            )
+            # Stream the input file through the pipeline, only the preview is kept in memory
+            with ResultExporter(output_path) as exporter:
+                exporter.export(pipeline.run_file(file_path, self.encoding_policy()), lambda count: self.statusbar.showMessage(f"Exported {count} lines...", 10000))
+            self.file_content_display.setPlainText("\n".join(exporter.preview))
+            self.program_output.setText(f"Exported {exporter.line_count} lines to {output_path}.")
+            if exporter.line_count > len(exporter.preview):
+                self.program_output.append(f"The file content view shows a preview of the first {len(exporter.preview)} lines.")
+            self.statusbar.setStyleSheet("color: #2cde85")
+            self.statusbar.showMessage("Exported results successfully.", 10000)
+        except Exception as ex:
+            QMessageBox.critical(self, "Export error", f"An error occurred while exporting the results: {str(ex)}")
+
+
+    def show_performance_report(self):
+        report = self.profiler.to_dict()
+        self.program_output.append(f"<strong>Performance report since {report['started']}:</strong>")
+        if not report["stages"]:
+            self.program_output.append("No stage has been measured yet.")
+        for name, stage in sorted(report["stages"].items(), key=lambda item: -item[1]["wall_seconds"]):
+            self.program_output.append(f"{name}: <span style='color: green'>{stage['wall_seconds']:.3f}s</span> wall, {stage['cpu_seconds']:.3f}s CPU, {stage['calls']} calls")
+        for name, value in report["counters"].items():
+            self.program_output.append(f"{name}: {format_size(value) if name.startswith('bytes') else value}")
+        for name, value in report["rates"].items():
+            self.program_output.append(f"{name.replace('_', ' ')}: {format_size(value) if name.startswith('bytes') else f'{value:.1f}'}")
+        if report["peak_memory_bytes"] is not None:
+            self.program_output.append(f"peak memory: {format_size(report['peak_memory_bytes'])}")
+        if report["traced_memory_peak_bytes"] is not None:
+            self.program_output.append(f"peak traced Python memory: {format_size(report['traced_memory_peak_bytes'])}")
+
+
+    def export_performance_report(self):
+        try:
+            output_path, _ = QFileDialog.getSaveFileName(self, "Export Performance Report", "", "JSON File (*.json)")
+            if not output_path:
+                return
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(self.profiler.to_dict(), f, indent=4)
+            self.statusbar.setStyleSheet("color: #2cde85")
+            self.statusbar.showMessage(f"Exported performance report to {output_path}.", 10000)
+        except Exception as ex:
+            QMessageBox.critical(self, "Export error", f"An error occurred while exporting the performance report: {str(ex)}")
+
+
+    def toggle_profile_capture(self, enabled):
+        try:
+            if enabled:
+                self.profiler.start_capture()
+                self.program_output.append("<span style='color: orange'>Profile capture started, the application is slower until it is turned off.</span>")
+                return
+            paths = self.profiler.stop_capture(os.path.join(self.current_working_dir, "_internal", "profiles"))
+            if paths:
+                self.program_output.append(f"Profile capture written to {paths[0]} and {paths[1]}.")
+        except Exception as ex:
+            QMessageBox.critical(self, "Profile capture error", f"An error occurred while capturing the profile: {str(ex)}")
 
 
     def fill_lobster_jar_cleanup(self):
         try:
             # Get file content
-            self.search_pattern_input.setText(r"(Marking)\s(file)")
-            self.find_string_input.setText("./lib/")
-            self.replace_string_input.setText("D:/Lobster_data/lib/")
-            self.phrase_to_remove_input.setText("Marking file, ', to be deleted on exit of JVM")
+            self.search_pattern_input.setText(self.LOBSTER_JAR_CLEANUP["search_pattern"])
+            self.find_string_input.setText(self.LOBSTER_JAR_CLEANUP["find_text"])
+            self.replace_string_input.setText(self.LOBSTER_JAR_CLEANUP["replace_text"])
+            self.phrase_to_remove_input.setText(self.LOBSTER_JAR_CLEANUP["remove_phrases"])
             if len(self.file_content_display.toPlainText()) > 0:
                 self.search_and_replace_file_content()
                 self.apply_and_replace_file_content()
@@ -825,6 +4406,37 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"An error occurred while trying to fill the lobster jar cleanup: {str(ex)}")
 
 
+    def fill_lobster_pending_deletions(self):
+        try:
+            file_path = self.file_path_input.text()
+            if not self.stat_cache.isfile(split_archive_path(file_path)[0]):
+                QMessageBox.warning(self, "No patch log loaded", "Please load the patch.log of the installation first.")
+                return
+            # The paths are mapped to the installation like by the Lobster .jar Cleanup, unless other targets are set already
+            if not self.find_string_input.text() and not self.replace_string_input.text():
+                self.find_string_input.setText(self.LOBSTER_JAR_CLEANUP["find_text"])
+                self.replace_string_input.setText(self.LOBSTER_JAR_CLEANUP["replace_text"])
+            with self.profiler.stage("parse patch log"):
+                parser = PatchLogParser().parse_file(file_path, self.encoding_policy())
+            self.profiler.count("patch log events", parser.event_count)
+            pipeline = TextPipeline(original_phrase=self.find_string_input.text(), replacement_phrase=self.replace_string_input.text(), path_rewriter=self.path_rewriter())
+            paths = list(pipeline.clean(parser.pending_paths()))
+
+            self.program_output.clear()
+            for run in parser.runs:
+                patches = ", ".join(run["patch_files"]) or "no patch file"
+                status = "" if run["finished"] else " <span style='color: orange'>(no end marker, the installer may have stopped)</span>"
+                self.program_output.append(f"Run {run['number']} ({run['started']}): {patches}, {run['installed']} installed, {run['marked']} marked, "
+                                           f"{run['deleted']} deleted, {run['delete_failed']} not deleted, {run['pending']} pending afterwards{status}")
+            self.program_output.append(f"<strong>{len(paths)} files are still pending deletion after {len(parser.runs)} patch runs.</strong>")
+            with self.profiler.stage("render"):
+                self.file_content_display.setPlainText("\n".join(paths))
+            self.statusbar.setStyleSheet("color: #2cde85")
+            self.statusbar.showMessage(f"Found {len(paths)} files pending deletion.", 10000)
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while reading the patch runs: {str(ex)}")
+
+
     def change_word_wrap(self):
         if self.change_word_wrap_action.isChecked():
             self.file_content_display.setWordWrapMode(QTextOption.ManualWrap)
@@ -838,12 +4450,12 @@ class MainWindow(QMainWindow):
         try:
             if len(file_path) == 0:
                 QMessageBox.warning(self,"No file path provided","Please provide a file path first.")
-            elif not os.path.isfile(file_path) or not os.path.exists(file_path):
+            elif not self.stat_cache.isfile(split_archive_path(file_path)[0]):
                 QMessageBox.warning(self,"Not a valid path",f"The entered file path '{file_path}' is not valid or does not exist.")
             else:
                 if "/" in file_path:
                     file_path = file_path.replace("/","\\")
-                os.startfile(file_path)
+                os.startfile(split_archive_path(file_path)[0])
         except Exception as ex:
             message = f"An exception of type {type(ex).__name__} occurred. Arguments: {ex.args!r}"
             QMessageBox.critical(self, "Open file error", message)
@@ -853,7 +4465,7 @@ class MainWindow(QMainWindow):
         try:
             if len(folder_path) == 0:
                 QMessageBox.warning(self,"No file path provided","Please provide a folder path first.")
-            elif not os.path.isdir(folder_path) or not os.path.exists(folder_path):
+            elif not self.stat_cache.isdir(folder_path):
                 QMessageBox.critical(self,"Not a valid path",f"The entered folder path '{folder_path}' is not valid or does not exist.")
             else:
                 os.startfile(folder_path)
@@ -862,9 +4474,14 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Open folder error", message)
 
 
+    def iter_clean_paths(self, file_content_display_text):
+        # Like clean_paths_in_line, one line at a time, so a long list is not copied before MoveList interns it
+        for match in re.finditer(r"[^\n]+", file_content_display_text):
+            yield match.group().replace("'", "")
+
+
     def clean_paths_in_line(self, file_content_display_text):
         try:
-            file_content_display_text = self.file_content_display.toPlainText()
             lines = file_content_display_text.splitlines()
 
             # Remove single quotes from each line
@@ -890,8 +4507,8 @@ class MainWindow(QMainWindow):
 
     def extract_dates_from_log(self, log_content):
         try:
-            # Split the log content into lines
-            lines = log_content.splitlines()
+            # Split the log content into lines, streams are read line by line
+            lines = log_content.splitlines() if isinstance(log_content, str) else log_content
 
             # Define possible date patterns with strict and specific matching
             date_patterns = [
@@ -949,6 +4566,77 @@ class MainWindow(QMainWindow):
             return []
 
 
+    def forget_displayed_index_lines(self):
+        # Any change of the file content view means it no longer mirrors the log index or a cached result
+        self.displayed_lines = None
+        self.view_key = None
+
+
+    def show_index_lines(self, line_numbers, selection):
+        with self.profiler.stage("render"):
+            self.file_content_display.setPlainText("\n".join(self.log_index.line(line_number) for line_number in line_numbers))
+        self.displayed_lines = line_numbers
+        self.view_key = self.file_view_key(self.log_index_fingerprint, selection) if self.log_index_fingerprint else None
+
+
+    def display_log_date(self, selected_date):
+        if self.log_index is None:
+            self.extract_lines_by_date_and_display(self.extract_data_from_log(self.file_path_input.text()), selected_date)
+            return
+        try:
+            if self.log_dates_combobox.count() > 0:
+                self.time_range_input.clear()
+                self.show_index_lines(self.log_index.lines_for_date(selected_date), selected_date)
+                self.program_output.setText(f"Loaded log entries for selected date {selected_date} in file view...")
+            else:
+                self.program_output.clear()
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while displaying the log entries: {str(ex)}")
+
+
+    def filter_time_range(self):
+        try:
+            if self.log_index is None:
+                QMessageBox.warning(self, "No log file loaded", "Time ranges can only be used for log files with dates.")
+                return
+            selected_date = self.log_dates_combobox.currentText()
+            time_range = self.time_range_input.text().replace("–", "-").strip()
+            if not time_range:
+                self.display_log_date(selected_date)
+                return
+            # The range ends at the first "-" after a time, the "-" in DD-MM-YY dates belongs to the date
+            range_match = re.match(r"(.*?\d{2}:\d{2}(?::\d{2})?)\s*-(.*)", time_range)
+            start_text, end_text = range_match.groups() if range_match else (time_range, "")
+            # Times without a date refer to the selected date
+            has_date = lambda text: re.match(r"\s*\d{2}[.-]\d{2}[.-]", text) is not None
+            start = LogIndex.parse_timestamp(start_text if has_date(start_text) else f"{selected_date} {start_text}")
+            end = LogIndex.parse_timestamp(end_text if has_date(end_text) else f"{selected_date} {end_text}") if end_text.strip() else None
+            if start is None or (end_text.strip() and end is None):
+                QMessageBox.warning(self, "Invalid time range", f"The time range '{time_range}' could not be read, use e.g. 17:11:09-17:11:20.")
+                return
+            if end is None:
+                end = start + 59 if start_text.count(":") == 1 else start
+            elif end_text.count(":") == 1:
+                end += 59  # HH:MM includes the whole minute
+            line_numbers = self.log_index.lines_between(start, end)
+            self.show_index_lines(line_numbers, f"{start}-{end}")
+            self.program_output.setText(f"Loaded {len(line_numbers)} log entries between {start_text.strip()} and {end_text.strip() or start_text.strip()}.")
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while filtering the time range: {str(ex)}")
+
+
+    def load_log_index(self, file_path):
+        self.log_index_fingerprint = FileStatistics.fingerprint(file_path)
+        with self.profiler.stage("read"):
+            self.log_index = LogIndex(read_log_text(file_path, self.encoding_policy()))
+        self.profiler.count("lines read", len(self.log_index))
+        with self.profiler.stage("extract dates"):
+            dates = self.log_index.dates()
+        if not dates:
+            QMessageBox.critical(self, "An error occurred", "An exception of type ValueError occurred while trying to get the log file dates. No valid date patterns found in the log file.")
+        return dates
+
+
     def extract_lines_by_date_and_display(self, log_content, selected_date):
         filtered_lines = [
             line for line in log_content.splitlines() if line.startswith(selected_date)
@@ -970,9 +4658,7 @@ class MainWindow(QMainWindow):
     def extract_data_from_log(self, file_path):
         try:
             if file_path:
-                with open(file_path, "r") as file:
-                    file_data = file.read()
-                return file_data
+                return read_log_text(file_path, self.encoding_policy())
         except Exception as ex:
             QMessageBox.critical(self, "Error", f"An error occurred while reading the file: {str(ex)}")
 
@@ -981,15 +4667,24 @@ class MainWindow(QMainWindow):
         try:
             current_text = self.log_dates_combobox.currentText()
             file_path = self.file_path_input.text()
-            if os.path.isfile(file_path):
-                with open(file_path, "r") as file:
-                    file_data = file.read()
+            if self.stat_cache.isfile(split_archive_path(file_path)[0]):
                 if self.log_dates_combobox.count() > 0:
-                    lines = self.extract_lines_by_date_and_display(file_data, current_text)
-                    for line in lines:
-                        self.file_content_display.append(line)
+                    # Re-parse the log, it may have grown since it was loaded
+                    dates = self.load_log_index(file_path)
+                    self.log_dates_combobox.blockSignals(True)
+                    self.log_dates_combobox.clear()
+                    self.log_dates_combobox.addItems(dates)
+                    self.log_dates_combobox.setCurrentText(current_text)
+                    self.log_dates_combobox.blockSignals(False)
+                    self.display_log_date(self.log_dates_combobox.currentText())
                 else:
-                    self.file_content_display.setPlainText(file_data)
+                    fingerprint = self.log_index_fingerprint = FileStatistics.fingerprint(file_path)
+                    with self.profiler.stage("read"):
+                        file_data = read_log_text(file_path, self.encoding_policy())
+                    with self.profiler.stage("render"):
+                        self.file_content_display.setPlainText(file_data)
+                    self.view_key = self.file_view_key(fingerprint)
+                self.show_file_statistics(file_path)
         except Exception as ex:
             QMessageBox.critical(self, "Error", f"An error occurred while refreshing the file content: {str(ex)}")
 
@@ -997,43 +4692,184 @@ class MainWindow(QMainWindow):
     def browse_file(self):
         try:
             file_dialog = QFileDialog(self)
-            file_path, _ = file_dialog.getOpenFileNames(self, "Open File", "", "Log File (*.log);;Text File (*.txt)")
+            file_path, _ = file_dialog.getOpenFileNames(self, "Open File", "", "Log File (*.log *.log.gz *.log.bz2 *.zip *.7z);;Text File (*.txt *.txt.gz *.txt.bz2)")
             if not file_path:
                 return
             else:
                 # Clear log dates combobox
                 if self.log_dates_combobox.count() > 0:
                     self.log_dates_combobox.clear()
-                file_path = file_path[0]
-                file_extension = Path(file_path).suffix
+                file_path = self.choose_archive_member(file_path[0])
+                file_extension = log_file_suffix(file_path) if file_path else ""
                 if file_path and file_extension == ".log":
                     self.file_content_display.clear()
                     self.file_path_input.setText(file_path)
-                    with open(file_path, "r") as file:
-                        file_data = file.read()
-                        self.log_dates_combobox.addItems(self.extract_dates_from_log(file_data))
-                        last_item_index = self.log_dates_combobox.count() - 1
-                        self.log_dates_combobox.setCurrentIndex(last_item_index) # Load the last item in the list
+                    # Parse the log once, dates and time ranges are looked up in the index afterwards
+                    self.log_dates_combobox.addItems(self.load_log_index(file_path))
+                    last_item_index = self.log_dates_combobox.count() - 1
+                    self.log_dates_combobox.setCurrentIndex(last_item_index) # Load the last item in the list
                     self.statusbar.setStyleSheet("color: #2cde85")
                     self.statusbar.showMessage("Loaded log file successfully.", 8000)
+                    self.show_file_statistics(file_path)
                 elif file_path and file_extension == ".txt":
+                    self.log_index = None
                     if self.log_dates_combobox.count() > 0:
                         self.log_dates_combobox.clear()
                     self.file_content_display.clear()
                     self.file_path_input.setText(file_path)
-                    with open(file_path, "r") as file:
-                        file_data = file.read()
+                    fingerprint = self.log_index_fingerprint = FileStatistics.fingerprint(file_path)
+                    with self.profiler.stage("read"):
+                        file_data = read_log_text(file_path, self.encoding_policy())
+                    with self.profiler.stage("render"):
                         self.file_content_display.setPlainText(file_data)
+                    self.view_key = self.file_view_key(fingerprint)
                     self.statusbar.setStyleSheet("color: #2cde85")
                     self.statusbar.showMessage("Loaded text file successfully.", 8000)
+                    self.show_file_statistics(file_path)
         except Exception as ex:
             QMessageBox.critical(self, "Error", f"An error occurred while opening the file: {str(ex)}")
 
 
+    def choose_archive_member(self, file_path):
+        # Archives can contain several logs, let the user pick one and address it as 'archive.zip::member.log'
+        if not file_path.lower().endswith(ARCHIVE_EXTENSIONS):
+            return file_path
+        members = [member for member in list_archive_members(file_path) if log_file_suffix(member) in (".log", ".txt")]
+        if not members:
+            QMessageBox.warning(self, "No log file found", f"The archive '{file_path}' does not contain any .log or .txt files.")
+            return ""
+        if len(members) == 1:
+            return f"{file_path}::{members[0]}"
+        member, ok = QInputDialog.getItem(self, "Select log file", "The archive contains several files, select the one to open:", members, 0, False)
+        return f"{file_path}::{member}" if ok else ""
+
+
+    def toggle_path_annotation(self, enabled):
+        if enabled:
+            self.annotate_paths()
+        else:
+            self.path_status_timer.stop()
+            self.path_lines = {}
+            self.path_backlog.clear()
+            self.path_selections = {}
+            self.file_content_display.setExtraSelections([])
+            self.path_status_label.clear()
+
+
+    def visible_line_range(self):
+        viewport = self.file_content_display.viewport()
+        first = self.file_content_display.cursorForPosition(QPoint(0, 0)).blockNumber()
+        last = self.file_content_display.cursorForPosition(QPoint(0, viewport.height() - 1)).blockNumber()
+        return first, last
+
+
+    def annotate_paths(self):
+        # Collect the path lines, check the visible ones first and the rest a batch at a time
+        self.path_lines = {}
+        for line_number, line in enumerate(self.file_content_display.toPlainText().split("\n")):
+            path = PathStatusChecker.path_of(line)
+            if path:
+                self.path_lines.setdefault(path, []).append(line_number)
+        self.path_backlog = deque(self.path_lines)
+        self.path_selections = {}
+        self.file_content_display.setExtraSelections([])
+        self.submit_path_checks()
+        self.apply_path_statuses(force=True)
+
+
+    def submit_path_checks(self, batch_size=64):
+        document = self.file_content_display.document()
+        first, last = self.visible_line_range()
+        visible = [PathStatusChecker.path_of(document.findBlockByNumber(line_number).text()) for line_number in range(first, last + 1)]
+        self.path_checker.submit([path for path in visible if path in self.path_lines])
+        while self.path_backlog and self.path_checker.pending_count() < batch_size:
+            self.path_checker.submit([self.path_backlog.popleft()])
+        if self.path_checker.pending_count():
+            self.path_status_timer.start()
+
+
+    def apply_path_statuses(self, force=False):
+        changed = self.path_checker.drain()
+        if self.path_backlog:
+            self.submit_path_checks()
+        if not changed and not force:
+            if not self.path_checker.pending_count():
+                self.path_status_timer.stop()
+            return
+        colors = {"missing": QColor(200, 40, 40, 90), "locked": QColor(230, 140, 20, 90), "exists": QColor(40, 160, 80, 50)}
+        document = self.file_content_display.document()
+        # Only the checked paths get new selections, the others keep the ones already drawn
+        for path in changed if not force else self.path_lines:
+            line_numbers = self.path_lines.get(path)
+            status = self.path_checker.cached(path)
+            if line_numbers is None or status is None:
+                continue
+            selections = []
+            for line_number in line_numbers:
+                selection = QTextEdit.ExtraSelection()
+                selection.cursor = QTextCursor(document.findBlockByNumber(line_number))
+                selection.format.setBackground(colors[status["state"]])
+                selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+                selections.append(selection)
+            self.path_selections[path] = (status["state"], status["size"] or 0, selections)
+        self.file_content_display.setExtraSelections([selection for _, _, selections in self.path_selections.values() for selection in selections])
+        totals = {"exists": 0, "missing": 0, "locked": 0}
+        total_size = 0
+        for state, size, _ in self.path_selections.values():
+            totals[state] += 1
+            total_size += size
+        pending = self.path_checker.pending_count() + len(self.path_backlog)
+        summary = f"Paths: {totals['exists']} found ({format_size(total_size)}), {totals['missing']} missing, {totals['locked']} locked"
+        self.path_status_label.setText(summary + (f", {pending} checking..." if pending else ""))
+
+
+    def show_cursor_line_status(self):
+        cursor = self.file_content_display.textCursor()
+        message = f"Line: {cursor.blockNumber() + 1}"
+        if self.annotate_paths_action.isChecked():
+            path = PathStatusChecker.path_of(cursor.block().text())
+            status = self.path_checker.cached(path) if path else None
+            if status is not None:
+                message += f" | {status['state']}" + (f", {format_size(status['size'])}" if status["size"] is not None else "")
+        self.line_count_statusbar.showMessage(message, 10000)
+
+
     def get_line_count(self, file_path):
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-            return len(lines)
+        return self.file_statistics.stats(file_path)["lines"]
+
+
+    def show_file_statistics(self, file_path):
+        try:
+            statistics = self.file_statistics.cached(file_path)
+        except OSError:
+            self.file_statistics_label.clear()
+            return
+        if statistics:
+            self.display_file_statistics(file_path, statistics)
+            return
+        self.file_statistics_label.setText("Counting lines...")
+
+        def count():
+            try:
+                result = self.file_statistics.stats(file_path)
+            except Exception as ex:
+                result = ex
+            self.statistics_notifier.finished.emit(file_path, result)
+
+        self.statistics_executor.submit(count)
+
+
+    def display_file_statistics(self, file_path, statistics):
+        if file_path != self.file_path_input.text():
+            return  # Another file has been loaded in the meantime
+        if isinstance(statistics, Exception):
+            self.file_statistics_label.setText(f"Statistics not available: {statistics}")
+            return
+        parts = [f"{statistics['lines']:,} lines", format_size(statistics["bytes"])]
+        if statistics["first_date"]:
+            parts.append(f"{statistics['first_date']} – {statistics['last_date']}")
+        parts.append(statistics["encoding"])
+        self.file_statistics_label.setText(" | ".join(parts))
 
 
     def browse_folder(self):
@@ -1059,66 +4895,471 @@ class MainWindow(QMainWindow):
                 self.statusbar.showMessage("File content display is empty, hence nothing to move.")
                 return
             else:
+                # Offer to finish an interrupted run first, otherwise its remaining files would be reported as missing
+                latest_journal = MoveJournal.latest(self.journal_dir)
+                if latest_journal and not MoveJournal(latest_journal).read_state()["finished"]:
+                    reply = QMessageBox.question(self, "Interrupted move found", "The last move did not finish.\nDo you want to resume it instead of starting a new move?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+                    if reply == QMessageBox.Yes:
+                        self.resume_move()
+                        return
+
                 self.statusbar.setStyleSheet("color: #2cde85")
                 self.statusbar.showMessage("Using the displayed file content.", 10000)
                 self.program_output.clear()
-                    
-                check_path_string_delimiter = ["/", "\\"]
-                task_completed_message = "Task finished, results:"
-                #self.statusbar.setStyleSheet("color: #2cde85")
-                line_count = 1
-                err_count = 0
-                warn_count = 0
 
-                try:
-                    # Cleaned paths without high commas in the file content display
-                    lines = self.clean_paths_in_line(text_containing_file_paths)
-                    total_lines = len(lines)
-                    for line in lines:
-                        #progress = round((line_count / total_lines) * 100)
-                        file_to_move = line.strip()
-                        if file_to_move:
-                            # Get the file name with its immediate parent directory
-                            if check_path_string_delimiter[0] in file_to_move:  # Forward slash
-                                sub_dir = "/".join(file_to_move.split("/")[-2:])  # Gets "lib/filename.jar"
-                            elif check_path_string_delimiter[1] in file_to_move:  # Backslash
-                                sub_dir = "\\".join(file_to_move.split("\\")[-2:])  # Gets "lib\filename.jar"
-                            # Create the full destination path
-                            current_destination = os.path.join(destination, sub_dir)
-
-                            try:
-                                # Ensure the destination directory exists
-                                if os.path.exists(file_to_move):
-                                    os.makedirs(os.path.dirname(current_destination), exist_ok=True)
-                                shutil.move(file_to_move, current_destination)
-                                self.program_output.append(f"Moved <span style='color:rgb(39, 124, 236)'>{file_to_move}</span> to <span style='color: green'>{current_destination}</span>")
-                                self.statusbar.showMessage(f"Moved {line_count}/{total_lines} files.", 10000)
-                            except FileNotFoundError:
-                                self.program_output.append(f"<span style='color: orange'>WARN: {file_to_move}</span> not found, skipping.")
-                                warn_count += 1
-                                continue
-                            except shutil.Error as e:
-                                self.program_output.append(f"<span style='color: red'>ERROR: {e}</span>")
-                                err_count += 1
-                                continue
-                            line_count += 1
-                    self.program_output.append(f"\n{task_completed_message}\n")
-                    if err_count > 0:
-                        self.program_output.append(f"<span style='color: red'><strong>ERROR:</strong></span> {err_count} files failed to move.")
-                    if warn_count > 0:
-                        self.program_output.append(f"<span style='color: orange'><strong>WARNING:</strong></span> {warn_count} files were not found.")
-                except Exception as e:
-                    self.program_output.append(f"<span style='color: red'>FATAL ERROR: {e}</span>")
+                # Cleaned paths without high commas in the file content display
+                self.move_paths(destination, self.iter_clean_paths(text_containing_file_paths))
+
+
+    def move_paths(self, destination, lines):
+        try:
+            mover = self.active_mover = self.create_mover(destination)
+            with self.profiler.stage("plan"):
+                plan = MovePlanner(mover, deduplicator=self.create_deduplicator()).plan(lines)
+            # Created once the plan stands, a failed plan must not leave an unfinished move to resume behind
+            mover.journal = MoveJournal.create(self.journal_dir, destination)
+            self.report_plan_conflicts(plan)
+            self.total_files_to_move = len(plan["entries"])
+            mover.duplicates = plan["content_duplicates"]
+            mover.duplicate_stats = plan["duplicate_stats"]
+            mover.journal.record_plan(plan["entries"], plan["content_duplicates"], plan["duplicate_stats"])
+            mover.mark_missing(plan["missing"])
+            with self.profiler.stage("move"), low_io_priority(self.app_config.get("move_throttle", {}).get("low_io_priority", False)):
+                mover.move(plan["entries"])
+            self.report_move_results(mover, plan)
+        except Exception as e:
+            self.program_output.append(f"<span style='color: red'>FATAL ERROR: {e}</span>")
+
+
+    def open_directory_scan(self):
+        self.directory_scan_window = DirectoryScan(self)
+        self.directory_scan_window.show()
+
+
+    def scan_directory(self, scanner, move_directly=False):
+        self.program_output.setText(f"Searching {scanner.root} for {', '.join(scanner.patterns)}...")
+        started = time.perf_counter()
+        found = []
+        if not move_directly:
+            self.file_content_display.clear()
+        for files in scanner.scan():
+            found.extend(files)
+            if not move_directly:
+                # Stream the results into the view while the other directories are still being read
+                self.file_content_display.append("\n".join(files))
+            self.statusbar.showMessage(f"Found {len(found)} of {scanner.scanned_count} scanned files...", 10000)
+            QApplication.processEvents()
+        self.program_output.append(f"Found {len(found)} matching files out of {scanner.scanned_count} in {time.perf_counter() - started:.1f} seconds.")
+        if move_directly and found:
+            self.move_paths(self.destination_input.text(), found)
+
+
+    def dry_run_move(self):
+        destination = self.destination_input.text()
+        text_containing_file_paths = self.file_content_display.toPlainText()
+        if not destination or not text_containing_file_paths:
+            QMessageBox.warning(self, "Nothing to plan", "Please provide a destination directory and file paths in the file content view first.")
+            return
+        try:
+            mover = self.create_mover(destination, dry_run=True)
+            plan = MovePlanner(mover, deduplicator=self.create_deduplicator()).plan(self.iter_clean_paths(text_containing_file_paths))
+            self.program_output.clear()
+            self.program_output.append("<strong>Dry run, no files have been moved.</strong>")
+            if not mover.writes_to_folder:
+                self.program_output.append(f"Files to pack: {len(plan['entries'])} ({format_size(plan['total_bytes'])}) into {mover.archive_path}, the sources are deleted after the archive has been verified.")
+            else:
+                self.program_output.append(f"Files to move: {len(plan['entries'])} ({format_size(plan['total_bytes'])}), {plan['renames']} renames on the same drive, {plan['cross_device']} copies to another drive.")
+            if plan["duplicates"] > 0:
+                self.program_output.append(f"Removed {plan['duplicates']} repeated paths.")
+            if plan["missing_parents"]:
+                self.program_output.append(f"Destination directories to create: {len(plan['missing_parents'])}")
+            for file_to_move in plan["missing"]:
+                self.program_output.append(f"<span style='color: orange'>WARN: {file_to_move}</span> not found.")
+            self.report_plan_conflicts(plan)
+            for primary, duplicate_files in plan["content_duplicates"].items():
+                self.program_output.append(f"<span style='color: orange'>DUPLICATE: {', '.join(duplicate_files)}</span> identical to {primary}, will be deleted after it was moved.")
+            if plan["content_duplicates"]:
+                self.program_output.append(f"Identical copies to delete: {sum(len(duplicate_files) for duplicate_files in plan['content_duplicates'].values())} ({format_size(plan['duplicate_bytes'])} not copied).")
+            self.statusbar.setStyleSheet("color: #2cde85")
+            self.statusbar.showMessage(f"Dry run finished, {len(plan['entries'])} files can be moved.", 10000)
+        except Exception as ex:
+            QMessageBox.critical(self, "Dry run error", f"An error occurred while planning the move: {str(ex)}")
+
+
+    def create_mover(self, destination, journal=None, state=None, dry_run=False):
+        # The journal of a resumed or undone move decides the target, otherwise the selected move target
+        archive_path = state["archive"] if state else None
+        if state is None and self.move_target_combo.currentText() != "Move to Folder":
+            extension = ".7z" if "7z" in self.move_target_combo.currentText() else ".zip"
+            archive_path = ArchiveMover.dated_archive_path(destination, extension)
+        throttle = None if dry_run else self.create_move_throttle()
+        if archive_path:
+            return ArchiveMover(destination, archive_path, journal, self.report_move_progress, self.stat_cache, throttle)
+        return FileMover(destination, journal, self.report_move_progress, self.stat_cache, throttle)
+
+
+    def path_rewriter(self):
+        return PrefixRewriter.from_config(self.app_config.get("path_rules", {}))
+
+
+    def open_path_rewrite_rules(self):
+        self.w = PathRewriteRules(self)
+        self.w.show()
+
+
+    def encoding_policy(self):
+        return EncodingPolicy.from_config(self.app_config.get("encoding", {}))
+
+
+    def create_deduplicator(self):
+        if self.dedup_mode_combo.currentText() != "Collapse Duplicates":
+            return None
+        return ContentDeduplicator(self.hash_cache)
+
+
+    def report_plan_conflicts(self, plan):
+        for current_destination, sources in plan["collisions"].items():
+            self.program_output.append(f"<span style='color: red'>COLLISION: {', '.join(sources)}</span> would all be moved to {current_destination}, only the first one is moved.")
+        for file_to_move, current_destination in plan["existing"]:
+            self.program_output.append(f"<span style='color: red'>EXISTS: {current_destination}</span> already exists, skipping {file_to_move}.")
+
+
+    def resume_move(self):
+        try:
+            latest_journal = MoveJournal.latest(self.journal_dir)
+            if not latest_journal:
+                QMessageBox.information(self, "Nothing to resume", "No move journal has been found.")
+                return
+            journal = MoveJournal(latest_journal)
+            state = journal.read_state()
+            if state["finished"]:
+                QMessageBox.information(self, "Nothing to resume", "The last move has already finished.")
+                return
+            self.program_output.clear()
+            self.program_output.append(f"Resuming move started at {state['time']} to {state['destination']}...")
+            mover = self.active_mover = self.create_mover(state["destination"], journal, state)
+            self.total_files_to_move = len(state["planned"]) - len(state["done"])  # The mover counts the files moved by this run only
+            with self.profiler.stage("move"), low_io_priority(self.app_config.get("move_throttle", {}).get("low_io_priority", False)):
+                skipped = mover.resume(state)
+            self.program_output.append(f"Skipped {skipped} entries that were already processed.")
+            if state["missing"]:
+                self.program_output.append(f"<span style='color: orange'>WARN:</span> {len(state['missing'])} files were already reported as not found.")
+            self.report_move_results(mover)
+        except Exception as ex:
+            QMessageBox.critical(self, "Resume move error", f"An error occurred while resuming the move: {str(ex)}")
+
+
+    def undo_last_move(self):
+        try:
+            latest_journal = MoveJournal.latest(self.journal_dir)
+            if not latest_journal:
+                QMessageBox.information(self, "Nothing to undo", "No move journal has been found.")
+                return
+            journal = MoveJournal(latest_journal)
+            state = journal.read_state()
+            to_undo = len(state["done"]) + len(state["deduped"]) - len(state["undone"])
+            if to_undo <= 0:
+                QMessageBox.information(self, "Nothing to undo", "All files of the last move are already at their original location.")
+                return
+            reply = QMessageBox.question(self, "Undo last move?", f"Do you want to move {to_undo} files back to their original location?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+            self.program_output.clear()
+            mover = self.active_mover = self.create_mover(state["destination"], journal, state)
+            self.total_files_to_move = to_undo
+            with low_io_priority(self.app_config.get("move_throttle", {}).get("low_io_priority", False)):
+                mover.undo(state)
+            self.report_move_results(mover, undo=True)
+        except Exception as ex:
+            QMessageBox.critical(self, "Undo move error", f"An error occurred while undoing the last move: {str(ex)}")
+
+
+    def create_move_throttle(self):
+        # Re-read the settings so changes made with Edit Settings apply to the next move
+        self.app_config.reload()
+        throttle = IOThrottle.from_config(self.app_config.get("move_throttle", {}))
+        if throttle.is_enabled():
+            limits = []
+            if throttle.bandwidth.rate > 0:
+                limits.append(f"{format_size(throttle.bandwidth.rate)}/s")
+            if throttle.operations.rate > 0:
+                limits.append(f"{throttle.operations.rate} files/s")
+            if throttle.latency_threshold > 0:
+                limits.append(f"back-off above {throttle.latency_threshold * 1000:.0f} ms latency")
+            self.program_output.append(f"Throttling moves to {', '.join(limits)}.")
+        return throttle
+
+
+    def report_move_progress(self, event, file_to_move, detail):
+        if event == "moved":
+            self.program_output.append(f"Moved <span style='color:rgb(39, 124, 236)'>{file_to_move}</span> to <span style='color: green'>{detail}</span>")
+            self.statusbar.showMessage(f"Moved {self.active_mover.moved_count}/{self.total_files_to_move} files.", 10000)
+        elif event == "deduped":
+            self.program_output.append(f"Deleted duplicate <span style='color:rgb(39, 124, 236)'>{file_to_move}</span>, identical to <span style='color: green'>{detail}</span>")
+        elif event == "restored":
+            self.program_output.append(f"Restored duplicate <span style='color:rgb(39, 124, 236)'>{file_to_move}</span> from <span style='color: green'>{detail}</span>")
+        elif event == "missing":
+            self.program_output.append(f"<span style='color: orange'>WARN: {file_to_move}</span> not found, skipping.")
+        elif event == "error":
+            self.program_output.append(f"<span style='color: red'>ERROR: {detail}</span>")
+
+
+    def report_move_results(self, mover, plan=None, undo=False):
+        self.path_checker.invalidate()
+        if self.annotate_paths_action.isChecked():
+            self.annotate_paths()
+        if not undo:  # Files moved back are not part of the move throughput
+            self.profiler.count("files moved", mover.moved_count)
+            self.profiler.count("bytes moved", mover.moved_bytes)
+        self.program_output.append("\nTask finished, results:\n")
+        if mover.throttle.backoff_count > 0:
+            self.program_output.append(f"<span style='color: orange'><strong>THROTTLED:</strong></span> backed off {mover.throttle.backoff_count} times because of high disk latency.")
+        if plan:
+            skipped = sum(len(sources) - 1 for sources in plan["collisions"].values()) + len(plan["existing"])
+            if skipped > 0:
+                self.program_output.append(f"<span style='color: red'><strong>SKIPPED:</strong></span> {skipped} files because of destination conflicts.")
+        if mover.deduped_count > 0:
+            self.program_output.append(f"<span style='color: green'><strong>DEDUPLICATED:</strong></span> deleted {mover.deduped_count} identical copies instead of moving them.")
+        if mover.err_count > 0:
+            self.program_output.append(f"<span style='color: red'><strong>ERROR:</strong></span> {mover.err_count} files failed to move.")
+        if mover.warn_count > 0:
+            self.program_output.append(f"<span style='color: orange'><strong>WARNING:</strong></span> {mover.warn_count} files were not found.")
+
+
+    def connect_to_agent(self):
+        config = self.app_config.get("agent", {})
+        address, ok = QInputDialog.getText(self, "Connect to Agent", "Agent address (host:port):", text=f"{config.get('host', '127.0.0.1')}:{config.get('port', 8765)}")
+        if not ok or not address.strip():
+            return
+        host, _, port = address.strip().rpartition(":")
+        try:
+            client = AgentClient(host or address.strip(), int(port) if port.isdigit() else config.get("port", 8765), config.get("token", ""), config.get("timeout_seconds", 30))
+            info = client.ping()
+        except AgentError as e:
+            QMessageBox.critical(self, "Agent not reachable", str(e))
+            return
+        self.agent_client = client
+        self.statusbar.setStyleSheet("color: #2cde85")
+        self.statusbar.showMessage(f"Connected to the agent on {info['host']}.", 10000)
+        self.program_output.append(f"Connected to the agent on <span style='color: green'>{info['host']}</span> ({client.host}:{client.port}).")
+
+
+    def run_action_on_agent(self):
+        if self.agent_client is None:
+            QMessageBox.warning(self, "No agent connected", "Connect to an agent first (Agent > Connect to Agent...).")
+            return
+        remote_path, ok = QInputDialog.getText(self, "Run Action on Remote Log", "Path of the log on the agent's machine:", text=self.remote_log_path)
+        if not ok or not remote_path.strip():
+            return
+        try:
+            self.remote_log_path = remote_path.strip()
+            dates = self.agent_client.dates(self.remote_log_path)["dates"]
+            date = ""
+            if dates:
+                date, ok = QInputDialog.getItem(self, "Select date", "Log entries of:", ["All dates"] + dates, len(dates), False)
+                if not ok:
+                    return
+                date = "" if date == "All dates" else date
+            action = {
+                "search_pattern": self.search_pattern_input.text(),
+                "remove_phrases": self.phrase_to_remove_input.text(),
+                "find_text": self.find_string_input.text(),
+                "replace_text": self.replace_string_input.text(),
+                "path_rules": self.app_config.get("path_rules", {}),
+            }
+
+            def progress(received):
+                self.statusbar.showMessage(f"Received {received} lines from the agent...")
+                QApplication.processEvents()
+
+            with self.profiler.stage("agent run"):
+                lines = self.agent_client.run(self.remote_log_path, action, date, progress)
+            with self.profiler.stage("render"):
+                self.file_content_display.setPlainText("\n".join(lines))
+            self.program_output.append(f"Received {len(lines)} resulting lines of <span style='color:rgb(39, 124, 236)'>{self.remote_log_path}</span>{f' for {date}' if date else ''} from the agent.")
+            self.statusbar.showMessage(f"Received {len(lines)} lines from the agent.", 10000)
+        except AgentError as e:
+            self.program_output.append(f"<span style='color: red'>ERROR: {e}</span>")
+            QMessageBox.critical(self, "Agent error", str(e))
+
+
+    def move_files_on_agent(self):
+        if self.agent_client is None:
+            QMessageBox.warning(self, "No agent connected", "Connect to an agent first (Agent > Connect to Agent...).")
+            return
+        destination = self.destination_input.text()
+        paths = self.clean_paths_in_line(self.file_content_display.toPlainText())
+        if not destination or not paths:
+            self.statusbar.setStyleSheet("color: red")
+            self.statusbar.showMessage("Please provide a destination directory and the files to move.", 10000)
+            return
+        self.program_output.clear()
+
+        def progress(message):
+            if message["event"] == "moved":
+                self.program_output.append(f"Moved <span style='color:rgb(39, 124, 236)'>{message['file']}</span> to <span style='color: green'>{message['detail']}</span> on the agent")
+                self.statusbar.showMessage(f"Moved {message['moved']}/{message['total']} files on the agent.", 10000)
+            elif message["event"] == "conflict":
+                self.program_output.append(f"<span style='color: red'>{message['detail']}</span>")
+            else:
+                self.report_move_progress(message["event"], message["file"], message["detail"])
+            QApplication.processEvents()
+
+        try:
+            with self.profiler.stage("move"):
+                result = self.agent_client.move(paths, destination, progress)
+        except AgentError as e:
+            self.program_output.append(f"<span style='color: red'>FATAL ERROR: {e}</span>")
+            return
+        self.profiler.count("files moved", result["moved"])
+        self.profiler.count("bytes moved", result["bytes"])
+        self.program_output.append("\nTask finished on the agent, results:\n")
+        self.program_output.append(f"<span style='color: green'><strong>MOVED:</strong></span> {result['moved']} files ({format_size(result['bytes'])}).")
+        if result["skipped"] > 0:
+            self.program_output.append(f"<span style='color: red'><strong>SKIPPED:</strong></span> {result['skipped']} files because of destination conflicts.")
+        if result["failed"] > 0:
+            self.program_output.append(f"<span style='color: red'><strong>ERROR:</strong></span> {result['failed']} files failed to move.")
+        if result["missing"] > 0:
+            self.program_output.append(f"<span style='color: orange'><strong>WARNING:</strong></span> {result['missing']} files were not found.")
 
 
     def closeEvent(self, event: QCloseEvent):
         # Save geometry on close
         geometry = self.saveGeometry()
         self.settings.setValue("geometry", geometry)
+        if self.regex_guard is not None:
+            self.regex_guard.shutdown()
+        if self.capture_profile_action.isChecked():
+            self.capture_profile_action.setChecked(False)  # Writes the running capture
+        if self.app_config.get("session", {}).get("restore", True):
+            self.save_session()  # Before the run log is closed, a failed save is logged there
+        self.run_log.close()
+        self.statistics_executor.shutdown(wait=False, cancel_futures=True)
+        self.path_checker.shutdown()
         super(MainWindow, self).closeEvent(event)
         
 
 
+    def save_session(self):
+        # Snapshot of the workspace: the file with its fingerprint, the inputs and how to rebuild the file content view
+        try:
+            file_path = self.file_path_input.text()
+            session = {
+                "file_path": file_path,
+                "fingerprint": None,
+                "dates": [self.log_dates_combobox.itemText(index) for index in range(self.log_dates_combobox.count())],
+                "selected_date": self.log_dates_combobox.currentText(),
+                "time_range": self.time_range_input.text(),
+                "inputs": {
+                    "search_pattern": self.search_pattern_input.text(),
+                    "find_text": self.find_string_input.text(),
+                    "replace_text": self.replace_string_input.text(),
+                    "remove_phrases": self.phrase_to_remove_input.text(),
+                    "destination": self.destination_input.text(),
+                },
+                "view": None,
+            }
+            if file_path and self.log_index_fingerprint:
+                # The state the view was built from, a file changed since then is loaded again with a warning on restore
+                session["fingerprint"] = self.log_index_fingerprint
+                if self.log_index is not None:
+                    self.log_index.save(self.session_index_path, self.log_index_fingerprint)
+            if self.displayed_lines is not None:
+                session["view"] = {"kind": "index"}
+            elif self.view_key is not None and self.result_cache.persist(self.view_key):
+                session["view"] = {"kind": "result", "key": self.view_key}
+            else:
+                text = self.file_content_display.toPlainText()
+                if text and len(text) <= self.app_config.get("session", {}).get("max_view_text_bytes", 1024 * 1024):
+                    session["view"] = {"kind": "text", "text": text}
+            os.makedirs(os.path.dirname(self.session_path), exist_ok=True)
+            with open(self.session_path, "w", encoding="utf-8") as f:
+                json.dump(session, f)
+        except Exception as ex:
+            self.run_log.add(f"ERROR: The session could not be saved: {ex}", "error")
+
+
+    def restore_session(self):
+        try:
+            with open(self.session_path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        try:
+            inputs = session.get("inputs", {})
+            self.search_pattern_input.setText(inputs.get("search_pattern", ""))
+            self.find_string_input.setText(inputs.get("find_text", ""))
+            self.replace_string_input.setText(inputs.get("replace_text", ""))
+            self.phrase_to_remove_input.setText(inputs.get("remove_phrases", ""))
+            self.destination_input.setText(inputs.get("destination", ""))
+            file_path = session.get("file_path", "")
+            if not file_path or not self.stat_cache.isfile(split_archive_path(file_path)[0]):
+                return
+            fingerprint = FileStatistics.fingerprint(file_path)
+            unchanged = fingerprint == session.get("fingerprint")
+            self.file_path_input.setText(file_path)
+            view = session.get("view") or {}
+            if log_file_suffix(file_path) == ".log":
+                def read_text():
+                    with self.profiler.stage("read"):
+                        return read_log_text(file_path, self.encoding_policy())
+
+                # The saved arrays replace the parsing of an unchanged log, its text is only read once a view or search needs it
+                log_index = LogIndex.load(self.session_index_path, read_text, fingerprint) if unchanged else None
+                dates = session.get("dates") if log_index is not None else None
+                if log_index is None:
+                    log_index = LogIndex(read_text())
+                self.log_index = log_index
+                self.log_index_fingerprint = fingerprint
+                if not dates:
+                    with self.profiler.stage("extract dates"):
+                        dates = log_index.dates()
+                self.log_dates_combobox.blockSignals(True)
+                self.log_dates_combobox.clear()
+                self.log_dates_combobox.addItems(dates)
+                self.log_dates_combobox.setCurrentIndex(dates.index(session["selected_date"]) if session.get("selected_date") in dates else len(dates) - 1)
+                self.log_dates_combobox.blockSignals(False)
+                self.time_range_input.setText(session.get("time_range", "") if unchanged else "")
+                if not (unchanged and self.restore_session_view(view)):
+                    if self.time_range_input.text():
+                        self.filter_time_range()
+                    else:
+                        self.display_log_date(self.log_dates_combobox.currentText())
+            else:
+                self.log_index = None
+                self.log_index_fingerprint = fingerprint
+                with self.profiler.stage("read"):
+                    file_data = read_log_text(file_path, self.encoding_policy())
+                with self.profiler.stage("render"):
+                    self.file_content_display.setPlainText(file_data)
+                self.view_key = self.file_view_key(fingerprint)
+                if unchanged:
+                    self.restore_session_view(view)
+            self.show_file_statistics(file_path)
+            if unchanged:
+                self.program_output.setText(f"Restored the last session of {file_path}.")
+            else:
+                self.program_output.setText(f"<span style='color: orange'>WARN: {file_path} has changed since the last session, it has been loaded again.</span>")
+        except Exception as ex:
+            QMessageBox.critical(self, "Error", f"An error occurred while restoring the last session: {str(ex)}")
+
+
+    def restore_session_view(self, view):
+        # Shows a saved search or cleanup result or edited text instead of the file, returns False if there is none
+        if view.get("kind") == "result":
+            lines = self.result_cache.get(view["key"])
+            if lines is None:
+                return False
+            with self.profiler.stage("render"):
+                self.file_content_display.setPlainText("\n".join(lines))
+            self.view_key = view["key"]
+            return True
+        if view.get("kind") == "text":
+            self.file_content_display.setPlainText(view["text"])
+            return True
+        return False
+
+
     def check_for_updates(self):
         install_path = self.current_working_dir
         temp_path = os.path.join(os.path.dirname(install_path), "update_temp")
@@ -1229,7 +5470,108 @@ os.startfile(exe_path)
 os.remove(os.path.join(install_path, "updater.py"))
 """
 
+def run_watch_mode(working_dir):
+    """Runs the folder watcher without a window, configured by the "watch" section of settings.json."""
+    settings_path = os.path.join(working_dir, "_internal", "configuration", "settings.json")
+    try:
+        with open(settings_path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"The settings could not be read from {settings_path}: {e}")
+        return 1
+    config = settings.get("watch", {})
+    if not config.get("directories"):
+        print("No watch directories are configured in the 'watch' section of settings.json.")
+        return 1
+    actions = {"Lobster .jar Cleanup": MainWindow.LOBSTER_JAR_CLEANUP}
+    try:
+        with open(os.path.join(working_dir, "_internal", "configuration", "custom_actions.json"), "r", encoding="utf-8") as f:
+            actions.update(json.load(f))
+    except (OSError, json.JSONDecodeError):
+        pass
+    run_log = RunLog.from_config(os.path.join(working_dir, "_internal", "logs"), settings.get("output", {}), "watch")
+
+    def log(message, level):
+        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}", flush=True)
+        run_log.add(message, level)
+
+    try:
+        watcher = FolderWatcher(
+            config["directories"],
+            os.path.join(working_dir, "_internal", "cache", "watch_state.json"),
+            os.path.join(working_dir, "_internal", "journal"),
+            actions,
+            log,
+            config.get("poll_interval_seconds", 5),
+            config.get("debounce_seconds", 10),
+            config.get("queue_size", 100),
+            config.get("process_existing", False),
+            EncodingPolicy.from_config(settings.get("encoding", {})),
+            PrefixRewriter.from_config(settings.get("path_rules", {})),
+            settings.get("move_throttle", {}),
+        )
+    except ValueError as e:
+        print(f"The watcher could not be started: {e}")
+        run_log.close()
+        return 1
+    log(f"Watching {', '.join(watch['path'] for watch in config['directories'])}, press Ctrl+C to stop.", "info")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        log("Stopped watching.", "info")
+    finally:
+        run_log.close()
+    return 0
+
+
+def run_agent_mode(working_dir):
+    """Runs the agent without a window, configured by the "agent" section of settings.json."""
+    settings_path = os.path.join(working_dir, "_internal", "configuration", "settings.json")
+    try:
+        with open(settings_path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"The settings could not be read from {settings_path}: {e}")
+        return 1
+    config = settings.get("agent", {})
+    run_log = RunLog.from_config(os.path.join(working_dir, "_internal", "logs"), settings.get("output", {}), "agent")
+
+    def log(message, level):
+        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}", flush=True)
+        run_log.add(message, level)
+
+    try:
+        agent = FileShiftAgent(
+            (config.get("host", "127.0.0.1"), config.get("port", 8765)),
+            config.get("token", ""),
+            os.path.join(working_dir, "_internal", "journal"),
+            log,
+            config.get("allowed_roots", []),
+            EncodingPolicy.from_config(settings.get("encoding", {})),
+            FileStatistics(os.path.join(working_dir, "_internal", "cache", "file_statistics.json")),
+            move_throttle=settings.get("move_throttle", {}),
+        )
+    except (OSError, ValueError) as e:
+        print(f"The agent could not be started: {e}")
+        run_log.close()
+        return 1
+    log(f"Agent listening on {agent.server_address[0]}:{agent.server_address[1]}, press Ctrl+C to stop.", "info")
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        log("Agent stopped.", "info")
+    finally:
+        agent.server_close()
+        run_log.close()
+    return 0
+
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # The guarded regex worker process re-runs the frozen executable
+    if "--watch" in sys.argv:
+        sys.exit(run_watch_mode(os.getcwd()))
+    if "--agent" in sys.argv:
+        sys.exit(run_agent_mode(os.getcwd()))
     app = QApplication(sys.argv)
     ex = MainWindow()
     ex.show()
@@ -0,0 +1,243 @@
+"""Benchmarks for the text and move pipelines of FileShift.
+
+Generates synthetic Lobster patch logs and lib/ trees in a temporary directory, times the
+hot paths of MainWindow without a display (offscreen Qt platform) and compares the results
+with the stored baselines.
+
+Usage:
+    python benchmarks/bench_fileshift.py                        Run with the default sizes and compare
+    python benchmarks/bench_fileshift.py --lines 10000,1000000  Run with larger logs too (up to 50M lines)
+    python benchmarks/bench_fileshift.py --update-baseline      Store the results as the new baselines
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+MAX_LINES = 50_000_000
+
+REGEX_SAMPLES = [
+    "Marking file",
+    "02.04.24 12:58:47 Could not delete file.",
+    "./lib/jetty/websocket/websocket-api-9.4.jar",
+    "Processed patch file 'patch_all.zip'...",
+    "C:\\Lobster_data\\lib\\logback-core-1.2.11.jar",
+]
+
+
+def write_patch_log(path, line_count, seed=42):
+    """Writes a synthetic patch.log with the line types and date formats of a real Lobster patch log."""
+    rng = random.Random(seed)
+    libraries = [f"./lib/{group}/{name}-{major}.{minor}.{patch}.jar"
+                 for group in ("jetty", "jetty/websocket", "jetty/http2", "base", "sap")
+                 for name in ("websocket-api", "http2-common", "logback-core", "failover", "jetty-util")
+                 for major, minor, patch in ((9, 4, 1), (10, 0, 15), (1, 2, 11))]
+    timestamp = datetime(2019, 3, 14, 17, 11, 9)
+    written = 0
+    buffer = []
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < line_count:
+            # One patch run: installs, marked jars, failed deletes and the end marker
+            timestamp += timedelta(days=rng.randint(0, 20), seconds=rng.randint(1, 3600))
+            stamp = timestamp.strftime("%d.%m.%y %H:%M:%S")
+            run = [f"{stamp}\tPatching WAR _data.war with dw_gui.zip"]
+            run += [f"{stamp}\tInstalled WEB-INF/classes/de/lobster/vaadin/gui/view/View${i}.class" for i in range(rng.randint(20, 200))]
+            marked = rng.sample(libraries, rng.randint(3, 20))
+            run += [f"{stamp}\tMarking file '{jar}' to be deleted on exit of JVM" for jar in marked]
+            run += [f"{stamp}\tCould not delete file. {jar.replace('/', chr(92))}: The process cannot access the file because it is being used by another process." for jar in marked]
+            run += [f"{stamp}\tProcessed patch file 'patch_all.zip'...", f"{stamp}\t------------ end of patch installer -------------"]
+            run = run[:line_count - written]
+            buffer.extend(run)
+            written += len(run)
+            if len(buffer) >= 100_000:
+                f.write("\n".join(buffer) + "\n")
+                buffer.clear()
+        if buffer:
+            f.write("\n".join(buffer) + "\n")
+
+
+def create_lib_tree(root, file_count, seed=42):
+    """Creates file_count small jars spread over lib/ sub directories and returns their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(file_count):
+        directory = os.path.join(root, "lib", f"group{i % 20}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"library-{i}.jar")
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(rng.randint(256, 4096)))
+        paths.append(path)
+    return paths
+
+
+def measure(function, repeat, setup=None):
+    """Runs function repeat times (after setup, which is not timed) and returns the timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        function(argument) if setup else function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def prepare_working_dir(work_dir):
+    # FileShift reads its configuration and theme relative to the working directory
+    source = os.path.join(REPO_DIR, "_internal")
+    for sub_dir in ("configuration", "theme_files", "icon"):
+        if os.path.isdir(os.path.join(source, sub_dir)):
+            shutil.copytree(os.path.join(source, sub_dir), os.path.join(work_dir, "_internal", sub_dir))
+    os.chdir(work_dir)
+
+
+def run_benchmarks(args, work_dir):
+    sys.path.insert(0, REPO_DIR)
+    import FileShift
+    from PySide6.QtWidgets import QApplication, QMessageBox
+
+    def fail(parent, title, text, *rest, **kwargs):
+        raise RuntimeError(f"{title}: {text}")
+
+    # A modal dialog would block the offscreen run forever, errors abort the benchmark instead
+    original_dialogs = {name: QMessageBox.__dict__[name] for name in ("critical", "warning", "information", "question")}
+    QMessageBox.critical = QMessageBox.warning = QMessageBox.information = staticmethod(fail)
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.No)
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+
+    def record(name, timings):
+        results[name] = {"best": min(timings), "median": statistics.median(timings)}
+        print(f"{name:<45} best {min(timings) * 1000:10.2f} ms   median {statistics.median(timings) * 1000:10.2f} ms", flush=True)
+
+    record("startup", measure(lambda: FileShift.MainWindow().deleteLater(), args.repeat))
+    window = FileShift.MainWindow()
+
+    record("RegexGenerator", measure(lambda: [FileShift.RegexGenerator(sample).regex_string for sample in REGEX_SAMPLES * 200], args.repeat))
+
+    for line_count in args.lines:
+        log_path = os.path.join(work_dir, f"patch_{line_count}.log")
+        write_patch_log(log_path, line_count)
+        with open(log_path, "r", encoding="utf-8") as f:
+            log_content = f.read()
+        lines = log_content.splitlines()
+
+        record(f"extract_dates_from_log[{line_count}]", measure(lambda: window.extract_dates_from_log(log_content), args.repeat))
+        record(f"load_log_index[{line_count}]", measure(lambda: window.load_log_index(log_path), args.repeat))
+
+        cleanup = window.LOBSTER_JAR_CLEANUP
+        record(f"clean_line[{line_count}]", measure(lambda: [window.clean_line(line, cleanup["remove_phrases"], cleanup["find_text"], cleanup["replace_text"]) for line in lines], args.repeat))
+
+        def search(_):
+            window.search_and_replace_file_content()
+
+        def show_log():
+            window.result_cache.clear()  # Otherwise the repeated searches are answered from the cache
+            window.file_content_display.setPlainText(log_content)
+            window.search_pattern_input.setText(cleanup["search_pattern"])
+
+        # The first search starts the regex worker process, keep that out of the timings
+        show_log()
+        search(None)
+        record(f"search_and_replace_file_content[{line_count}]", measure(search, args.repeat, setup=show_log))
+        del log_content, lines
+        os.remove(log_path)
+
+    def create_tree():
+        tree_dir = tempfile.mkdtemp(dir=work_dir)
+        paths = create_lib_tree(tree_dir, args.files)
+        window.file_content_display.setPlainText("\n".join(paths))
+        window.destination_input.setText(os.path.join(tree_dir, "moved"))
+        return tree_dir
+
+    record(f"move_files[{args.files}]", measure(lambda tree_dir: window.move_files(), args.repeat, setup=create_tree))
+
+    if window.regex_guard is not None:
+        window.regex_guard.shutdown()
+    window.deleteLater()
+    app.processEvents()
+    del window
+    for name, dialog in original_dialogs.items():
+        setattr(QMessageBox, name, dialog)
+    return results
+
+
+def compare(results, baselines, tolerance):
+    """Prints the change against the baselines and returns the names of the benchmarks that regressed."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<45} no baseline")
+            continue
+        change = result["best"] / baseline["best"] - 1 if baseline["best"] > 0 else 0.0
+        status = "REGRESSION" if change > tolerance else "ok"
+        print(f"{name:<45} {change * 100:+8.1f} %   {status}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks for the text and move pipelines of FileShift.")
+    parser.add_argument("--lines", default="10000", help="Comma separated log sizes in lines (default: 10000)")
+    parser.add_argument("--files", type=int, default=2000, help="Number of files in the lib/ tree that is moved (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per benchmark, the best time is compared (default: 3)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file (default: benchmarks/baselines.json)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baselines")
+    args = parser.parse_args()
+    args.lines = [int(size) for size in args.lines.split(",") if size.strip()]
+    if any(size > MAX_LINES for size in args.lines):
+        parser.error(f"Log sizes are limited to {MAX_LINES} lines.")
+    return args
+
+
+def main():
+    args = parse_args()
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="fileshift_bench_")
+    try:
+        prepare_working_dir(work_dir)
+        results = run_benchmarks(args, work_dir)
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baselines = json.load(f).get("results", {})
+    if args.update_baseline:
+        baselines.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+                       "updated": datetime.now().isoformat(timespec="seconds"),
+                       "results": baselines}, f, indent=4)
+        print(f"Baselines written to {args.baseline}")
+        return 0
+    print()
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} benchmarks are slower than their baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # The PySide6 teardown at interpreter exit can abort the process, which would hide the exit code from CI
+    os._exit(exit_code)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from FileShift import AgentClient, AgentError, FileShiftAgent
+
+
+class AgentTest(unittest.TestCase):
+    TOKEN = "secret"
+
+    def setUp(self):
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp())
+        self.root = os.path.join(self.temp_dir, "root")
+        os.makedirs(os.path.join(self.root, "lib"))
+        self.messages = []
+        self.agent = FileShiftAgent(("127.0.0.1", 0), self.TOKEN, os.path.join(self.temp_dir, "journal"), lambda message, level: self.messages.append((level, message)),
+                                    allowed_roots=[self.root])
+        threading.Thread(target=self.agent.serve_forever, daemon=True).start()
+        self.port = self.agent.server_address[1]
+
+    def tearDown(self):
+        self.agent.shutdown()
+        self.agent.server_close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def client(self, token=TOKEN):
+        return AgentClient("127.0.0.1", self.port, token, timeout=10)
+
+    def create_file(self, *parts, content="x"):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_ping(self):
+        self.assertEqual(self.client().ping()["version"], FileShiftAgent.PROTOCOL_VERSION)
+
+    def test_wrong_tokens_are_rejected(self):
+        for token in ("", "wrong", self.TOKEN + "x", self.TOKEN[:-1]):
+            with self.subTest(token=token):
+                with self.assertRaisesRegex(AgentError, "Invalid agent token"):
+                    self.client(token).ping()
+
+    def test_other_addresses_need_a_token(self):
+        with self.assertRaises(ValueError):
+            FileShiftAgent(("0.0.0.0", 0), "", self.temp_dir, lambda message, level: None)
+
+    def test_check_path(self):
+        inside = self.create_file("lib", "a.jar")
+        self.assertEqual(self.agent.check_path(inside), inside)
+        self.assertEqual(self.agent.check_path(inside + ".zip::patch.log"), inside + ".zip::patch.log")
+        with self.assertRaises(PermissionError):
+            self.agent.check_path(os.path.join(self.temp_dir, "outside.jar"))
+        with self.assertRaises(PermissionError):
+            self.agent.check_path(os.path.join(self.root, "..", "outside.jar"))
+        with self.assertRaises(PermissionError):
+            self.agent.check_path(self.root + "-sibling")
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_check_path_resolves_symlinks(self):
+        outside = os.path.join(self.temp_dir, "outside")
+        os.makedirs(outside)
+        link = os.path.join(self.root, "link")
+        try:
+            os.symlink(outside, link)
+        except OSError:
+            self.skipTest("symlinks are not permitted")
+        with self.assertRaises(PermissionError):
+            self.agent.check_path(os.path.join(link, "a.jar"))
+
+    def test_request_outside_the_roots_fails(self):
+        with self.assertRaisesRegex(AgentError, "outside the directories"):
+            self.client().dates(os.path.join(self.temp_dir, "patch.log"))
+
+    def test_move(self):
+        paths = [self.create_file("lib", f"{name}.jar") for name in ("a", "b")]
+        destination = os.path.join(self.root, "moved")
+        self.create_file("moved", "lib", "b.jar")
+        events = []
+        result = self.client().move(paths + [os.path.join(self.root, "lib", "missing.jar")], destination, events.append)
+        self.assertEqual((result["moved"], result["missing"], result["failed"], result["skipped"]), (1, 1, 0, 1))
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(os.path.join(destination, "lib", "a.jar")))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertEqual([event["event"] for event in events], ["conflict", "missing", "moved"])
+        self.assertIn("EXISTS", events[0]["detail"])
+
+
+if __name__ == "__main__":
+    unittest.main()
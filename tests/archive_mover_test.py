@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import py7zr
+
+from FileShift import ArchiveMover, ArchiveVerificationError, MoveJournal
+
+
+class ChangingArchiveMover(ArchiveMover):
+    """Changes a source after the archive has been written, before the sources are deleted."""
+
+    changed_source = None
+
+    def _verify(self, packed):
+        super()._verify(packed)
+        with open(self.changed_source, "a") as f:
+            f.write("changed")
+
+
+class FailingArchiveMover(ArchiveMover):
+    def _verify(self, packed):
+        raise ArchiveVerificationError("test")
+
+
+class ArchiveMoverTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.destination = os.path.join(self.temp_dir, "moved")
+        self.journal_dir = os.path.join(self.temp_dir, "journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_files(self, count):
+        paths = []
+        for number in range(count):
+            path = os.path.join(self.temp_dir, "lib", f"f{number}.jar")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(str(number) * (number + 1))
+            paths.append(path)
+        return paths
+
+    def entries(self, mover, paths):
+        return [(path, mover.destination_for(path)) for path in paths]
+
+    def create_mover(self, archive_name, mover_class=ArchiveMover, **kwargs):
+        journal = MoveJournal.create(self.journal_dir, self.destination)
+        return mover_class(self.destination, os.path.join(self.destination, archive_name), journal, **kwargs)
+
+    def test_packs_verifies_and_deletes_the_sources(self):
+        for archive_name in ("moved.zip", "moved.7z"):
+            with self.subTest(archive_name=archive_name):
+                paths = self.create_files(3)
+                mover = self.create_mover(archive_name, buffer_limit=2)  # f0.jar and f1.jar are read ahead, f2.jar is streamed
+                mover.move(self.entries(mover, paths))
+                self.assertEqual((mover.moved_count, mover.warn_count, mover.err_count), (3, 0, 0))
+                self.assertFalse(any(os.path.exists(path) for path in paths))
+                if archive_name.endswith(".zip"):
+                    with zipfile.ZipFile(mover.archive_path) as archive:
+                        contents = {name: archive.read(name).decode() for name in archive.namelist()}
+                else:
+                    extracted = os.path.join(self.temp_dir, "extracted")
+                    with py7zr.SevenZipFile(mover.archive_path) as archive:
+                        archive.extractall(extracted)
+                    contents = {}
+                    for name in os.listdir(os.path.join(extracted, "lib")):
+                        with open(os.path.join(extracted, "lib", name)) as f:
+                            contents[f"lib/{name}"] = f.read()
+                self.assertEqual(contents, {"lib/f0.jar": "0", "lib/f1.jar": "11", "lib/f2.jar": "222"})
+                state = MoveJournal(mover.journal.journal_path).read_state()
+                self.assertTrue(state["verified"])
+                self.assertTrue(state["finished"])
+                self.assertEqual(set(state["done"]), set(paths))
+
+    def test_existing_archive_is_never_overwritten(self):
+        paths = self.create_files(2)
+        os.makedirs(self.destination)
+        archive_path = os.path.join(self.destination, "moved.zip")
+        with open(archive_path, "w") as f:
+            f.write("older archive")
+        mover = self.create_mover("moved.zip")
+        mover.move(self.entries(mover, paths))
+        self.assertEqual((mover.moved_count, mover.err_count), (0, 2))
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        with open(archive_path) as f:
+            self.assertEqual(f.read(), "older archive")
+
+    def test_dated_archive_path_is_numbered_if_it_exists(self):
+        first = ArchiveMover.dated_archive_path(self.destination, ".zip")
+        os.makedirs(self.destination)
+        open(first, "w").close()
+        second = ArchiveMover.dated_archive_path(self.destination, ".zip")
+        self.assertNotEqual(first, second)
+        self.assertTrue(second.endswith(".zip"))
+
+    def test_missing_sources_are_reported(self):
+        paths = self.create_files(2)
+        os.remove(paths[0])
+        mover = self.create_mover("moved.zip")
+        mover.move(self.entries(mover, paths))
+        self.assertEqual((mover.moved_count, mover.warn_count, mover.err_count), (1, 1, 0))
+        self.assertEqual(MoveJournal(mover.journal.journal_path).read_state()["missing"], {paths[0]})
+
+    def test_all_sources_missing_creates_no_archive(self):
+        mover = self.create_mover("moved.zip")
+        mover.move([(os.path.join(self.temp_dir, "lib", "missing.jar"), os.path.join(self.destination, "lib", "missing.jar"))])
+        self.assertEqual(mover.warn_count, 1)
+        self.assertFalse(os.path.exists(mover.archive_path))
+
+    def test_changed_source_is_kept(self):
+        paths = self.create_files(2)
+        mover = self.create_mover("moved.zip", ChangingArchiveMover)
+        mover.changed_source = paths[1]
+        mover.move(self.entries(mover, paths))
+        self.assertEqual((mover.moved_count, mover.err_count), (1, 1))
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+
+    def test_failed_verification_deletes_nothing(self):
+        paths = self.create_files(2)
+        mover = self.create_mover("moved.zip", FailingArchiveMover)
+        mover.move(self.entries(mover, paths))
+        self.assertEqual((mover.moved_count, mover.err_count), (0, 1))
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        self.assertFalse(MoveJournal(mover.journal.journal_path).read_state()["verified"])
+
+    def test_undo_extracts_the_files(self):
+        paths = self.create_files(2)
+        mover = self.create_mover("moved.zip")
+        mover.move(self.entries(mover, paths))
+        journal = MoveJournal(mover.journal.journal_path)
+        state = journal.read_state()
+        mover = ArchiveMover(self.destination, state["archive"], journal)
+        mover.undo(state)
+        self.assertEqual((mover.moved_count, mover.err_count), (2, 0))
+        with open(paths[1]) as f:
+            self.assertEqual(f.read(), "11")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from FileShift import FolderWatcher, MainWindow
+
+
+class RecordingFolderWatcher(FolderWatcher):
+    """Records the logs that are ready instead of queueing them for a worker thread."""
+
+    def _enqueue(self, log_path, watch):
+        self.enqueued.append(log_path)
+        del self._candidates[log_path]
+
+
+class FolderWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.temp_dir, "logs")
+        self.destination = os.path.join(self.temp_dir, "moved")
+        self.state_path = os.path.join(self.temp_dir, "cache", "watch_state.json")
+        os.makedirs(self.log_dir)
+        self.log_path = os.path.join(self.log_dir, "patch.log")
+        self.messages = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_watcher(self, watcher_class=FolderWatcher, **kwargs):
+        watcher = watcher_class([{"path": self.log_dir, "pattern": "*.log", "action": "Lobster .jar Cleanup", "destination": self.destination}],
+                                self.state_path, os.path.join(self.temp_dir, "journal"), {"Lobster .jar Cleanup": MainWindow.LOBSTER_JAR_CLEANUP},
+                                lambda message, level: self.messages.append((level, message)), **kwargs)
+        watcher.enqueued = []
+        return watcher
+
+    def write_log(self, text, mode="a"):
+        with open(self.log_path, mode, encoding="utf-8") as f:
+            f.write(text)
+
+    def create_jar(self, name):
+        path = os.path.join(self.temp_dir, "lib", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+        return path
+
+    def marking_line(self, path):
+        return f"01.03.24 10:00:00 Marking file '{path}' to be deleted on exit of JVM\n"
+
+    def test_invalid_watches_are_rejected(self):
+        with self.assertRaises(ValueError):
+            FolderWatcher([{"path": self.log_dir}], self.state_path, self.temp_dir, {}, print)
+        with self.assertRaises(ValueError):
+            FolderWatcher([{"path": self.log_dir, "destination": self.destination, "action": "missing"}], self.state_path, self.temp_dir, {}, print)
+
+    def test_partial_last_line_is_left_for_the_next_run(self):
+        self.write_log("first\nsecond\nthi")
+        watcher = self.create_watcher()
+        lines, offset = watcher.read_new_lines(self.log_path)
+        self.assertEqual((lines, offset), ([b"first", b"second"], 13))
+        watcher.offsets[self.log_path] = offset
+        self.write_log("rd\n")
+        self.assertEqual(watcher.read_new_lines(self.log_path), ([b"third"], 19))
+
+    def test_truncated_log_is_read_again(self):
+        self.write_log("a long first line\n")
+        watcher = self.create_watcher()
+        watcher.offsets[self.log_path] = os.path.getsize(self.log_path)
+        self.write_log("new\n", "w")
+        self.assertEqual(watcher.read_new_lines(self.log_path), ([b"new"], 4))
+
+    def test_process_moves_new_paths_and_saves_the_offset(self):
+        jar = self.create_jar("a.jar")
+        self.write_log(self.marking_line(jar) + "01.03.24 10:00:01 Installed lib/b.jar\n")
+        watcher = self.create_watcher()
+        watcher.process(self.log_path, watcher.watches[0])
+        self.assertFalse(os.path.exists(jar))
+        self.assertTrue(os.path.exists(os.path.join(self.destination, "lib", "a.jar")))
+        with open(self.state_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {self.log_path: os.path.getsize(self.log_path)})
+        # A restarted watcher continues after the processed lines
+        self.assertEqual(self.create_watcher().read_new_lines(self.log_path), ([], os.path.getsize(self.log_path)))
+
+    def test_conflicts_are_logged(self):
+        jar = self.create_jar("a.jar")
+        os.makedirs(os.path.join(self.destination, "lib"))
+        open(os.path.join(self.destination, "lib", "a.jar"), "w").close()
+        self.write_log(self.marking_line(jar))
+        watcher = self.create_watcher()
+        watcher.process(self.log_path, watcher.watches[0])
+        self.assertTrue(os.path.exists(jar))
+        self.assertTrue(any(level == "warning" and "EXISTS" in message for level, message in self.messages))
+
+    def test_first_start_skips_existing_lines(self):
+        self.write_log("01.03.24 10:00:00 old\n")
+        watcher = self.create_watcher(RecordingFolderWatcher, debounce=0)
+        watcher.poll()
+        self.assertEqual(watcher.offsets, {self.log_path: os.path.getsize(self.log_path)})
+        watcher.poll()
+        self.assertEqual(watcher.enqueued, [])
+
+    def test_log_is_queued_once_it_stopped_changing(self):
+        self.write_log("01.03.24 10:00:00 old\n")
+        watcher = self.create_watcher(RecordingFolderWatcher, debounce=0.5, process_existing=True)
+        watcher.poll()  # Seen for the first time
+        watcher.poll()
+        self.assertEqual(watcher.enqueued, [])
+        time.sleep(0.1)
+        self.write_log("01.03.24 10:00:01 more\n")  # Still being written, the debounce starts again
+        watcher.poll()
+        time.sleep(0.25)
+        watcher.poll()
+        self.assertEqual(watcher.enqueued, [])
+        time.sleep(0.35)
+        watcher.poll()
+        self.assertEqual(watcher.enqueued, [self.log_path])
+
+
+if __name__ == "__main__":
+    unittest.main()
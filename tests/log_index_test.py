@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from FileShift import LogIndex
+
+
+class LogIndexTest(unittest.TestCase):
+    def setUp(self):
+        # Dates are read as wall clock times, they must not depend on the DST rules of the local time zone
+        self.previous_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Berlin"
+        time.tzset()
+
+    def tearDown(self):
+        if self.previous_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self.previous_tz
+        time.tzset()
+
+    def test_dates_and_strip_lengths(self):
+        index = LogIndex("14.03.19 17:11:09 first\nno date\n15-03-2019 08:00:00 second\n")
+        self.assertEqual(index.dates(), ["14.03.19", "15-03-2019"])
+        self.assertEqual(list(index.lines_for_date("14.03.19")), [0])
+        self.assertEqual(list(index.lines_for_date("15-03-2019")), [2])
+        self.assertEqual(index.body(0), "first")
+        self.assertEqual(index.body(2), "15-03-2019 08:00:00 second")
+
+    def test_fall_back_day_has_all_lines(self):
+        index = LogIndex("27.10.19 01:30:00 a\n27.10.19 02:30:00 b\n27.10.19 03:30:00 c\n27.10.19 23:30:00 d\n28.10.19 00:00:00 e\n")
+        self.assertTrue(index.is_sorted)
+        self.assertEqual(list(index.lines_for_date("27.10.19")), [0, 1, 2, 3])
+
+    def test_spring_forward_day_ends_at_midnight(self):
+        index = LogIndex("31.03.19 01:59:00 a\n31.03.19 02:30:00 b\n31.03.19 03:10:00 c\n01.04.19 00:10:00 d\n")
+        self.assertTrue(index.is_sorted)
+        self.assertEqual(list(index.lines_for_date("31.03.19")), [0, 1, 2])
+        self.assertEqual(list(index.lines_for_date("01.04.19")), [3])
+
+    def test_time_range(self):
+        index = LogIndex("14.03.19 17:11:08 a\n14.03.19 17:11:09 b\n14.03.19 17:11:20 c\n14.03.19 17:11:21 d\n")
+        start = LogIndex.parse_timestamp("14.03.19 17:11:09")
+        end = LogIndex.parse_timestamp("14-03-19 17:11:20")
+        self.assertEqual(list(index.lines_between(start, end)), [1, 2])
+
+    def test_invalid_dates(self):
+        self.assertIsNone(LogIndex.parse_timestamp("31.02.19"))
+        self.assertIsNone(LogIndex.parse_timestamp("not a date"))
+        self.assertEqual(LogIndex.parse_timestamp("01.01.70"), 0)
+
+    def test_unsorted_log(self):
+        index = LogIndex("15.03.19 10:00:00 a\n14.03.19 10:00:00 b\n15.03.19 11:00:00 c\n")
+        self.assertFalse(index.is_sorted)
+        self.assertEqual(list(index.lines_for_date("15.03.19")), [0, 2])
+
+    def test_loaded_index_reads_its_text_on_first_use(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        index_path = os.path.join(temp_dir, "index.bin")
+        text = "14.03.19 17:11:09 first\n15.03.19 08:00:00 second\n"
+        LogIndex(text).save(index_path, "fingerprint")
+        reads = []
+        index = LogIndex.load(index_path, lambda: reads.append(1) or text, "fingerprint")
+        self.assertEqual(list(index.lines_for_date("15.03.19")), [1])
+        self.assertEqual(reads, [])
+        self.assertEqual(index.body(1), "second")
+        self.assertEqual(reads, [1])
+        self.assertIsNone(LogIndex.load(index_path, text, "other fingerprint"))
+
+    def test_loaded_index_is_parsed_again_if_its_text_differs(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        index_path = os.path.join(temp_dir, "index.bin")
+        LogIndex("14.03.19 17:11:09 first\n").save(index_path, "fingerprint")
+        index = LogIndex.load(index_path, lambda: "16.03.19 10:00:00 a\nb\n", "fingerprint")
+        self.assertEqual(index.dates(), ["16.03.19"])
+        self.assertEqual(len(index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from FileShift import FileMover, MoveJournal
+
+
+class MoveJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_dir = os.path.join(self.temp_dir, "journal")
+        self.destination = os.path.join(self.temp_dir, "moved")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_files(self, count):
+        os.makedirs(os.path.join(self.temp_dir, "lib"))
+        paths = []
+        for number in range(count):
+            path = os.path.join(self.temp_dir, "lib", f"f{number}.jar")
+            with open(path, "w") as f:
+                f.write("x" * number)
+            paths.append(path)
+        return paths
+
+    def test_records_are_flushed_before_sync(self):
+        journal = MoveJournal.create(self.journal_dir, self.destination, sync_every=1000)
+        journal.record_plan([("a", "b")])
+        journal.write({"op": "done", "src": "a", "dst": "b"})
+        state = MoveJournal(journal.journal_path).read_state()  # Read while the journal is still open
+        self.assertEqual(state["destination"], self.destination)
+        self.assertEqual(state["planned"], [("a", "b")])
+        self.assertEqual(state["done"], {"a": "b"})
+        journal.close()
+
+    def test_torn_record_is_skipped(self):
+        journal = MoveJournal.create(self.journal_dir, self.destination)
+        journal.record_plan([("a", "b"), ("c", "d")])
+        journal.close()
+        with open(journal.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"op": "done", "src": "a"')
+        journal = MoveJournal(journal.journal_path)
+        journal.write({"op": "done", "src": "c", "dst": "d"})
+        journal.close()
+        self.assertEqual(journal.read_state()["done"], {"c": "d"})
+        self.assertEqual(MoveJournal.latest(self.journal_dir), journal.journal_path)
+
+    def test_resume_skips_moved_files_without_done_record(self):
+        paths = self.create_files(3)
+        journal = MoveJournal.create(self.journal_dir, self.destination)
+        mover = FileMover(self.destination, journal)
+        entries = [(path, mover.destination_for(path)) for path in paths]
+        journal.record_plan(entries)
+        journal.write({"op": "done", "src": entries[0][0], "dst": entries[0][1]})
+        journal.close()
+        for source, destination in entries[:2]:  # The second move crashed before its done record
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(source, destination)
+
+        journal = MoveJournal(journal.journal_path)
+        mover = FileMover(self.destination, journal)
+        skipped = mover.resume(journal.read_state())
+        self.assertEqual(skipped, 2)
+        self.assertEqual((mover.moved_count, mover.warn_count, mover.err_count), (1, 0, 0))
+        state = journal.read_state()
+        self.assertEqual(set(state["done"]), set(paths))
+        self.assertTrue(state["finished"])
+        self.assertTrue(all(os.path.exists(destination) for _, destination in entries))
+
+    def test_changed_duplicate_is_kept_on_resume(self):
+        primary, first, second = self.create_files(3)
+        stats = {path: os.stat(path) for path in (first, second)}
+        duplicate_stats = {path: (file_stat.st_size, file_stat.st_mtime_ns) for path, file_stat in stats.items()}
+        journal = MoveJournal.create(self.journal_dir, self.destination)
+        mover = FileMover(self.destination, journal)
+        journal.record_plan([(primary, mover.destination_for(primary))], {primary: [first, second]}, duplicate_stats)
+        journal.close()
+        with open(second, "a") as f:
+            f.write("changed")
+
+        journal = MoveJournal(journal.journal_path)
+        mover = FileMover(self.destination, journal)
+        mover.resume(journal.read_state())
+        self.assertEqual((mover.moved_count, mover.deduped_count, mover.err_count), (1, 1, 1))
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from FileShift import FileMover, MoveList
+
+
+class MoveListTest(unittest.TestCase):
+    def test_repeated_paths_are_skipped(self):
+        lines = ["a/lib/c.jar", "'./a/lib/c.jar'", "a/lib/../lib/c.jar", "  a/lib/c.jar  ", "b/lib/c.jar", "b/lib/c.jar", "", "x.jar"]
+        move_list = MoveList.from_lines(iter(lines))
+        self.assertEqual(move_list.duplicates, 4)
+        self.assertEqual([source for source, _ in move_list], ["a/lib/c.jar", "b/lib/c.jar", "x.jar"])
+
+    def test_destinations_keep_the_parent_directory(self):
+        move_list = MoveList.from_lines(["D:/data/lib/a.jar", "D:/data/lib/b.jar", "D:\\data\\ext\\c.jar"], FileMover("E:/moved").destination_for)
+        self.assertEqual(len(move_list.directories), 2)
+        self.assertEqual(list(move_list), [("D:/data/lib/a.jar", "E:/moved/lib/a.jar"), ("D:/data/lib/b.jar", "E:/moved/lib/b.jar"),
+                                           ("D:\\data\\ext\\c.jar", FileMover("E:/moved").destination_for("D:\\data\\ext\\c.jar"))])
+        self.assertEqual(move_list[2][0], "D:\\data\\ext\\c.jar")
+        self.assertEqual(list(move_list[1:]), list(move_list)[1:])
+
+    def test_by_directory_groups_entries(self):
+        move_list = MoveList.from_lines(["a/1.jar", "b/2.jar", "a/3.jar"])
+        self.assertEqual([source for source, _ in move_list.by_directory()], ["a/1.jar", "a/3.jar", "b/2.jar"])
+        self.assertEqual(move_list.used_directories(), {0, 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
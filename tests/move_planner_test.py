@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from FileShift import ArchiveMover, FileMover, MovePlanner
+
+
+class MovePlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.destination = os.path.join(self.temp_dir, "moved")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_file(self, *parts, content="x"):
+        path = os.path.join(self.temp_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_plan(self):
+        first = self.create_file("a", "ext", "x.jar", content="12345")
+        self.create_file("moved", "lib", "existing.jar")
+        existing = self.create_file("a", "lib", "existing.jar")
+        missing = os.path.join(self.temp_dir, "a", "lib", "missing.jar")
+        plan = MovePlanner(FileMover(self.destination)).plan([first, f"'{first}'", existing, missing])
+        self.assertEqual(list(plan["entries"]), [(first, os.path.join(self.destination, "ext", "x.jar"))])
+        self.assertEqual(plan["missing"], [missing])
+        self.assertEqual(plan["existing"], [(existing, os.path.join(self.destination, "lib", "existing.jar"))])
+        self.assertEqual(plan["duplicates"], 1)
+        self.assertEqual(plan["total_bytes"], 5)
+        self.assertEqual(plan["renames"] + plan["cross_device"], 1)
+        self.assertEqual(plan["missing_parents"], [os.path.abspath(os.path.join(self.destination, "ext"))])
+
+    def test_sources_with_the_same_destination_collide(self):
+        first = self.create_file("a", "lib", "x.jar")
+        second = self.create_file("b", "lib", "x.jar")
+        third = self.create_file("c", "LIB", "X.jar") if os.path.normcase("A") == "a" else self.create_file("c", "lib", "x.jar")
+        plan = MovePlanner(FileMover(self.destination)).plan([first, second, third])
+        self.assertEqual([source for source, _ in plan["entries"]], [first])
+        self.assertEqual(list(plan["collisions"].values()), [[first, second, third]])
+        messages = list(MovePlanner.conflicts(plan))
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(messages[0].startswith("COLLISION:"))
+
+    def test_existing_destination_is_not_moved(self):
+        source = self.create_file("a", "lib", "x.jar")
+        self.create_file("moved", "lib", "x.jar")
+        plan = MovePlanner(FileMover(self.destination)).plan([source])
+        self.assertEqual(len(plan["entries"]), 0)
+        self.assertEqual([message.split(":")[0] for message in MovePlanner.conflicts(plan)], ["EXISTS"])
+
+    def test_archive_target_ignores_existing_files(self):
+        source = self.create_file("a", "lib", "x.jar")
+        self.create_file("moved", "lib", "x.jar")
+        mover = ArchiveMover(self.destination, os.path.join(self.destination, "moved.zip"))
+        plan = MovePlanner(mover).plan([source])
+        self.assertEqual([source for source, _ in plan["entries"]], [source])
+        self.assertEqual((plan["existing"], plan["missing_parents"], plan["cross_device"]), ([], [], 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
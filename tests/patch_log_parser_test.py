@@ -0,0 +1,68 @@
+import unittest
+
+from FileShift import PatchLogParser
+
+
+def log_lines(*messages):
+    return [f"01.03.24 10:00:{second:02d} {message}\n" for second, message in enumerate(messages)]
+
+
+class PatchLogParserTest(unittest.TestCase):
+    def test_finished_run(self):
+        parser = PatchLogParser().parse(log_lines(
+            "Patching installation files",
+            "Installed lib/new.jar",
+            "Marking file '.\\lib\\old.jar' to be deleted on exit of JVM",
+            "Deleted file './lib/gone.jar'",
+            "Processed patch file 'patch1.zip'",
+            "Patch folder was cleared",
+            "----- end of patch installer -----",
+        ))
+        self.assertEqual(len(parser.runs), 1)
+        run = parser.runs[0]
+        self.assertTrue(run["finished"])
+        self.assertEqual((run["started"], run["ended"]), ("01.03.24 10:00:00", "01.03.24 10:00:06"))
+        self.assertEqual((run["installed"], run["marked"], run["deleted"], run["pending"]), (1, 1, 1, 1))
+        self.assertEqual(run["patch_files"], ["patch1.zip"])
+        self.assertEqual(parser.pending_paths(), ["./lib/old.jar"])
+
+    def test_installed_again_is_no_longer_pending(self):
+        parser = PatchLogParser().parse(log_lines(
+            "Patching installation files",
+            "Marking file './lib/a.jar' to be deleted on exit of JVM",
+            "Could not delete file. ./lib/b.jar: in use",
+            "----- end of patch installer -----",
+            "Patching installation files",
+            "Installed lib/a.jar",
+            "----- end of patch installer -----",
+        ))
+        self.assertEqual(parser.pending, {"lib/b.jar": 1})
+        self.assertEqual([run["delete_failed"] for run in parser.runs], [1, 0])
+
+    def test_missing_end_marker_after_clear(self):
+        parser = PatchLogParser().parse(log_lines(
+            "Patching installation files",
+            "Patch folder was cleared",
+            "Patching installation files",
+            "----- end of patch installer -----",
+        ))
+        self.assertEqual([run["finished"] for run in parser.runs], [False, True])
+        self.assertEqual(parser.runs[0]["ended"], "01.03.24 10:00:01")
+
+    def test_unfinished_last_run_ends_at_its_last_message(self):
+        parser = PatchLogParser().parse(log_lines(
+            "Patching installation files",
+            "Installed lib/a.jar",
+            "Installed lib/b.jar",
+        ))
+        run = parser.runs[0]
+        self.assertFalse(run["finished"])
+        self.assertEqual((run["started"], run["ended"]), ("01.03.24 10:00:00", "01.03.24 10:00:02"))
+
+    def test_other_lines_are_skipped(self):
+        parser = PatchLogParser().parse(["no timestamp\n", "01.03.24 10:00:00 Something else\n"])
+        self.assertEqual((parser.runs, parser.event_count), ([], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
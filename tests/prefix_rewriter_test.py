@@ -0,0 +1,38 @@
+import unittest
+
+from FileShift import PrefixRewriter
+
+
+class PrefixRewriterTest(unittest.TestCase):
+    def test_longest_prefix_wins(self):
+        rewriter = PrefixRewriter([("./lib", "D:/Lobster/lib"), ("./lib/ext", "E:/ext")])
+        self.assertEqual(rewriter.rewrite("./lib/a.jar"), "D:/Lobster/lib/a.jar")
+        self.assertEqual(rewriter.rewrite("./lib/ext/b.jar"), "E:/ext/b.jar")
+        self.assertEqual(rewriter.rewrite(".\\lib\\ext\\b.jar"), "E:/ext/b.jar")
+
+    def test_prefix_matches_whole_directory_names(self):
+        rewriter = PrefixRewriter([("./lib", "D:/L")], "\\")
+        self.assertEqual(rewriter.rewrite("./library/x.jar"), "./library/x.jar")
+        self.assertEqual(rewriter.rewrite("./lib/x.jar"), "D:\\L\\x.jar")
+        self.assertEqual(rewriter.rewrite("./lib"), "D:\\L")
+        self.assertEqual(rewriter.rewrite("file './lib' deleted"), "file 'D:\\L' deleted")
+
+    def test_paths_start_after_token_breaks(self):
+        rewriter = PrefixRewriter([("./lib", "D:/L")])
+        self.assertEqual(rewriter.rewrite("Marking file './lib/a.jar' to be deleted"), "Marking file 'D:/L/a.jar' to be deleted")
+        self.assertEqual(rewriter.rewrite("x./lib/a.jar"), "x./lib/a.jar")
+        self.assertEqual(rewriter.rewrite("./lib/a.jar ./lib/b.jar"), "D:/L/a.jar D:/L/b.jar")
+
+    def test_paths_with_spaces_are_normalized_completely(self):
+        rewriter = PrefixRewriter([("C:/Program Files", "D:/Apps")], "\\")
+        self.assertEqual(rewriter.rewrite("C:/Program Files/Lobster data/lib/a b.jar to be deleted"), "D:\\Apps\\Lobster data\\lib\\a b.jar to be deleted")
+        self.assertEqual(rewriter.rewrite("'C:/Program Files/x y/z.jar' deleted"), "'D:\\Apps\\x y\\z.jar' deleted")
+
+    def test_no_rules(self):
+        rewriter = PrefixRewriter.from_config({})
+        self.assertFalse(rewriter)
+        self.assertEqual(rewriter.rewrite("./lib/a.jar"), "./lib/a.jar")
+
+
+if __name__ == "__main__":
+    unittest.main()
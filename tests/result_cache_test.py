@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from FileShift import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.spill_dir = os.path.join(self.temp_dir, "results")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_keys(self):
+        self.assertEqual(ResultCache.key("search", "view", "a"), ResultCache.key("search", "view", "a"))
+        self.assertNotEqual(ResultCache.key("search", "view", "a"), ResultCache.key("search", "view", "b"))
+        self.assertNotEqual(ResultCache.key("a", "bc"), ResultCache.key("ab", "c"))
+        self.assertNotEqual(ResultCache.text_key("a\nb"), ResultCache.text_key("a\nc"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", ["1"])
+        cache.put("b", ["2"])
+        self.assertEqual(cache.get("a"), ["1"])  # b is now the least recently used entry
+        cache.put("c", ["3"])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (["1"], ["3"]))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_memory_limit_evicts_entries(self):
+        cache = ResultCache(max_entries=10, max_memory_bytes=200)
+        cache.put("a", ["x" * 50])
+        cache.put("b", ["y" * 50])
+        self.assertEqual(list(cache.entries), ["b"])
+        self.assertLessEqual(cache.memory_bytes, 200)
+
+    def test_replacing_an_entry_keeps_the_memory_count(self):
+        cache = ResultCache()
+        cache.put("a", ["x" * 10])
+        cache.put("a", ["y" * 20])
+        self.assertEqual(cache.memory_bytes, 20 + 64)
+        self.assertEqual(cache.get("a"), ["y" * 20])
+
+    def test_evicted_entries_are_spilled_and_read_back(self):
+        cache = ResultCache(self.spill_dir, max_entries=1)
+        cache.put("a", ["1", "2"])
+        cache.put("b", ["3"])
+        self.assertNotIn("a", cache.entries)
+        self.assertTrue(os.path.exists(os.path.join(self.spill_dir, "a.json")))
+        self.assertEqual(cache.get("a"), ["1", "2"])
+        self.assertIn("a", cache.entries)
+
+    def test_entries_larger_than_the_memory_limit_go_to_disk(self):
+        cache = ResultCache(self.spill_dir, max_memory_bytes=100)
+        lines = cache.put("a", ["x" * 200])
+        self.assertEqual(lines, ["x" * 200])
+        self.assertEqual((len(cache.entries), cache.memory_bytes), (0, 0))
+        self.assertEqual(cache.get("a"), ["x" * 200])
+
+    def test_disk_limit_removes_the_oldest_spilled_entries(self):
+        cache = ResultCache(self.spill_dir, max_entries=0, max_disk_bytes=30)
+        cache.put("a", ["x" * 20])
+        os.utime(os.path.join(self.spill_dir, "a.json"), (1, 1))
+        cache.put("b", ["y" * 20])
+        self.assertEqual(sorted(os.listdir(self.spill_dir)), ["b.json"])
+
+    def test_persisted_entry_is_found_by_a_new_cache(self):
+        cache = ResultCache(self.spill_dir)
+        cache.put("a", ["1"])
+        self.assertTrue(cache.persist("a"))
+        self.assertFalse(cache.persist("missing"))
+        self.assertEqual(ResultCache(self.spill_dir).get("a"), ["1"])
+        self.assertFalse(ResultCache().persist("a"))
+
+    def test_clear_removes_the_spilled_entries(self):
+        cache = ResultCache(self.spill_dir)
+        cache.put("a", ["1"])
+        cache.persist("a")
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+        self.assertFalse(os.path.exists(self.spill_dir))
+
+    def test_disabled_cache_keeps_nothing(self):
+        cache = ResultCache.from_config(self.spill_dir, {"enabled": False})
+        self.assertEqual(cache.put("a", iter(["1"])), ["1"])
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
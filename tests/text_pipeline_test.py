@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from FileShift import EncodingPolicy, TextPipeline
+
+LOG = "14.03.19 10:00:00 Grüße straße\r\n14.03.19 10:00:01 STRASSE x\n14.03.19 10:00:02 a1 b\n14.03.19 10:00:03 naïve\nline end".encode("utf-8")
+
+
+class TextPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "patch.log")
+        with open(self.log_path, "wb") as f:
+            f.write(LOG)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def assert_same_lines(self, pattern):
+        expected = list(TextPipeline(pattern).run(LOG.decode("utf-8").splitlines()))
+        self.assertEqual(list(TextPipeline(pattern).run_bytes(LOG.splitlines(True), EncodingPolicy())), expected, pattern)
+        self.assertEqual(list(TextPipeline(pattern).run_file(self.log_path, EncodingPolicy())), expected, pattern)
+        return expected
+
+    def test_bytes_and_buffer_search_match_text_search(self):
+        for pattern in (r"stra", r"(?i)strasse", r"Grüße", r"\w+ße", r"na.ve", r"a\d", r"\Aline", r"end\Z", r"x$", r"e$", r"a.*e"):
+            self.assertTrue(self.assert_same_lines(pattern), pattern)
+
+    def test_bytes_fast_path_only_for_ascii_patterns(self):
+        policy = EncodingPolicy()
+        self.assertTrue(TextPipeline(r"lib/[^ ]+\.jar").matches_bytes_like_text(policy))
+        for pattern in (r"Grüße", r"\w+", r"\d", r"\s", r"\bx", r"(?i)x", r"na.ve", r"[^ ]\.jar"):
+            self.assertFalse(TextPipeline(pattern).matches_bytes_like_text(policy), pattern)
+        self.assertFalse(TextPipeline(r"x").matches_bytes_like_text(EncodingPolicy("utf-16")))
+
+    def test_clean_line(self):
+        pipeline = TextPipeline(phrase_to_remove="Marking file, for deletion", original_phrase="/", replacement_phrase="\\")
+        self.assertEqual(pipeline.clean_line("Marking file D:/lib/a.jar for deletion"), "D:\\lib\\a.jar ")
+
+
+if __name__ == "__main__":
+    unittest.main()